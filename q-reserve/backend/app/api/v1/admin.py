@@ -0,0 +1,108 @@
+from datetime import datetime
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from redis.exceptions import RedisError
+from sqlmodel import Session, select
+from ...core.config import settings
+from ...core.dependencies import require_admin, get_session
+from ...core.slow_queries import WINDOW_HOURS, top_slow_queries
+from ...models.category import Category
+from ...models.sla import SlaPolicy, SlaPolicyCreate, SlaPolicyRead
+from ...models.user import User
+
+router = APIRouter()
+
+
+@router.get("/slow-queries", response_model=List[dict])
+async def list_slow_queries(
+    hours: int = Query(WINDOW_HOURS, ge=1, le=WINDOW_HOURS),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(require_admin),
+):
+    """Slowest statement fingerprints of the last hours, by total time (admin only).
+    
+    Each entry has the normalized SQL, the route it last came from, redacted
+    parameters of the last occurrence and, when one was sampled, its plan.
+    """
+    if not settings.slow_query_log:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Slow query log is disabled",
+        )
+    
+    try:
+        return top_slow_queries(hours, limit)
+    except RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Slow query statistics are unavailable",
+        )
+
+
+@router.get("/sla-policies", response_model=List[SlaPolicyRead])
+async def list_sla_policies(
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """SLA policies overriding the default targets of ``SLA_RESOLUTION_HOURS`` (admin only)."""
+    return session.exec(
+        select(SlaPolicy).order_by(SlaPolicy.category_id, SlaPolicy.priority)
+    ).all()
+
+
+@router.put("/sla-policies", response_model=SlaPolicyRead)
+async def set_sla_policy(
+    policy_data: SlaPolicyCreate,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Create or replace the policy for a priority and category (admin only).
+    
+    Applies to tickets created afterwards and to tickets whose priority or
+    category changes; existing deadlines are kept.
+    """
+    if policy_data.category_id is not None and not session.get(Category, policy_data.category_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category ID",
+        )
+    
+    policy = session.exec(
+        select(SlaPolicy).where(
+            SlaPolicy.priority == policy_data.priority,
+            SlaPolicy.category_id == policy_data.category_id
+            if policy_data.category_id is not None
+            else SlaPolicy.category_id.is_(None),
+        )
+    ).first()
+    if policy:
+        policy.resolution_hours = policy_data.resolution_hours
+        policy.updated_at = datetime.utcnow()
+    else:
+        policy = SlaPolicy(**policy_data.dict())
+    
+    session.add(policy)
+    session.commit()
+    session.refresh(policy)
+    
+    return policy
+
+
+@router.delete("/sla-policies/{policy_id}")
+async def delete_sla_policy(
+    policy_id: int,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Delete an SLA policy, falling back to the default target (admin only)."""
+    policy = session.get(SlaPolicy, policy_id)
+    if not policy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="SLA policy not found",
+        )
+    
+    session.delete(policy)
+    session.commit()
+    
+    return {"message": "SLA policy deleted successfully"}
@@ -0,0 +1,244 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlmodel import Session, select
+from ...core.config import settings
+from ...core.dependencies import get_current_active_user, get_session
+from ...core.responses import file_download_response
+from ...models.user import User, UserRole
+from ...models.ticket import Ticket
+from ...models.attachment import Attachment, AttachmentRead
+from ...services.attachment_service import (
+    validate_filename,
+    check_content_length,
+    stream_to_disk,
+    release_blob,
+    store_blob,
+)
+from ...services.thumbnail_service import (
+    THUMBNAIL_FORMATS,
+    can_thumbnail,
+    request_thumbnail,
+    thumbnail_path,
+    generate_thumbnails,
+)
+
+router = APIRouter()
+
+
+def get_accessible_ticket(ticket_id: int, current_user: User, session: Session) -> Ticket:
+    """Load a ticket, checking the current user may access it."""
+    ticket = session.exec(
+        select(Ticket).where(Ticket.id == ticket_id)
+    ).first()
+
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+
+    # Check access permissions
+    if current_user.role == UserRole.end_user and ticket.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this ticket",
+        )
+
+    return ticket
+
+
+def get_ticket_attachment(ticket_id: int, attachment_id: int, session: Session) -> Attachment:
+    """Load an attachment that belongs to the given ticket."""
+    attachment = session.exec(
+        select(Attachment).where(
+            Attachment.id == attachment_id,
+            Attachment.ticket_id == ticket_id,
+        )
+    ).first()
+
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment not found",
+        )
+
+    return attachment
+
+
+@router.get("/{ticket_id}/attachments", response_model=List[AttachmentRead])
+async def list_attachments(
+    ticket_id: int,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """List the attachments of a ticket."""
+    get_accessible_ticket(ticket_id, current_user, session)
+
+    attachments = session.exec(
+        select(Attachment)
+        .where(Attachment.ticket_id == ticket_id)
+        .order_by(Attachment.created_at.asc())
+    ).all()
+
+    return attachments
+
+
+@router.post("/{ticket_id}/attachments", response_model=AttachmentRead)
+async def upload_attachment(
+    ticket_id: int,
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255),
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Upload an attachment to a ticket.
+
+    The raw request body is the file content. It is streamed to disk in
+    chunks, so memory use does not grow with the file size. Content that
+    is already stored (by the SHA-256 computed here) is shared, not
+    stored again.
+    """
+    get_accessible_ticket(ticket_id, current_user, session)
+
+    filename = validate_filename(filename)
+    check_content_length(request.headers.get("content-length"))
+
+    upload = await stream_to_disk(request.stream(), filename)
+    blob = await store_blob(session, upload)
+    generate_previews = can_thumbnail(blob.mime_type)
+
+    attachment = Attachment(
+        filename=filename,
+        file_path=blob.file_path,
+        file_size=blob.file_size,
+        mime_type=blob.mime_type,
+        content_hash=blob.content_hash,
+        ticket_id=ticket_id,
+        uploaded_by_id=current_user.id,
+    )
+
+    session.add(attachment)
+    session.commit()
+    session.refresh(attachment)
+
+    # Thumbnails are rendered by the Celery worker, never in the API process
+    if generate_previews:
+        generate_thumbnails.delay(attachment.content_hash)
+
+    return attachment
+
+
+@router.get("/{ticket_id}/attachments/{attachment_id}/download")
+async def download_attachment(
+    ticket_id: int,
+    attachment_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Download an attachment.
+
+    Supports Range requests and If-None-Match against a content-hash ETag.
+    The file itself is sent by nginx (X-Accel-Redirect) or with sendfile,
+    never read into memory here.
+    """
+    get_accessible_ticket(ticket_id, current_user, session)
+    attachment = get_ticket_attachment(ticket_id, attachment_id, session)
+
+    if attachment.content_hash:
+        etag = f'"{attachment.content_hash}"'
+    else:
+        etag = f'"{attachment.id}-{attachment.file_size}"'
+
+    return file_download_response(
+        request,
+        attachment.file_path,
+        media_type=attachment.mime_type,
+        etag=etag,
+        filename=attachment.filename,
+    )
+
+
+@router.get("/{ticket_id}/attachments/{attachment_id}/thumbnail")
+async def get_attachment_thumbnail(
+    ticket_id: int,
+    attachment_id: int,
+    request: Request,
+    size: int = Query(256),
+    format: str = Query("webp", regex="^(webp|jpeg)$"),
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Get a fixed-size thumbnail of an image attachment.
+
+    Thumbnails are normally rendered in the background after upload. If one
+    is missing it is requested from the worker and 202 is returned straight
+    away, with Retry-After; once written it is served from disk.
+    """
+    get_accessible_ticket(ticket_id, current_user, session)
+    attachment = get_ticket_attachment(ticket_id, attachment_id, session)
+
+    if not attachment.content_hash or not can_thumbnail(attachment.mime_type):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No thumbnail available for this attachment",
+        )
+
+    if size not in settings.thumbnail_sizes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Size must be one of {settings.thumbnail_sizes}",
+        )
+
+    state = request_thumbnail(attachment.content_hash, size, format)
+    if state == "pending":
+        return Response(
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Retry-After": "1"},
+        )
+    if state == "missing":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment content is missing",
+        )
+    if state == "invalid":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Attachment could not be decoded as an image",
+        )
+
+    _, media_type = THUMBNAIL_FORMATS[format]
+    return file_download_response(
+        request,
+        thumbnail_path(attachment.content_hash, size, format),
+        media_type=media_type,
+        etag=f'"{attachment.content_hash}-{size}-{format}"',
+        inline=True,
+        cache_control="private, max-age=31536000, immutable",
+    )
+
+
+@router.delete("/{ticket_id}/attachments/{attachment_id}")
+async def delete_attachment(
+    ticket_id: int,
+    attachment_id: int,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Delete an attachment (uploader, agents and admins)."""
+    get_accessible_ticket(ticket_id, current_user, session)
+    attachment = get_ticket_attachment(ticket_id, attachment_id, session)
+
+    if current_user.role == UserRole.end_user and attachment.uploaded_by_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to delete this attachment",
+        )
+
+    if attachment.content_hash:
+        release_blob(session, attachment.content_hash)
+
+    session.delete(attachment)
+    session.commit()
+
+    return {"message": "Attachment deleted successfully"}
@@ -1,154 +1,156 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
-from sqlmodel import Session, select
-from ...core.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    create_refresh_token,
-    verify_token,
-)
-from ...core.dependencies import get_session
-from ...models.user import User, UserCreate, UserRead
-from ...schemas.auth import Token, UserLogin, UserRegister, UserProfile
-
-router = APIRouter()
-security = HTTPBearer()
-
-
-@router.post("/register", response_model=UserRead)
-async def register(
-    user_data: UserRegister,
-    session: Session = Depends(get_session),
-):
-    """Register a new user."""
-    # Check if user already exists
-    existing_user = session.exec(
-        select(User).where(User.email == user_data.email)
-    ).first()
-    
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
-    
-    # Create new user
-    user = User(
-        email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
-        full_name=user_data.full_name,
-    )
-    
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    
-    return user
-
-
-@router.post("/login", response_model=Token)
-async def login(
-    user_data: UserLogin,
-    session: Session = Depends(get_session),
-):
-    """Login user and return access/refresh tokens."""
-    # Find user by email
-    user = session.exec(
-        select(User).where(User.email == user_data.email)
-    ).first()
-    
-    if not user or not verify_password(user_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user",
-        )
-    
-    # Create tokens
-    access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role}
-    )
-    refresh_token = create_refresh_token(
-        data={"sub": str(user.id), "role": user.role}
-    )
-    
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer",
-    }
-
-
-@router.post("/refresh", response_model=Token)
-async def refresh_token(
-    refresh_token: str,
-    session: Session = Depends(get_session),
-):
-    """Refresh access token using refresh token."""
-    payload = verify_token(refresh_token)
-    if not payload:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        )
-    
-    user_id = payload.get("sub")
-    if not user_id:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
-        )
-    
-    user = session.exec(select(User).where(User.id == int(user_id))).first()
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-        )
-    
-    # Create new tokens
-    access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role}
-    )
-    new_refresh_token = create_refresh_token(
-        data={"sub": str(user.id), "role": user.role}
-    )
-    
-    return {
-        "access_token": access_token,
-        "refresh_token": new_refresh_token,
-        "token_type": "bearer",
-    }
-
-
-@router.get("/me", response_model=UserProfile)
-async def get_current_user_profile(
-    current_user: User = Depends(security),
-    session: Session = Depends(get_session),
-):
-    """Get current user profile."""
-    user = session.exec(
-        select(User).where(User.id == current_user["user_id"])
-    ).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    return UserProfile(
-        id=user.id,
-        email=user.email,
-        full_name=user.full_name,
-        role=user.role,
-        is_active=user.is_active,
-        dark_mode=user.dark_mode,
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPBearer
+from sqlmodel import Session, select
+from ...core.cache import user_versions
+from ...core.security import (
+    verify_password,
+    get_password_hash,
+    create_access_token,
+    create_refresh_token,
+    verify_token,
+)
+from ...core.dependencies import get_session
+from ...models.user import User, UserCreate, UserRead
+from ...schemas.auth import Token, UserLogin, UserRegister, UserProfile
+
+router = APIRouter()
+security = HTTPBearer()
+
+
+@router.post("/register", response_model=UserRead)
+async def register(
+    user_data: UserRegister,
+    session: Session = Depends(get_session),
+):
+    """Register a new user."""
+    # Check if user already exists
+    existing_user = session.exec(
+        select(User).where(User.email == user_data.email)
+    ).first()
+    
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
+    
+    # Create new user
+    user = User(
+        email=user_data.email,
+        hashed_password=get_password_hash(user_data.password),
+        full_name=user_data.full_name,
+    )
+    
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    user_versions.bump()
+    
+    return user
+
+
+@router.post("/login", response_model=Token)
+async def login(
+    user_data: UserLogin,
+    session: Session = Depends(get_session),
+):
+    """Login user and return access/refresh tokens."""
+    # Find user by email
+    user = session.exec(
+        select(User).where(User.email == user_data.email)
+    ).first()
+    
+    if not user or not verify_password(user_data.password, user.hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+    
+    # Create tokens
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role}
+    )
+    refresh_token = create_refresh_token(
+        data={"sub": str(user.id), "role": user.role}
+    )
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh_token(
+    refresh_token: str,
+    session: Session = Depends(get_session),
+):
+    """Refresh access token using refresh token."""
+    payload = verify_token(refresh_token)
+    if not payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    
+    user_id = payload.get("sub")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+        )
+    
+    user = session.exec(select(User).where(User.id == int(user_id))).first()
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+        )
+    
+    # Create new tokens
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role}
+    )
+    new_refresh_token = create_refresh_token(
+        data={"sub": str(user.id), "role": user.role}
+    )
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+    }
+
+
+@router.get("/me", response_model=UserProfile)
+async def get_current_user_profile(
+    current_user: User = Depends(security),
+    session: Session = Depends(get_session),
+):
+    """Get current user profile."""
+    user = session.exec(
+        select(User).where(User.id == current_user["user_id"])
+    ).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
+    return UserProfile(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        is_active=user.is_active,
+        dark_mode=user.dark_mode,
     ) 
\ No newline at end of file
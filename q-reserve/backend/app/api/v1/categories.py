@@ -1,142 +1,186 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from ...core.dependencies import require_admin, get_session
-from ...models.user import User
-from ...models.category import Category, CategoryCreate, CategoryUpdate, CategoryRead
-
-router = APIRouter()
-
-
-@router.post("/", response_model=CategoryRead)
-async def create_category(
-    category_data: CategoryCreate,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Create a new category (admin only)."""
-    # Check if category name already exists
-    existing_category = session.exec(
-        select(Category).where(Category.name == category_data.name)
-    ).first()
-    
-    if existing_category:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Category name already exists",
-        )
-    
-    # Create category
-    category = Category(**category_data.dict())
-    session.add(category)
-    session.commit()
-    session.refresh(category)
-    
-    return category
-
-
-@router.get("/", response_model=List[CategoryRead])
-async def list_categories(
-    session: Session = Depends(get_session),
-):
-    """List all active categories."""
-    categories = session.exec(
-        select(Category).where(Category.is_active == True).order_by(Category.name.asc())
-    ).all()
-    
-    return categories
-
-
-@router.get("/{category_id}", response_model=CategoryRead)
-async def get_category(
-    category_id: int,
-    session: Session = Depends(get_session),
-):
-    """Get a specific category."""
-    category = session.exec(
-        select(Category).where(Category.id == category_id)
-    ).first()
-    
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found",
-        )
-    
-    return category
-
-
-@router.patch("/{category_id}", response_model=CategoryRead)
-async def update_category(
-    category_id: int,
-    category_update: CategoryUpdate,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Update a category (admin only)."""
-    category = session.exec(
-        select(Category).where(Category.id == category_id)
-    ).first()
-    
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found",
-        )
-    
-    # Check if new name conflicts with existing category
-    if category_update.name and category_update.name != category.name:
-        existing_category = session.exec(
-            select(Category).where(Category.name == category_update.name)
-        ).first()
-        if existing_category:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Category name already exists",
-            )
-    
-    # Update category
-    update_data = category_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(category, field, value)
-    
-    session.add(category)
-    session.commit()
-    session.refresh(category)
-    
-    return category
-
-
-@router.delete("/{category_id}")
-async def delete_category(
-    category_id: int,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Delete a category (admin only)."""
-    category = session.exec(
-        select(Category).where(Category.id == category_id)
-    ).first()
-    
-    if not category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Category not found",
-        )
-    
-    # Check if category has tickets
-    from ...models.ticket import Ticket
-    tickets_count = session.exec(
-        select(Ticket).where(Ticket.category_id == category_id)
-    ).all()
-    
-    if tickets_count:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete category with existing tickets",
-        )
-    
-    session.delete(category)
-    session.commit()
-    
+import json
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session, select
+from ...core.cache import category_versions, category_cache
+from ...core.dependencies import require_admin, get_session
+from ...core.responses import etag_matches, etag_response, not_modified
+from ...models.user import User
+from ...models.category import Category, CategoryCreate, CategoryUpdate, CategoryRead
+
+router = APIRouter()
+
+
+@router.post("/", response_model=CategoryRead)
+async def create_category(
+    category_data: CategoryCreate,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Create a new category (admin only)."""
+    # Check if category name already exists
+    existing_category = session.exec(
+        select(Category).where(Category.name == category_data.name)
+    ).first()
+    
+    if existing_category:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Category name already exists",
+        )
+    
+    # Create category
+    category = Category(**category_data.dict())
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    category_versions.bump()
+    
+    return category
+
+
+def serialize_categories(data) -> bytes:
+    """Serialize categories once so cache hits skip validation and encoding."""
+    return json.dumps(jsonable_encoder(data)).encode()
+
+
+@router.get("/", response_model=List[CategoryRead])
+async def list_categories(
+    request: Request,
+    session: Session = Depends(get_session),
+):
+    """List all active categories.
+    
+    Responses are cached per category version and carry an ETag, so a
+    revalidating client gets a 304 without touching the database.
+    """
+    version = category_versions.current()
+    etag = f'W/"categories-{version}"'
+    if version is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    body = category_cache.get("list", version)
+    if body is None:
+        categories = session.exec(
+            select(Category).where(Category.is_active == True).order_by(Category.name.asc())
+        ).all()
+        
+        if version is None:
+            return categories
+        
+        body = serialize_categories([CategoryRead.from_orm(category) for category in categories])
+        category_cache.set("list", version, body)
+    
+    return etag_response(body, etag)
+
+
+@router.get("/{category_id}", response_model=CategoryRead)
+async def get_category(
+    category_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+):
+    """Get a specific category."""
+    version = category_versions.current()
+    etag = f'W/"category-{category_id}-{version}"'
+    if version is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    body = category_cache.get(category_id, version)
+    if body is None:
+        category = session.exec(
+            select(Category).where(Category.id == category_id)
+        ).first()
+        
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found",
+            )
+        
+        if version is None:
+            return category
+        
+        body = serialize_categories(CategoryRead.from_orm(category))
+        category_cache.set(category_id, version, body)
+    
+    return etag_response(body, etag)
+
+
+@router.patch("/{category_id}", response_model=CategoryRead)
+async def update_category(
+    category_id: int,
+    category_update: CategoryUpdate,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Update a category (admin only)."""
+    category = session.exec(
+        select(Category).where(Category.id == category_id)
+    ).first()
+    
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+    
+    # Check if new name conflicts with existing category
+    if category_update.name and category_update.name != category.name:
+        existing_category = session.exec(
+            select(Category).where(Category.name == category_update.name)
+        ).first()
+        if existing_category:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Category name already exists",
+            )
+    
+    # Update category
+    update_data = category_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(category, field, value)
+    
+    session.add(category)
+    session.commit()
+    session.refresh(category)
+    category_versions.bump()
+    
+    return category
+
+
+@router.delete("/{category_id}")
+async def delete_category(
+    category_id: int,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Delete a category (admin only)."""
+    category = session.exec(
+        select(Category).where(Category.id == category_id)
+    ).first()
+    
+    if not category:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Category not found",
+        )
+    
+    # Check if category has tickets
+    from ...models.ticket import Ticket
+    tickets_count = session.exec(
+        select(Ticket).where(Ticket.category_id == category_id)
+    ).all()
+    
+    if tickets_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete category with existing tickets",
+        )
+    
+    session.delete(category)
+    session.commit()
+    category_versions.bump()
+    
     return {"message": "Category deleted successfully"} 
\ No newline at end of file
@@ -1,130 +1,196 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from ...core.dependencies import get_current_active_user, get_session
-from ...models.user import User
-from ...models.ticket import Ticket
-from ...models.comment import Comment, CommentCreate, CommentRead
-from ...services.notification_service import send_comment_notification_email
-
-router = APIRouter()
-
-
-@router.post("/", response_model=CommentRead)
-async def create_comment(
-    comment_data: CommentCreate,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Create a new comment on a ticket."""
-    # Validate ticket exists
-    ticket = session.exec(
-        select(Ticket).where(Ticket.id == comment_data.ticket_id)
-    ).first()
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
-        )
-    
-    # Check access permissions
-    if current_user.role == "end_user" and ticket.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to comment on this ticket",
-        )
-    
-    # Validate parent comment if provided
-    if comment_data.parent_id:
-        parent_comment = session.exec(
-            select(Comment).where(Comment.id == comment_data.parent_id)
-        ).first()
-        if not parent_comment or parent_comment.ticket_id != comment_data.ticket_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid parent comment",
-            )
-    
-    # Create comment
-    comment = Comment(
-        **comment_data.dict(),
-        author_id=current_user.id,
-    )
-    
-    session.add(comment)
-    session.commit()
-    session.refresh(comment)
-    
-    # Send notification to ticket owner if commenter is not the owner
-    if comment.author_id != ticket.owner_id:
-        send_comment_notification_email.delay(
-            to_email=ticket.owner.email,
-            ticket_id=ticket.id,
-            subject=ticket.subject,
-            commenter_name=current_user.full_name,
-        )
-    
-    return comment
-
-
-@router.get("/ticket/{ticket_id}", response_model=List[CommentRead])
-async def get_ticket_comments(
-    ticket_id: int,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Get all comments for a ticket."""
-    # Validate ticket exists
-    ticket = session.exec(
-        select(Ticket).where(Ticket.id == ticket_id)
-    ).first()
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
-        )
-    
-    # Check access permissions
-    if current_user.role == "end_user" and ticket.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this ticket",
-        )
-    
-    # Get comments (only top-level comments, replies will be included in the response)
-    comments = session.exec(
-        select(Comment)
-        .where(Comment.ticket_id == ticket_id, Comment.parent_id.is_(None))
-        .order_by(Comment.created_at.asc())
-    ).all()
-    
-    return comments
-
-
-@router.get("/{comment_id}", response_model=CommentRead)
-async def get_comment(
-    comment_id: int,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Get a specific comment."""
-    comment = session.exec(
-        select(Comment).where(Comment.id == comment_id)
-    ).first()
-    
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found",
-        )
-    
-    # Check access permissions
-    if current_user.role == "end_user" and comment.ticket.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this comment",
-        )
-    
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+from ...core.cache import ticket_versions
+from ...core.dependencies import get_current_active_user, get_session
+from ...core.fieldsets import parse_fields, load_only_columns
+from ...models.user import User, UserRead
+from ...models.ticket import Ticket
+from ...models.comment import Comment, CommentCreate, CommentRead
+from ...services.event_service import publish_event
+from ...services.notification_service import send_comment_notification_email
+from ...services.ticket_service import bump_ticket_version
+
+router = APIRouter()
+
+# Fields selectable with ?fields= on comment lists, in output order
+COMMENT_FIELDS = list(CommentRead.__fields__)
+COMMENT_COMPACT_FIELDS = ["id", "parent_id", "author_id", "created_at"]
+
+
+def get_projected_comments(session: Session, ticket_id: int, fields: List[str]) -> List[dict]:
+    """Load a ticket's comments with only the requested fields.
+    
+    The whole thread is read in one query and nested in memory, instead of
+    loading replies level by level.
+    """
+    options = [load_only_columns(Comment, fields, ["parent_id", "created_at"])]
+    if "author" in fields:
+        options.append(selectinload(Comment.author))
+    
+    comments = session.exec(
+        select(Comment)
+        .where(Comment.ticket_id == ticket_id)
+        .options(*options)
+        .order_by(Comment.created_at.asc())
+    ).all()
+    
+    def serialize(comment: Comment) -> dict:
+        data = {}
+        for name in fields:
+            if name == "author":
+                data[name] = UserRead.from_orm(comment.author)
+            elif name != "replies":
+                data[name] = getattr(comment, name)
+        return data
+    
+    if "replies" not in fields:
+        return [serialize(comment) for comment in comments]
+    
+    nodes = {comment.id: dict(serialize(comment), replies=[]) for comment in comments}
+    thread = []
+    for comment in comments:
+        parent = nodes.get(comment.parent_id)
+        (parent["replies"] if parent else thread).append(nodes[comment.id])
+    return thread
+
+
+@router.post("/", response_model=CommentRead)
+async def create_comment(
+    comment_data: CommentCreate,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Create a new comment on a ticket."""
+    # Validate ticket exists
+    ticket = session.exec(
+        select(Ticket).where(Ticket.id == comment_data.ticket_id)
+    ).first()
+    
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+    
+    # Check access permissions
+    if current_user.role == "end_user" and ticket.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to comment on this ticket",
+        )
+    
+    # Validate parent comment if provided
+    if comment_data.parent_id:
+        parent_comment = session.exec(
+            select(Comment).where(Comment.id == comment_data.parent_id)
+        ).first()
+        if not parent_comment or parent_comment.ticket_id != comment_data.ticket_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid parent comment",
+            )
+    
+    # Create comment
+    comment = Comment(
+        **comment_data.dict(),
+        author_id=current_user.id,
+    )
+    
+    session.add(comment)
+    bump_ticket_version(session, ticket.id)
+    session.commit()
+    session.refresh(comment)
+    ticket_versions.bump()
+    publish_event(
+        "comment.created",
+        ticket.id,
+        ticket.owner_id,
+        ticket.version,
+        comment_id=comment.id,
+        parent_id=comment.parent_id,
+        author_id=comment.author_id,
+    )
+    
+    # Send notification to ticket owner if commenter is not the owner
+    if comment.author_id != ticket.owner_id:
+        send_comment_notification_email.delay(
+            to_email=ticket.owner.email,
+            ticket_id=ticket.id,
+            subject=ticket.subject,
+            commenter_name=current_user.full_name,
+        )
+    
+    return comment
+
+
+@router.get("/ticket/{ticket_id}", response_model=List[CommentRead])
+async def get_ticket_comments(
+    ticket_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Optional[str] = Query(None, regex="^(full|compact)$"),
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Get all comments for a ticket.
+    
+    With ``fields`` (or ``view=compact``) only the requested columns are
+    loaded, in a single query. Unless ``replies`` is requested the thread
+    is returned flat, in creation order.
+    """
+    selected_fields = parse_fields(fields, view, COMMENT_FIELDS, COMMENT_COMPACT_FIELDS)
+
+    # Validate ticket exists
+    ticket = session.exec(
+        select(Ticket).where(Ticket.id == ticket_id)
+    ).first()
+    
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+    
+    # Check access permissions
+    if current_user.role == "end_user" and ticket.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this ticket",
+        )
+    
+    if selected_fields is not None:
+        return JSONResponse(jsonable_encoder(get_projected_comments(session, ticket_id, selected_fields)))
+    
+    # Top-level comments with replies nested, built from one query rather
+    # than lazy-loading each comment's author and replies
+    return get_projected_comments(session, ticket_id, COMMENT_FIELDS)
+
+
+@router.get("/{comment_id}", response_model=CommentRead)
+async def get_comment(
+    comment_id: int,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Get a specific comment."""
+    comment = session.exec(
+        select(Comment).where(Comment.id == comment_id)
+    ).first()
+    
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found",
+        )
+    
+    # Check access permissions
+    if current_user.role == "end_user" and comment.ticket.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this comment",
+        )
+    
     return comment 
\ No newline at end of file
@@ -0,0 +1,61 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from ...core.config import settings
+from ...core.dependencies import get_current_active_user, get_stream_user
+from ...core.security import create_stream_token
+from ...models.user import User, UserRole
+from ...services.event_service import Subscription, event_broker
+
+router = APIRouter()
+
+
+async def event_stream(subscription: Subscription) -> AsyncIterator[str]:
+    """Format queued events as Server-Sent Events, with periodic keep-alives."""
+    try:
+        yield "retry: 5000\n\n"
+        while not subscription.dropped:
+            try:
+                event_type, message = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.event_heartbeat_seconds
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {event_type}\ndata: {message}\n\n"
+    finally:
+        event_broker.unsubscribe(subscription)
+
+
+@router.post("/token")
+async def issue_stream_token(current_user: User = Depends(get_current_active_user)):
+    """Issue a short-lived token for opening the event stream from a browser."""
+    return {
+        "stream_token": create_stream_token(current_user.id),
+        "expires_in": settings.stream_token_expire_seconds,
+    }
+
+
+@router.get("/stream")
+async def stream_events(current_user: User = Depends(get_stream_user)):
+    """Stream ticket, comment and vote events as Server-Sent Events.
+
+    End users only receive events for their own tickets. Events carry the
+    ticket id and new version; clients refetch with If-None-Match to get
+    the changes instead of polling. Authenticate with the Authorization
+    header or, from EventSource, with ``?token=`` set to a stream token;
+    fetch a new one before reconnecting once it has expired.
+    """
+    subscription = event_broker.subscribe(
+        user_id=current_user.id,
+        owner_only=current_user.role == UserRole.end_user,
+    )
+
+    return StreamingResponse(
+        event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
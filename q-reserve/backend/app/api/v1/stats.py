@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+from ...core.dependencies import require_agent_or_admin, get_session
+from ...models.user import User
+from ...models.ticket import TicketFlowSeries, TicketStats
+from ...services.flow_service import get_ticket_flow, naive_utc
+from ...services.stats_service import get_ticket_stats
+
+router = APIRouter()
+
+
+@router.get("/", response_model=TicketStats)
+async def get_stats(
+    current_user: User = Depends(require_agent_or_admin),
+    session: Session = Depends(get_session),
+):
+    """Ticket counts by status, priority, category and assignee, plus backlog age.
+    
+    Read from the ``ticket_stats`` rollup, so the cost depends on the number
+    of groups rather than the number of tickets.
+    """
+    return get_ticket_stats(session)
+
+
+@router.get("/flow", response_model=TicketFlowSeries)
+async def get_flow(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category_id: Optional[int] = None,
+    interval: Optional[str] = Query(None, regex="^(hour|day)$"),
+    max_points: int = Query(200, ge=1, le=1000),
+    current_user: User = Depends(require_agent_or_admin),
+    session: Session = Depends(get_session),
+):
+    """Tickets created and resolved over time, with time-to-resolution histograms.
+    
+    Defaults to the last 30 days. Served from hourly and daily buckets
+    written by a background job, never from ``tickets``.
+    """
+    end = naive_utc(end) if end else datetime.utcnow()
+    start = naive_utc(start) if start else end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    
+    return get_ticket_flow(session, start, end, category_id, interval, max_points)
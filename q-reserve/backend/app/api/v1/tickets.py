@@ -1,283 +1,734 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, func
-from ...core.dependencies import get_current_active_user, require_agent_or_admin, get_session
-from ...models.user import User, UserRole
-from ...models.ticket import Ticket, TicketCreate, TicketUpdate, TicketRead, TicketList, TicketStatus
-from ...models.category import Category
-from ...models.vote import Vote, VoteType
-from ...services.notification_service import send_ticket_created_email, send_ticket_updated_email
-
-router = APIRouter()
-
-
-@router.post("/", response_model=TicketRead)
-async def create_ticket(
-    ticket_data: TicketCreate,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Create a new ticket."""
-    # Validate category exists
-    if ticket_data.category_id:
-        category = session.exec(
-            select(Category).where(Category.id == ticket_data.category_id)
-        ).first()
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid category ID",
-            )
-    
-    # Create ticket
-    ticket = Ticket(
-        **ticket_data.dict(),
-        owner_id=current_user.id,
-    )
-    
-    session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
-    
-    # Send notification email
-    send_ticket_created_email.delay(
-        to_email=current_user.email,
-        ticket_id=ticket.id,
-        subject=ticket.subject,
-        owner_name=current_user.full_name,
-    )
-    
-    return ticket
-
-
-@router.get("/", response_model=List[TicketList])
-async def list_tickets(
-    status: Optional[TicketStatus] = Query(None),
-    category_id: Optional[int] = Query(None),
-    search: Optional[str] = Query(None),
-    sort_by: str = Query("updated_at", regex="^(created_at|updated_at|subject|priority)$"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$"),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """List tickets with filtering and pagination."""
-    # Build query
-    query = select(Ticket)
-    
-    # Filter by user role
-    if current_user.role == UserRole.end_user:
-        query = query.where(Ticket.owner_id == current_user.id)
-    
-    # Apply filters
-    if status:
-        query = query.where(Ticket.status == status)
-    if category_id:
-        query = query.where(Ticket.category_id == category_id)
-    if search:
-        search_filter = f"%{search}%"
-        query = query.where(
-            (Ticket.subject.ilike(search_filter)) |
-            (Ticket.description.ilike(search_filter))
-        )
-    
-    # Apply sorting
-    if sort_order == "desc":
-        query = query.order_by(getattr(Ticket, sort_by).desc())
-    else:
-        query = query.order_by(getattr(Ticket, sort_by).asc())
-    
-    # Apply pagination
-    offset = (page - 1) * page_size
-    query = query.offset(offset).limit(page_size)
-    
-    tickets = session.exec(query).all()
-    
-    # Add related data
-    result = []
-    for ticket in tickets:
-        # Get comment count
-        comment_count = session.exec(
-            select(func.count()).select_from(ticket.comments)
-        ).first() or 0
-        
-        # Get vote score
-        upvotes = session.exec(
-            select(func.count()).select_from(ticket.votes).where(Vote.vote_type == VoteType.up)
-        ).first() or 0
-        downvotes = session.exec(
-            select(func.count()).select_from(ticket.votes).where(Vote.vote_type == VoteType.down)
-        ).first() or 0
-        vote_score = upvotes - downvotes
-        
-        # Get user's vote
-        user_vote = session.exec(
-            select(Vote).where(Vote.ticket_id == ticket.id, Vote.user_id == current_user.id)
-        ).first()
-        user_vote_type = user_vote.vote_type if user_vote else None
-        
-        ticket_data = TicketList(
-            id=ticket.id,
-            subject=ticket.subject,
-            description=ticket.description,
-            status=ticket.status,
-            priority=ticket.priority,
-            category_id=ticket.category_id,
-            assignee_id=ticket.assignee_id,
-            owner_id=ticket.owner_id,
-            created_at=ticket.created_at,
-            updated_at=ticket.updated_at,
-            last_activity=ticket.last_activity,
-            owner=ticket.owner,
-            assignee=ticket.assignee,
-            category=ticket.category,
-            comment_count=comment_count,
-            vote_score=vote_score,
-        )
-        result.append(ticket_data)
-    
-    return result
-
-
-@router.get("/{ticket_id}", response_model=TicketRead)
-async def get_ticket(
-    ticket_id: int,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Get ticket details."""
-    ticket = session.exec(
-        select(Ticket).where(Ticket.id == ticket_id)
-    ).first()
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
-        )
-    
-    # Check access permissions
-    if current_user.role == UserRole.end_user and ticket.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this ticket",
-        )
-    
-    # Get vote score and user vote
-    upvotes = session.exec(
-        select(func.count()).select_from(ticket.votes).where(Vote.vote_type == VoteType.up)
-    ).first() or 0
-    downvotes = session.exec(
-        select(func.count()).select_from(ticket.votes).where(Vote.vote_type == VoteType.down)
-    ).first() or 0
-    vote_score = upvotes - downvotes
-    
-    user_vote = session.exec(
-        select(Vote).where(Vote.ticket_id == ticket.id, Vote.user_id == current_user.id)
-    ).first()
-    user_vote_type = user_vote.vote_type if user_vote else None
-    
-    return TicketRead(
-        id=ticket.id,
-        subject=ticket.subject,
-        description=ticket.description,
-        status=ticket.status,
-        priority=ticket.priority,
-        category_id=ticket.category_id,
-        assignee_id=ticket.assignee_id,
-        owner_id=ticket.owner_id,
-        created_at=ticket.created_at,
-        updated_at=ticket.updated_at,
-        last_activity=ticket.last_activity,
-        owner=ticket.owner,
-        assignee=ticket.assignee,
-        category=ticket.category,
-        comment_count=len(ticket.comments),
-        vote_score=vote_score,
-        user_vote=user_vote_type,
-    )
-
-
-@router.patch("/{ticket_id}", response_model=TicketRead)
-async def update_ticket(
-    ticket_id: int,
-    ticket_update: TicketUpdate,
-    current_user: User = Depends(require_agent_or_admin),
-    session: Session = Depends(get_session),
-):
-    """Update ticket (agents and admins only)."""
-    ticket = session.exec(
-        select(Ticket).where(Ticket.id == ticket_id)
-    ).first()
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
-        )
-    
-    # Update ticket
-    update_data = ticket_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(ticket, field, value)
-    
-    session.add(ticket)
-    session.commit()
-    session.refresh(ticket)
-    
-    # Send notification if status changed
-    if "status" in update_data:
-        send_ticket_updated_email.delay(
-            to_email=ticket.owner.email,
-            ticket_id=ticket.id,
-            subject=ticket.subject,
-            status=ticket.status,
-        )
-    
-    return ticket
-
-
-@router.post("/{ticket_id}/vote")
-async def vote_ticket(
-    ticket_id: int,
-    vote_type: VoteType,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
-):
-    """Vote on a ticket (upvote/downvote)."""
-    ticket = session.exec(
-        select(Ticket).where(Ticket.id == ticket_id)
-    ).first()
-    
-    if not ticket:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Ticket not found",
-        )
-    
-    # Check if user already voted
-    existing_vote = session.exec(
-        select(Vote).where(Vote.ticket_id == ticket_id, Vote.user_id == current_user.id)
-    ).first()
-    
-    if existing_vote:
-        if existing_vote.vote_type == vote_type:
-            # Remove vote if same type
-            session.delete(existing_vote)
-        else:
-            # Change vote type
-            existing_vote.vote_type = vote_type
-            session.add(existing_vote)
-    else:
-        # Create new vote
-        vote = Vote(
-            ticket_id=ticket_id,
-            user_id=current_user.id,
-            vote_type=vote_type,
-        )
-        session.add(vote)
-    
-    session.commit()
-    
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+from ...core.config import settings
+from ...core.cache import category_versions, ticket_versions, ticket_list_cache, user_versions
+from ...core.dependencies import get_current_active_user, require_agent_or_admin, require_admin, get_session
+from ...core.pagination import encode_cursor, decode_cursor
+from ...core.fieldsets import parse_fields, load_only_columns
+from ...core.responses import content_disposition, etag_matches, not_modified
+from ...core.timing import timed
+from ...models.user import User, UserRole, UserRead
+from ...models.ticket import (
+    Ticket,
+    TicketCreate,
+    TicketUpdate,
+    TicketRead,
+    TicketList,
+    TicketStatus,
+    TicketChanges,
+    TicketTombstone,
+    TicketBulkUpdate,
+    TicketBulkResult,
+    TicketBulkResponse,
+    TicketImportReport,
+)
+from ...models.category import Category, CategoryRead
+from ...models.vote import Vote, VoteType
+from ...services.event_service import publish_event, publish_events, ticket_event
+from ...services.export_service import EXPORT_FORMATS, iter_ticket_export
+from ...services.import_service import ImportRowError, TicketImporter, iter_lines_from_thread, iter_records
+from ...services.notification_service import (
+    send_ticket_created_email,
+    send_ticket_updated_email,
+    send_ticket_updated_emails,
+)
+from ...services.assignment_service import assign_ticket, rebuild_agent_load, track_agent_load
+from ...services.flow_service import aggregate_ticket_flow, record_status_event
+from ...services.sla_service import apply_sla, refresh_sla_due_dates
+from ...services.stats_service import STATS_FIELDS, rebuild_ticket_stats, record_ticket_stats, stats_key
+from ...services.ticket_service import (
+    bump_ticket_version,
+    ticket_etag,
+    get_ticket_counts,
+    get_comment_counts,
+    get_vote_scores,
+    bulk_update_by_ids,
+    bulk_update_by_filter,
+    has_pending_bulk_update,
+)
+
+router = APIRouter()
+
+# Clients may keep ticket details but must revalidate them on every use
+TICKET_CACHE_CONTROL = "private, no-cache"
+
+# Fields selectable with ?fields= on the ticket list, in output order
+TICKET_LIST_FIELDS = list(TicketList.__fields__)
+TICKET_COMPACT_FIELDS = ["id", "subject", "status", "priority", "created_at", "updated_at"]
+
+# Relationship fields and the foreign key column each one needs
+TICKET_RELATIONS = {"owner": "owner_id", "assignee": "assignee_id", "category": "category_id"}
+
+
+def to_ticket_list(ticket: Ticket, comment_counts: dict, vote_scores: dict) -> TicketList:
+    """Build the list representation of a ticket with preloaded relationships."""
+    return TicketList(
+        id=ticket.id,
+        subject=ticket.subject,
+        description=ticket.description,
+        status=ticket.status,
+        priority=ticket.priority,
+        category_id=ticket.category_id,
+        assignee_id=ticket.assignee_id,
+        owner_id=ticket.owner_id,
+        created_at=ticket.created_at,
+        updated_at=ticket.updated_at,
+        last_activity=ticket.last_activity,
+        sla_due_at=ticket.sla_due_at,
+        sla_breached_at=ticket.sla_breached_at,
+        owner=ticket.owner,
+        assignee=ticket.assignee,
+        category=ticket.category,
+        comment_count=comment_counts.get(ticket.id, 0),
+        vote_score=vote_scores.get(ticket.id, 0),
+    )
+
+
+def serialize_ticket_fields(ticket: Ticket, fields: List[str], comment_counts: dict, vote_scores: dict) -> dict:
+    """Serialize only the requested fields of a ticket for list views."""
+    data = {}
+    for name in fields:
+        if name in ("owner", "assignee"):
+            user = getattr(ticket, name)
+            data[name] = UserRead.from_orm(user) if user else None
+        elif name == "category":
+            data[name] = CategoryRead.from_orm(ticket.category) if ticket.category else None
+        elif name == "comment_count":
+            data[name] = comment_counts.get(ticket.id, 0)
+        elif name == "vote_score":
+            data[name] = vote_scores.get(ticket.id, 0)
+        else:
+            data[name] = getattr(ticket, name)
+    return data
+
+
+@router.post("/", response_model=TicketRead)
+async def create_ticket(
+    ticket_data: TicketCreate,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Create a new ticket."""
+    # Validate category exists
+    if ticket_data.category_id:
+        category = session.exec(
+            select(Category).where(Category.id == ticket_data.category_id)
+        ).first()
+        if not category:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid category ID",
+            )
+    
+    # Create ticket
+    ticket = Ticket(
+        **ticket_data.dict(),
+        owner_id=current_user.id,
+    )
+    apply_sla(session, ticket)
+    
+    # Hand the ticket to the least-loaded agent unless one was given
+    auto_assigned = False
+    if settings.auto_assign_tickets and ticket.assignee_id is None:
+        auto_assigned = assign_ticket(ticket) is not None
+    
+    session.add(ticket)
+    session.flush()
+    record_ticket_stats(session, ticket)
+    record_status_event(session, ticket)
+    session.commit()
+    session.refresh(ticket)
+    if not auto_assigned:
+        track_agent_load(None, ticket.status, ticket.assignee_id, ticket.status)
+    ticket_versions.bump()
+    publish_event("ticket.created", ticket.id, ticket.owner_id, ticket.version)
+    
+    # Send notification email
+    send_ticket_created_email.delay(
+        to_email=current_user.email,
+        ticket_id=ticket.id,
+        subject=ticket.subject,
+        owner_name=current_user.full_name,
+    )
+    
+    return ticket
+
+
+@router.get("/", response_model=List[TicketList])
+async def list_tickets(
+    status: Optional[TicketStatus] = Query(None),
+    category_id: Optional[int] = Query(None),
+    search: Optional[str] = Query(None),
+    sort_by: str = Query("updated_at", regex="^(created_at|updated_at|subject|priority)$"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Optional[str] = Query(None, regex="^(full|compact)$"),
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """List tickets with filtering and pagination.
+    
+    Results are cached in Redis per normalized query and role scope. Any
+    ticket, comment or vote write bumps the ticket version and so
+    invalidates every cached list; category and user versions are part of
+    the key too, since those objects are nested in the response.
+    
+    ``fields`` (or ``view=compact``) narrows the response and the columns
+    read from the database; relationships and counts are only loaded when
+    requested.
+    """
+    selected_fields = parse_fields(fields, view, TICKET_LIST_FIELDS, TICKET_COMPACT_FIELDS)
+    
+    if search:
+        search = search.strip()
+    
+    # End users only see their own tickets; agents and admins share one view
+    if current_user.role == UserRole.end_user:
+        cache_scope = f"owner-{current_user.id}"
+    else:
+        cache_scope = "all"
+    
+    cache_key = ticket_list_cache.key(
+        cache_scope,
+        {
+            "status": status,
+            "category_id": category_id,
+            "search": search.lower() if search else None,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+            "page": page,
+            "page_size": page_size,
+            "fields": selected_fields,
+        },
+        ticket_versions.current(),
+        category_versions.current(),
+        user_versions.current(),
+    )
+    body = ticket_list_cache.get(cache_key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+    
+    # Build query
+    query = select(Ticket)
+    if selected_fields is None:
+        query = query.options(
+            selectinload(Ticket.owner),
+            selectinload(Ticket.assignee),
+            selectinload(Ticket.category),
+        )
+    else:
+        relations = [name for name in TICKET_RELATIONS if name in selected_fields]
+        query = query.options(
+            load_only_columns(Ticket, selected_fields, [TICKET_RELATIONS[name] for name in relations]),
+            *[selectinload(getattr(Ticket, name)) for name in relations],
+        )
+    
+    # Filter by user role
+    if current_user.role == UserRole.end_user:
+        query = query.where(Ticket.owner_id == current_user.id)
+    
+    # Apply filters
+    if status:
+        query = query.where(Ticket.status == status)
+    if category_id:
+        query = query.where(Ticket.category_id == category_id)
+    if search:
+        search_filter = f"%{search}%"
+        query = query.where(
+            (Ticket.subject.ilike(search_filter)) |
+            (Ticket.description.ilike(search_filter))
+        )
+    
+    # Apply sorting
+    if sort_order == "desc":
+        query = query.order_by(getattr(Ticket, sort_by).desc())
+    else:
+        query = query.order_by(getattr(Ticket, sort_by).asc())
+    
+    # Apply pagination
+    offset = (page - 1) * page_size
+    query = query.offset(offset).limit(page_size)
+    
+    tickets = session.exec(query).all()
+    
+    # Add related data, counted for the whole page at once
+    ticket_ids = [ticket.id for ticket in tickets]
+    comment_counts = {}
+    vote_scores = {}
+    if selected_fields is None or "comment_count" in selected_fields:
+        comment_counts = get_comment_counts(session, ticket_ids)
+    if selected_fields is None or "vote_score" in selected_fields:
+        vote_scores = get_vote_scores(session, ticket_ids)
+    
+    with timed("serialize"):
+        if selected_fields is not None:
+            result = [
+                serialize_ticket_fields(ticket, selected_fields, comment_counts, vote_scores)
+                for ticket in tickets
+            ]
+        else:
+            result = [to_ticket_list(ticket, comment_counts, vote_scores) for ticket in tickets]
+        body = json.dumps(jsonable_encoder(result))
+    ticket_list_cache.set(cache_key, body)
+    
+    return Response(content=body, media_type="application/json")
+
+
+@router.post("/import", response_model=TicketImportReport)
+async def import_tickets(
+    request: Request,
+    fmt: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Import tickets, comments and votes from another helpdesk (admin only).
+    
+    The request body is NDJSON or CSV in the format described by
+    ``TicketImporter`` and is processed as it arrives. The import runs in
+    a single transaction: a malformed stream imports nothing, while
+    individual invalid rows are skipped and listed in the report. No
+    notifications are sent.
+    """
+    def run_import() -> Tuple[TicketImporter, TicketImportReport]:
+        lines = iter_lines_from_thread(request.stream())
+        importer = TicketImporter(session)
+        return importer, importer.run(iter_records(lines, fmt))
+    
+    try:
+        importer, report = await run_in_threadpool(run_import)
+    except ImportRowError as e:
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    session.commit()
+    ticket_versions.bump()
+    category_versions.bump()
+    if report.tickets:
+        rebuild_ticket_stats.delay()
+        rebuild_agent_load.delay()
+        aggregate_ticket_flow.delay(since=importer.earliest_created_at.isoformat())
+    
+    return report
+
+
+@router.get("/export")
+async def export_tickets(
+    fmt: str = Query("ndjson", alias="format", regex="^(ndjson|csv)$"),
+    ticket_status: Optional[TicketStatus] = Query(None, alias="status"),
+    category_id: Optional[int] = Query(None),
+    include_comments: bool = Query(False),
+    current_user: User = Depends(get_current_active_user),
+):
+    """Stream every visible ticket as NDJSON or CSV.
+    
+    Rows are sent as they are read from a server-side cursor, so the
+    download starts immediately and memory use stays flat regardless of
+    size. With ``include_comments`` each batch of tickets is followed by
+    their comments (``type`` tells the records apart).
+    """
+    owner_id = current_user.id if current_user.role == UserRole.end_user else None
+    
+    return StreamingResponse(
+        iter_ticket_export(fmt, owner_id, ticket_status, category_id, include_comments),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={
+            "Content-Disposition": content_disposition(f"tickets.{fmt}"),
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.get("/changes", response_model=TicketChanges)
+async def get_ticket_changes(
+    since: Optional[str] = Query(None, description="Token from a previous response; omit for a full sync"),
+    ticket_status: Optional[TicketStatus] = Query(None, alias="status"),
+    category_id: Optional[int] = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Return tickets changed since a sync token, for incremental sync.
+    
+    Tickets are walked in (last_activity, id) order. ``removed`` lists ids
+    the caller should drop: deleted tickets, and changed tickets that no
+    longer match the filters. Pass ``next_token`` back as ``since`` and
+    keep going while ``has_more`` is true.
+    
+    Once caught up, the token trails the present by
+    ``sync_overlap_seconds`` so that writes still committing are not
+    skipped; clients may therefore see a ticket again and should keep the
+    copy with the highest ``last_activity``.
+    """
+    now = datetime.utcnow()
+    watermark = (datetime.min, 0)
+    if since:
+        try:
+            watermark = decode_cursor(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid sync token",
+            )
+        if watermark[0] < now - timedelta(days=settings.sync_tombstone_days):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Sync token expired, resync from scratch",
+            )
+    since_time, since_id = watermark
+    
+    query = (
+        select(Ticket)
+        .options(
+            selectinload(Ticket.owner),
+            selectinload(Ticket.assignee),
+            selectinload(Ticket.category),
+        )
+        .where(
+            or_(
+                Ticket.last_activity > since_time,
+                and_(Ticket.last_activity == since_time, Ticket.id > since_id),
+            )
+        )
+        .order_by(Ticket.last_activity, Ticket.id)
+        .limit(limit + 1)
+    )
+    if current_user.role == UserRole.end_user:
+        query = query.where(Ticket.owner_id == current_user.id)
+    
+    tickets = session.exec(query).all()
+    has_more = len(tickets) > limit
+    tickets = tickets[:limit]
+    
+    # Changed tickets that left the filtered view are reported as removed
+    def matches(ticket: Ticket) -> bool:
+        return (ticket_status is None or ticket.status == ticket_status) and (
+            category_id is None or ticket.category_id == category_id
+        )
+    
+    changed = [ticket for ticket in tickets if matches(ticket)]
+    removed = [ticket.id for ticket in tickets if not matches(ticket)]
+    
+    if since:
+        tombstones = select(TicketTombstone.ticket_id).where(TicketTombstone.removed_at > since_time)
+        if current_user.role == UserRole.end_user:
+            tombstones = tombstones.where(TicketTombstone.owner_id == current_user.id)
+        removed.extend(session.exec(tombstones).all())
+    
+    if tickets:
+        watermark = (tickets[-1].last_activity, tickets[-1].id)
+    if not has_more:
+        watermark = min(watermark, (now - timedelta(seconds=settings.sync_overlap_seconds), 0))
+    
+    ticket_ids = [ticket.id for ticket in changed]
+    comment_counts = get_comment_counts(session, ticket_ids)
+    vote_scores = get_vote_scores(session, ticket_ids)
+    
+    return TicketChanges(
+        tickets=[to_ticket_list(ticket, comment_counts, vote_scores) for ticket in changed],
+        removed=removed,
+        next_token=encode_cursor(*watermark),
+        has_more=has_more,
+    )
+
+
+@router.patch("/bulk", response_model=TicketBulkResponse)
+async def bulk_update_tickets(
+    bulk_update: TicketBulkUpdate,
+    current_user: User = Depends(require_agent_or_admin),
+    session: Session = Depends(get_session),
+):
+    """Update status, priority, category or assignee of many tickets (agents and admins only).
+    
+    Target either ``ticket_ids`` or every ticket matching ``filter``. Work
+    is done in chunks of set-based UPDATEs, each in its own transaction,
+    with one notification job per chunk. Tickets already in the requested
+    state are reported as unchanged and not touched.
+    """
+    changes = bulk_update.changes.dict(exclude_unset=True)
+    if not changes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No changes given",
+        )
+    
+    if (bulk_update.ticket_ids is None) == (bulk_update.filter is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Give either ticket_ids or filter",
+        )
+    
+    ticket_filter = bulk_update.filter.dict(exclude_unset=True) if bulk_update.filter is not None else None
+    if ticket_filter == {}:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Filter needs at least one criterion",
+        )
+    
+    if bulk_update.ticket_ids is not None and len(bulk_update.ticket_ids) > settings.bulk_update_max_tickets:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.bulk_update_max_tickets} tickets per request",
+        )
+    
+    if changes.get("category_id") is not None and not session.get(Category, changes["category_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category ID",
+        )
+    
+    if changes.get("assignee_id") is not None and not session.get(User, changes["assignee_id"]):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid assignee ID",
+        )
+    
+    if bulk_update.ticket_ids is not None:
+        chunks = bulk_update_by_ids(session, bulk_update.ticket_ids, changes)
+    else:
+        chunks = bulk_update_by_filter(session, ticket_filter, changes, settings.bulk_update_max_tickets)
+    
+    results = {}
+    updated = 0
+    for chunk_results, rows in chunks:
+        results.update(chunk_results)
+        if not rows:
+            continue
+        
+        updated += len(rows)
+        ticket_versions.bump()
+        publish_events([
+            ticket_event("ticket.updated", ticket_id, owner_id, version, fields=sorted(changes))
+            for ticket_id, owner_id, version in rows
+        ])
+        if "status" in changes:
+            send_ticket_updated_emails.delay([row[0] for row in rows])
+        if {"priority", "category_id"} & changes.keys():
+            refresh_sla_due_dates.delay([row[0] for row in rows])
+    
+    # Set-based updates don't know each ticket's previous group
+    if updated and STATS_FIELDS & changes.keys():
+        rebuild_ticket_stats.delay()
+    if updated and {"status", "assignee_id"} & changes.keys():
+        rebuild_agent_load.delay()
+    
+    # The limit applies to the tickets selected, some of which may have
+    # changed before their UPDATE and so not been updated
+    has_more = False
+    if ticket_filter is not None and len(results) >= settings.bulk_update_max_tickets:
+        has_more = has_pending_bulk_update(session, ticket_filter, changes)
+    
+    return TicketBulkResponse(
+        updated=updated,
+        results=[
+            TicketBulkResult(ticket_id=ticket_id, result=result)
+            for ticket_id, result in results.items()
+        ],
+        has_more=has_more,
+    )
+
+
+@router.get("/{ticket_id}", response_model=TicketRead)
+async def get_ticket(
+    ticket_id: int,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Get ticket details.
+    
+    A cheap version probe runs first, so a client revalidating with
+    If-None-Match gets a 304 without relationships being loaded or votes
+    counted.
+    """
+    probe = session.exec(
+        select(Ticket.owner_id, Ticket.version, Ticket.updated_at, Ticket.last_activity)
+        .where(Ticket.id == ticket_id)
+    ).first()
+    
+    if not probe:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+    
+    owner_id, version, updated_at, last_activity = probe
+    
+    # Check access permissions
+    if current_user.role == UserRole.end_user and owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this ticket",
+        )
+    
+    category_version = category_versions.current()
+    user_version = user_versions.current()
+    etag = ticket_etag(
+        ticket_id, version, updated_at, last_activity, current_user.id, category_version, user_version
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, TICKET_CACHE_CONTROL)
+    
+    ticket = session.exec(
+        select(Ticket).where(Ticket.id == ticket_id)
+    ).first()
+    
+    # The ticket may have changed since the probe
+    etag = ticket_etag(
+        ticket.id,
+        ticket.version,
+        ticket.updated_at,
+        ticket.last_activity,
+        current_user.id,
+        category_version,
+        user_version,
+    )
+    
+    # Get comment count, vote score and user vote
+    comment_count, vote_score = get_ticket_counts(session, ticket.id)
+    
+    user_vote = session.exec(
+        select(Vote).where(Vote.ticket_id == ticket.id, Vote.user_id == current_user.id)
+    ).first()
+    user_vote_type = user_vote.vote_type if user_vote else None
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = TICKET_CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+    
+    with timed("serialize"):
+        return TicketRead(
+            id=ticket.id,
+            subject=ticket.subject,
+            description=ticket.description,
+            status=ticket.status,
+            priority=ticket.priority,
+            category_id=ticket.category_id,
+            assignee_id=ticket.assignee_id,
+            owner_id=ticket.owner_id,
+            created_at=ticket.created_at,
+            updated_at=ticket.updated_at,
+            last_activity=ticket.last_activity,
+            sla_due_at=ticket.sla_due_at,
+            sla_breached_at=ticket.sla_breached_at,
+            owner=ticket.owner,
+            assignee=ticket.assignee,
+            category=ticket.category,
+            comment_count=comment_count,
+            vote_score=vote_score,
+            user_vote=user_vote_type,
+        )
+
+
+@router.patch("/{ticket_id}", response_model=TicketRead)
+async def update_ticket(
+    ticket_id: int,
+    ticket_update: TicketUpdate,
+    current_user: User = Depends(require_agent_or_admin),
+    session: Session = Depends(get_session),
+):
+    """Update ticket (agents and admins only)."""
+    update_data = ticket_update.dict(exclude_unset=True)
+    
+    # Lock the row when the change can move it between stats groups, so two
+    # concurrent updates cannot both take it out of the same group
+    query = select(Ticket).where(Ticket.id == ticket_id)
+    if STATS_FIELDS & update_data.keys():
+        query = query.with_for_update()
+    ticket = session.exec(query).first()
+    
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+    
+    # Update ticket
+    old_stats_key = stats_key(ticket)
+    old_assignee_id, old_status = ticket.assignee_id, ticket.status
+    for field, value in update_data.items():
+        setattr(ticket, field, value)
+    if {"priority", "category_id"} & update_data.keys():
+        apply_sla(session, ticket)
+    ticket.version = Ticket.version + 1
+    record_ticket_stats(session, ticket, old_stats_key)
+    record_status_event(session, ticket, old_stats_key[0])
+    
+    session.add(ticket)
+    session.commit()
+    session.refresh(ticket)
+    ticket_versions.bump()
+    track_agent_load(old_assignee_id, old_status, ticket.assignee_id, ticket.status)
+    publish_event("ticket.updated", ticket.id, ticket.owner_id, ticket.version, fields=sorted(update_data))
+    
+    # Send notification if status changed
+    if "status" in update_data:
+        send_ticket_updated_email.delay(
+            to_email=ticket.owner.email,
+            ticket_id=ticket.id,
+            subject=ticket.subject,
+            status=ticket.status,
+        )
+    
+    return ticket
+
+
+@router.post("/{ticket_id}/vote")
+async def vote_ticket(
+    ticket_id: int,
+    vote_type: VoteType,
+    current_user: User = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """Vote on a ticket (upvote/downvote)."""
+    ticket = session.exec(
+        select(Ticket).where(Ticket.id == ticket_id)
+    ).first()
+    
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found",
+        )
+    
+    # Check if user already voted
+    existing_vote = session.exec(
+        select(Vote).where(Vote.ticket_id == ticket_id, Vote.user_id == current_user.id)
+    ).first()
+    
+    if existing_vote:
+        if existing_vote.vote_type == vote_type:
+            # Remove vote if same type
+            session.delete(existing_vote)
+        else:
+            # Change vote type
+            existing_vote.vote_type = vote_type
+            session.add(existing_vote)
+    else:
+        # Create new vote
+        vote = Vote(
+            ticket_id=ticket_id,
+            user_id=current_user.id,
+            vote_type=vote_type,
+        )
+        session.add(vote)
+    
+    bump_ticket_version(session, ticket_id)
+    session.commit()
+    ticket_versions.bump()
+    publish_event("ticket.voted", ticket_id, ticket.owner_id, ticket.version)
+    
     return {"message": "Vote updated successfully"} 
\ No newline at end of file
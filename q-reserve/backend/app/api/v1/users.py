@@ -1,122 +1,287 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from ...core.dependencies import require_admin, get_session
-from ...models.user import User, UserUpdate, UserRead, UserRole
-
-router = APIRouter()
-
-
-@router.get("/", response_model=List[UserRead])
-async def list_users(
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """List all users (admin only)."""
-    users = session.exec(
-        select(User).order_by(User.created_at.desc())
-    ).all()
-    
-    return users
-
-
-@router.get("/{user_id}", response_model=UserRead)
-async def get_user(
-    user_id: int,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Get a specific user (admin only)."""
-    user = session.exec(
-        select(User).where(User.id == user_id)
-    ).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    return user
-
-
-@router.patch("/{user_id}", response_model=UserRead)
-async def update_user(
-    user_id: int,
-    user_update: UserUpdate,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Update a user (admin only)."""
-    user = session.exec(
-        select(User).where(User.id == user_id)
-    ).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    # Check if email already exists (if changing email)
-    if user_update.email and user_update.email != user.email:
-        existing_user = session.exec(
-            select(User).where(User.email == user_update.email)
-        ).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email already exists",
-            )
-    
-    # Update user
-    update_data = user_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    
-    return user
-
-
-@router.delete("/{user_id}")
-async def delete_user(
-    user_id: int,
-    current_user: User = Depends(require_admin),
-    session: Session = Depends(get_session),
-):
-    """Delete a user (admin only)."""
-    if user_id == current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete yourself",
-        )
-    
-    user = session.exec(
-        select(User).where(User.id == user_id)
-    ).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    
-    # Check if user has tickets
-    from ...models.ticket import Ticket
-    tickets_count = session.exec(
-        select(Ticket).where(Ticket.owner_id == user_id)
-    ).all()
-    
-    if tickets_count:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot delete user with existing tickets",
-        )
-    
-    session.delete(user)
-    session.commit()
-    
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import and_, delete, or_
+from sqlmodel import Session, select, func
+from ...core.cache import user_versions, agent_cache
+from ...core.dependencies import require_admin, require_agent_or_admin, get_session
+from ...core.fieldsets import parse_fields
+from ...core.pagination import encode_cursor, decode_cursor
+from ...core.responses import etag_matches, etag_response, not_modified
+from ...models.category import Category
+from ...models.user import AgentSkill, User, UserUpdate, UserRead, UserRole, AgentOption
+from ...services.assignment_service import rebuild_agent_load
+
+router = APIRouter()
+
+
+# Fields selectable with ?fields= on the user list, in output order
+USER_FIELDS = list(UserRead.__fields__)
+USER_COMPACT_FIELDS = ["id", "email", "full_name", "role"]
+
+
+def user_prefix_filter(prefix: str):
+    """Match users whose email or full name starts with ``prefix``, case-insensitively.
+    
+    Written as lower(column) LIKE 'prefix%' so the prefix indexes apply.
+    """
+    escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"{escaped}%"
+    return or_(
+        func.lower(User.email).like(pattern, escape="\\"),
+        func.lower(User.full_name).like(pattern, escape="\\"),
+    )
+
+
+@router.get("/", response_model=List[UserRead])
+async def list_users(
+    response: Response,
+    role: Optional[UserRole] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, min_length=1, description="Prefix of email or full name"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    view: Optional[str] = Query(None, regex="^(full|compact)$"),
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """List users, newest first (admin only).
+    
+    Pages are keyset paginated: when more users follow, the response has
+    an ``X-Next-Cursor`` header to pass back as ``cursor``.
+    """
+    selected_fields = parse_fields(fields, view, USER_FIELDS, USER_COMPACT_FIELDS)
+    
+    if selected_fields is None:
+        query = select(User)
+    else:
+        # Select just the requested columns instead of whole rows
+        columns = dict.fromkeys(selected_fields + ["created_at"])
+        query = select(*[getattr(User, name) for name in columns])
+    
+    if role:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    if q:
+        query = query.where(user_prefix_filter(q))
+    
+    if cursor:
+        try:
+            created_at, user_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor",
+            )
+        query = query.where(
+            or_(User.created_at < created_at, and_(User.created_at == created_at, User.id < user_id))
+        )
+    
+    rows = session.exec(
+        query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
+    ).all()
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    if selected_fields is None:
+        response.headers.update(headers)
+        return rows
+    
+    return JSONResponse(
+        jsonable_encoder([{name: getattr(row, name) for name in selected_fields} for row in rows]),
+        headers=headers,
+    )
+
+
+@router.get("/agents", response_model=List[AgentOption])
+async def list_agents(
+    request: Request,
+    current_user: User = Depends(require_agent_or_admin),
+    session: Session = Depends(get_session),
+):
+    """List active agents and admins for the assignee picker.
+    
+    The list is cached per user version and carries an ETag, so pickers
+    can revalidate it cheaply.
+    """
+    version = user_versions.current()
+    etag = f'W/"agents-{version}"'
+    if version is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    
+    body = agent_cache.get("agents", version)
+    if body is None:
+        rows = session.exec(
+            select(User.id, User.full_name, User.email)
+            .where(User.role.in_([UserRole.agent, UserRole.admin]), User.is_active.is_(True))
+            .order_by(func.lower(User.full_name))
+        ).all()
+        agents = [AgentOption(id=user_id, full_name=full_name, email=email) for user_id, full_name, email in rows]
+        
+        if version is None:
+            return agents
+        
+        body = json.dumps(jsonable_encoder(agents)).encode()
+        agent_cache.set("agents", version, body)
+    
+    return etag_response(body, etag)
+
+
+@router.get("/{user_id}", response_model=UserRead)
+async def get_user(
+    user_id: int,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Get a specific user (admin only)."""
+    user = session.exec(
+        select(User).where(User.id == user_id)
+    ).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
+    return user
+
+
+@router.patch("/{user_id}", response_model=UserRead)
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Update a user (admin only)."""
+    user = session.exec(
+        select(User).where(User.id == user_id)
+    ).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
+    # Check if email already exists (if changing email)
+    if user_update.email and user_update.email != user.email:
+        existing_user = session.exec(
+            select(User).where(User.email == user_update.email)
+        ).first()
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already exists",
+            )
+    
+    # Update user
+    update_data = user_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(user, field, value)
+    
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    user_versions.bump()
+    if {"role", "is_active"} & update_data.keys():
+        rebuild_agent_load.delay()
+    
+    return user
+
+
+@router.get("/{user_id}/skills", response_model=List[int])
+async def get_agent_skills(
+    user_id: int,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Categories an agent is preferred for when tickets are auto-assigned (admin only)."""
+    return session.exec(
+        select(AgentSkill.category_id).where(AgentSkill.user_id == user_id).order_by(AgentSkill.category_id)
+    ).all()
+
+
+@router.put("/{user_id}/skills", response_model=List[int])
+async def set_agent_skills(
+    user_id: int,
+    category_ids: List[int] = Body(...),
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Replace an agent's skill categories (admin only)."""
+    user = session.get(User, user_id)
+    if not user or user.role != UserRole.agent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found",
+        )
+    
+    category_ids = sorted(set(category_ids))
+    existing = session.exec(select(Category.id).where(Category.id.in_(category_ids))).all()
+    if len(existing) != len(category_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid category ID",
+        )
+    
+    session.execute(delete(AgentSkill).where(AgentSkill.user_id == user_id))
+    session.add_all([AgentSkill(user_id=user_id, category_id=category_id) for category_id in category_ids])
+    session.commit()
+    rebuild_agent_load.delay()
+    
+    return category_ids
+
+
+@router.delete("/{user_id}")
+async def delete_user(
+    user_id: int,
+    current_user: User = Depends(require_admin),
+    session: Session = Depends(get_session),
+):
+    """Delete a user (admin only)."""
+    if user_id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete yourself",
+        )
+    
+    user = session.exec(
+        select(User).where(User.id == user_id)
+    ).first()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    
+    # Check if user has tickets
+    from ...models.ticket import Ticket
+    tickets_count = session.exec(
+        select(Ticket).where(Ticket.owner_id == user_id)
+    ).all()
+    
+    if tickets_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete user with existing tickets",
+        )
+    
+    was_agent = user.role == UserRole.agent
+    session.execute(delete(AgentSkill).where(AgentSkill.user_id == user_id))
+    session.delete(user)
+    session.commit()
+    user_versions.bump()
+    if was_agent:
+        rebuild_agent_load.delay()
+    
     return {"message": "User deleted successfully"} 
\ No newline at end of file
@@ -0,0 +1,137 @@
+import math
+import time
+from typing import Callable
+from urllib.parse import parse_qs
+
+from fastapi.responses import JSONResponse
+
+from .config import settings
+from .metrics import REQUESTS_SHED
+
+# Priority classes; each may use this share of the concurrency limit
+CRITICAL = "critical"  # writes and authentication
+NORMAL = "normal"
+EXPENSIVE = "expensive"  # search, exports
+PRIORITY_SHARES = {CRITICAL: 1.0, NORMAL: 0.75, EXPENSIVE: 0.25}
+
+# Never shed: probes, metrics and long-lived event streams (which would
+# otherwise count as in flight for their whole lifetime)
+EXEMPT_PREFIXES = ("/health", "/metrics", "/api/v1/events/", "/static/")
+
+EXPENSIVE_PATHS = ("/api/v1/tickets/export",)
+SEARCH_PARAMS = ("search", "q")
+
+ADJUST_INTERVAL = 0.5  # seconds between limit adjustments
+EWMA_WEIGHT = 0.1
+
+
+def request_priority(scope) -> str:
+    """Classify a request: writes and auth first, searches and exports last."""
+    path = scope["path"]
+    if scope["method"] not in ("GET", "HEAD") or path.startswith("/api/v1/auth/"):
+        return CRITICAL
+    if path.startswith(EXPENSIVE_PATHS):
+        return EXPENSIVE
+    if scope["query_string"]:
+        params = parse_qs(scope["query_string"].decode("latin-1"))
+        if any(params.get(name) for name in SEARCH_PARAMS):
+            return EXPENSIVE
+    return NORMAL
+
+
+class AdmissionController:
+    """Adapts how many requests a worker handles at once to how it is coping.
+
+    Latency (time to the response headers) and database pool wait are
+    tracked as moving averages. While either is over its target the
+    concurrency limit shrinks multiplicatively; once both recover it grows
+    back one step at a time. Each priority class may only fill its share
+    of the limit, so reads are shed before writes and logins.
+    """
+
+    def __init__(self, pool_wait: Callable[[], float]):
+        self.pool_wait = pool_wait
+        self.limit = float(settings.admission_max_concurrency)
+        self.in_flight = 0
+        self.latency = 0.0
+        self.last_adjusted = time.monotonic()
+
+    @property
+    def overloaded(self) -> bool:
+        return (
+            self.latency * 1000 > settings.admission_target_latency_ms
+            or self.pool_wait() * 1000 > settings.admission_target_pool_wait_ms
+        )
+
+    def admit(self, priority: str) -> bool:
+        # Always let a few requests through so the averages keep moving
+        if self.in_flight < settings.admission_min_concurrency:
+            return True
+        return self.in_flight < self.limit * PRIORITY_SHARES[priority]
+
+    def observe(self, latency: float):
+        self.latency += EWMA_WEIGHT * (latency - self.latency)
+
+        now = time.monotonic()
+        if now - self.last_adjusted < ADJUST_INTERVAL:
+            return
+        self.last_adjusted = now
+        if self.overloaded:
+            self.limit = max(settings.admission_min_concurrency, self.limit * 0.8)
+        else:
+            self.limit = min(settings.admission_max_concurrency, self.limit + 1)
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: longer the further over target we are."""
+        ratio = self.latency * 1000 / settings.admission_target_latency_ms
+        return min(30, max(1, math.ceil(ratio)))
+
+    def snapshot(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "concurrency_limit": round(self.limit),
+            "latency_ms": round(self.latency * 1000, 1),
+            "pool_wait_ms": round(self.pool_wait() * 1000, 1),
+            "saturated": self.overloaded or self.in_flight >= self.limit,
+        }
+
+
+class AdmissionControlMiddleware:
+    """Answer with a fast 503 and Retry-After instead of queueing doomed work."""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        priority = request_priority(scope)
+        if not controller.admit(priority):
+            REQUESTS_SHED.labels(priority).inc()
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly"},
+                status_code=503,
+                headers={"Retry-After": str(controller.retry_after())},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        observed = False
+
+        async def send_with_latency(message):
+            nonlocal observed
+            if message["type"] == "http.response.start" and not observed:
+                observed = True
+                controller.observe(time.perf_counter() - started)
+            await send(message)
+
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_latency)
+        finally:
+            controller.in_flight -= 1
@@ -0,0 +1,269 @@
+import hashlib
+import json
+import logging
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError
+
+from .config import settings
+from .metrics import record_cache_lookup
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+VERSION_CHANNEL = "qreserve:versions"
+EPOCH_KEY = "qreserve:version:epoch"
+
+# The listener pings this often and reconnects when nothing has been read
+# for LISTENER_DEAD_AFTER, so a half-open connection cannot go unnoticed
+LISTENER_PING_INTERVAL = 5
+LISTENER_DEAD_AFTER = 15
+
+_counters: Dict[str, "VersionCounter"] = {}
+
+
+class VersionCounter:
+    """A named counter that is bumped whenever the data it covers changes.
+
+    The value lives in Redis so every worker agrees on it. Bumps are
+    broadcast on a pub/sub channel; while the listener thread is connected
+    the current value is read from memory, otherwise from Redis. If Redis
+    cannot be reached the version is unknown (None) and callers should skip
+    their caches rather than risk serving stale data.
+
+    Versions are "<epoch>.<count>" strings. The epoch is a random id kept
+    next to the counters, so if Redis loses its data the counts restart
+    under a new epoch and old versions are never reused. A bump that cannot
+    reach Redis leaves the version unknown in this process until the bump
+    has been retried.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.key = f"qreserve:version:{name}"
+        self._state: Tuple[Optional[str], int] = (None, 0)
+        self._pending_bump = False
+        _counters[name] = self
+
+    @property
+    def version(self) -> Optional[str]:
+        epoch, count = self._state
+        return f"{epoch}.{count}" if epoch else None
+
+    def _advance(self, epoch: str, count: int):
+        """Take a version read from Redis; counts only move forward within an epoch."""
+        current_epoch, current_count = self._state
+        if epoch != current_epoch or count > current_count:
+            self._state = (epoch, count)
+
+    def observe(self, epoch: str, count: int):
+        """Record a version seen on the pub/sub channel."""
+        if epoch == self._state[0]:
+            self._advance(epoch, count)
+        else:
+            # Redis was reset, or the message is older than the reset: ask Redis
+            self.refresh()
+
+    def _execute(self, client: redis.Redis, increment: bool) -> Tuple[str, int]:
+        pipeline = client.pipeline(transaction=True)
+        pipeline.set(EPOCH_KEY, secrets.token_hex(8), nx=True)
+        pipeline.get(EPOCH_KEY)
+        if increment:
+            pipeline.incr(self.key)
+        else:
+            pipeline.get(self.key)
+        _, epoch, count = pipeline.execute()
+        return epoch, int(count or 0)
+
+    def _bump(self, client: redis.Redis) -> Optional[str]:
+        epoch, count = self._execute(client, increment=True)
+        client.publish(VERSION_CHANNEL, f"{self.name}:{epoch}:{count}")
+        self._pending_bump = False
+        self._advance(epoch, count)
+        return self.version
+
+    def refresh(self) -> Optional[str]:
+        """Read the counter from Redis, retrying a bump that failed earlier."""
+        client = get_redis()
+        if self._pending_bump:
+            return self._bump(client)
+        self._advance(*self._execute(client, increment=False))
+        return self.version
+
+    def current(self) -> Optional[str]:
+        """Return the current version, or None if it cannot be known."""
+        if version_listener.connected and not self._pending_bump:
+            return self.version
+
+        try:
+            return self.refresh()
+        except RedisError:
+            return None
+
+    def bump(self) -> Optional[str]:
+        """Increment the version and tell every worker about it.
+
+        If Redis is unavailable the bump is remembered and retried before
+        this process trusts a version again.
+        """
+        try:
+            return self._bump(get_redis())
+        except RedisError:
+            logger.warning("Could not bump the %s version; caches bypassed until it is retried", self.name)
+            self._pending_bump = True
+            return None
+
+
+class VersionListener:
+    """Background thread that keeps every VersionCounter in sync via pub/sub."""
+
+    def __init__(self):
+        self.connected = False
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="version-listener", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except RedisError:
+                pass
+            finally:
+                self.connected = False
+
+            time.sleep(1)
+
+    def _listen(self):
+        client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+            socket_keepalive=True,
+            health_check_interval=LISTENER_PING_INTERVAL,
+        )
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(VERSION_CHANNEL)
+
+            # Catch up on bumps made while we were not subscribed
+            for counter in list(_counters.values()):
+                counter.refresh()
+            self.connected = True
+
+            last_read = last_ping = time.monotonic()
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                now = time.monotonic()
+                if message is not None:
+                    last_read = now
+                    if message["type"] == "message":
+                        name, _, version = message["data"].partition(":")
+                        epoch, _, count = version.rpartition(":")
+                        counter = _counters.get(name)
+                        if counter is not None:
+                            counter.observe(epoch, int(count))
+                elif now - last_read > LISTENER_DEAD_AFTER:
+                    raise RedisConnectionError("No reply from Redis on the version channel")
+
+                if now - last_ping >= LISTENER_PING_INTERVAL:
+                    pubsub.ping()
+                    last_ping = now
+        finally:
+            pubsub.close()
+
+
+version_listener = VersionListener()
+
+
+class VersionedCache:
+    """An in-process cache whose entries are only valid for one version."""
+
+    def __init__(self, counter: VersionCounter, max_entries: int = 1024):
+        self.counter = counter
+        self.max_entries = max_entries
+        self._entries: Dict[Any, Tuple[str, Any]] = {}
+
+    def get(self, key: Any, version: Optional[str]) -> Optional[Any]:
+        """Return the value cached for this version, if any."""
+        if version is None:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            record_cache_lookup(self.counter.name, False)
+            return None
+        record_cache_lookup(self.counter.name, True)
+        return entry[1]
+
+    def set(self, key: Any, version: Optional[str], value: Any):
+        """Cache a value computed while ``version`` was current.
+
+        Callers read the version before loading the data, so a write that
+        lands in between leaves the entry under an already stale version.
+        """
+        if version is None:
+            return
+
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (version, value)
+
+
+class ResponseCache:
+    """A Redis-backed cache of serialized responses shared by all workers.
+
+    Keys embed the versions of the data a response depends on, so writes
+    invalidate entries by bumping a version; stale entries simply expire.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self, scope: str, params: Dict[str, Any], *versions: Optional[str]) -> Optional[str]:
+        """Build a key from normalized parameters, or None if a version is unknown."""
+        if any(version is None for version in versions):
+            return None
+
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        version_part = ".".join(str(version) for version in versions)
+        return f"qreserve:cache:{self.namespace}:{version_part}:{scope}:{digest}"
+
+    def get(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        try:
+            value = get_redis().get(key)
+        except RedisError:
+            return None
+        record_cache_lookup(self.namespace, value is not None)
+        return value
+
+    def set(self, key: Optional[str], value: str):
+        if key is None:
+            return
+        try:
+            get_redis().set(key, value, ex=self.ttl)
+        except RedisError:
+            pass
+
+
+category_versions = VersionCounter("categories")
+category_cache = VersionedCache(category_versions)
+
+ticket_versions = VersionCounter("tickets")
+ticket_list_cache = ResponseCache("ticket-list", ttl=settings.ticket_list_cache_ttl)
+
+user_versions = VersionCounter("users")
+agent_cache = VersionedCache(user_versions)
@@ -1,22 +1,58 @@
-from celery import Celery
-from .config import settings
-
-celery = Celery(
-    "qreserve",
-    broker=settings.celery_broker_url,
-    backend=settings.celery_result_backend,
-    include=["backend.app.services.notification_service"],
-)
-
-celery.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
-    task_track_started=True,
-    task_time_limit=30 * 60,
-    task_soft_time_limit=25 * 60,
-    worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=1000,
-) 
\ No newline at end of file
+from celery import Celery
+from .config import settings
+
+celery = Celery(
+    "qreserve",
+    broker=settings.celery_broker_url,
+    backend=settings.celery_result_backend,
+    include=[
+        "backend.app.services.notification_service",
+        "backend.app.services.attachment_service",
+        "backend.app.services.thumbnail_service",
+        "backend.app.services.ticket_service",
+        "backend.app.services.stats_service",
+        "backend.app.services.flow_service",
+        "backend.app.services.sla_service",
+        "backend.app.services.assignment_service",
+    ],
+)
+
+celery.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    task_track_started=True,
+    task_time_limit=30 * 60,
+    task_soft_time_limit=25 * 60,
+    worker_prefetch_multiplier=1,
+    worker_max_tasks_per_child=1000,
+)
+
+celery.conf.beat_schedule = {
+    "collect-orphaned-blobs": {
+        "task": "backend.app.services.attachment_service.collect_orphaned_blobs",
+        "schedule": 60 * 60,
+    },
+    "prune-ticket-tombstones": {
+        "task": "backend.app.services.ticket_service.prune_ticket_tombstones",
+        "schedule": 24 * 60 * 60,
+    },
+    "rebuild-ticket-stats": {
+        "task": "backend.app.services.stats_service.rebuild_ticket_stats",
+        "schedule": 60 * 60,
+    },
+    "aggregate-ticket-flow": {
+        "task": "backend.app.services.flow_service.aggregate_ticket_flow",
+        "schedule": 15 * 60,
+    },
+    "escalate-sla-breaches": {
+        "task": "backend.app.services.sla_service.escalate_sla_breaches",
+        "schedule": 60,
+    },
+    "rebuild-agent-load": {
+        "task": "backend.app.services.assignment_service.rebuild_agent_load",
+        "schedule": 15 * 60,
+    },
+}
\ No newline at end of file
@@ -1,69 +1,112 @@
-from typing import Optional
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlmodel import Session, select
-from .security import authenticate_user
-from .config import settings
-from ..db.session import get_session
-from ..models.user import User, UserRole
-
-security = HTTPBearer()
-
-
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    session: Session = Depends(get_session),
-) -> User:
-    """Get current authenticated user."""
-    user_data = authenticate_user(credentials.credentials)
-    user = session.exec(select(User).where(User.id == user_data["user_id"])).first()
-    
-    if not user or not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found or inactive",
-        )
-    
-    return user
-
-
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    """Get current active user."""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user",
-        )
-    return current_user
-
-
-def require_role(required_role: UserRole):
-    """Require specific user role."""
-    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
-        if current_user.role != required_role and current_user.role != UserRole.admin:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Role {required_role} required",
-            )
-        return current_user
-    return role_checker
-
-
-def require_agent_or_admin(current_user: User = Depends(get_current_active_user)) -> User:
-    """Require agent or admin role."""
-    if current_user.role not in [UserRole.agent, UserRole.admin]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Agent or admin role required",
-        )
-    return current_user
-
-
-def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
-    """Require admin role."""
-    if current_user.role != UserRole.admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin role required",
-        )
-    return current_user 
\ No newline at end of file
+from typing import Optional
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlmodel import Session, select
+from .security import authenticate_user, verify_token
+from .config import settings
+from .timing import timed
+from ..db.session import engine, get_session
+from ..models.user import User, UserRole
+
+security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    session: Session = Depends(get_session),
+) -> User:
+    """Get current authenticated user."""
+    user_data = authenticate_user(credentials.credentials)
+    with timed("user"):
+        user = session.exec(select(User).where(User.id == user_data["user_id"])).first()
+    
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+        )
+    
+    return user
+
+
+def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+    """Get current active user."""
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user",
+        )
+    return current_user
+
+
+def require_role(required_role: UserRole):
+    """Require specific user role."""
+    def role_checker(current_user: User = Depends(get_current_active_user)) -> User:
+        if current_user.role != required_role and current_user.role != UserRole.admin:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Role {required_role} required",
+            )
+        return current_user
+    return role_checker
+
+
+def require_agent_or_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Require agent or admin role."""
+    if current_user.role not in [UserRole.agent, UserRole.admin]:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Agent or admin role required",
+        )
+    return current_user
+
+
+def require_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Require admin role."""
+    if current_user.role != UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required",
+        )
+    return current_user
+
+
+def get_stream_user(
+    token: Optional[str] = Query(None, description="Stream token from POST /events/token"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> User:
+    """Authenticate a long-lived streaming request.
+    
+    Browsers' EventSource cannot send an Authorization header, so a stream
+    token may be passed as a query parameter instead. Access tokens are only
+    accepted in the header: URLs end up in logs and history. The user is
+    loaded in a short-lived session so no database connection is held while
+    streaming.
+    """
+    if credentials:
+        user_id = authenticate_user(credentials.credentials)["user_id"]
+    elif token:
+        payload = verify_token(token)
+        if payload is None or payload.get("type") != "stream" or payload.get("sub") is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired stream token",
+            )
+        user_id = payload["sub"]
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+        )
+    
+    with Session(engine) as session:
+        user = session.exec(select(User).where(User.id == user_id)).first()
+    
+    if not user or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found or inactive",
+        )
+    
+    return user
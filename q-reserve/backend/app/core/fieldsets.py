@@ -0,0 +1,45 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(
+    fields: Optional[str],
+    view: Optional[str],
+    allowed: Sequence[str],
+    compact: Sequence[str],
+) -> Optional[List[str]]:
+    """Resolve the ``fields`` / ``view`` query parameters of a list endpoint.
+
+    Returns the requested field names in a stable order, always including
+    ``id``, or None when the full representation was asked for.
+    """
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+            )
+    elif view == "compact":
+        requested = set(compact)
+    else:
+        return None
+
+    requested.add("id")
+    return [name for name in allowed if name in requested]
+
+
+def load_only_columns(model, fields: Sequence[str], extra: Sequence[str] = ()):
+    """Build a ``load_only`` option for the table columns among ``fields``.
+
+    Columns that are not requested are deferred and never read from the
+    database. ``extra`` names columns needed internally, such as foreign
+    keys for relationships that will be loaded.
+    """
+    columns = model.__table__.columns.keys()
+    names = [name for name in list(fields) + list(extra) if name in columns]
+    return load_only(*[getattr(model, name) for name in dict.fromkeys(names)])
+
@@ -0,0 +1,66 @@
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from .admission import AdmissionController
+from .config import settings
+from .redis import get_redis
+
+_cached_checks: Optional[dict] = None
+_checked_at = 0.0
+
+
+def check_dependencies(engine: Engine) -> dict:
+    """Ping the database and Redis, reusing the result for a few seconds.
+
+    Probes from several load balancers then cost at most one round trip
+    per dependency and interval. Blocking: call from a thread.
+    """
+    global _cached_checks, _checked_at
+    now = time.monotonic()
+    if _cached_checks is not None and now - _checked_at < settings.health_check_cache_seconds:
+        return _cached_checks
+
+    checks = {}
+    started = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        checks["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as exc:
+        checks["database"] = {"ok": False, "error": type(exc).__name__}
+
+    started = time.perf_counter()
+    try:
+        get_redis().ping()
+        checks["redis"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    except RedisError as exc:
+        checks["redis"] = {"ok": False, "error": type(exc).__name__}
+
+    _cached_checks, _checked_at = checks, now
+    return checks
+
+
+def readiness(engine: Engine, controller: Optional[AdmissionController]) -> dict:
+    """Dependency checks plus pool and admission saturation.
+
+    Only the database is required; without Redis caches and events degrade
+    but requests are still served.
+    """
+    checks = check_dependencies(engine)
+    pool = engine.pool
+    report = {
+        "status": "ready" if checks["database"]["ok"] else "unavailable",
+        "checks": checks,
+        "pool": {
+            "size": pool.size() if hasattr(pool, "size") else None,
+            "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+            "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+        },
+    }
+    if controller is not None:
+        report["load"] = controller.snapshot()
+    return report
@@ -0,0 +1,223 @@
+import atexit
+import glob
+import os
+import shutil
+import socket
+import time
+
+import redis
+from celery.signals import after_task_publish, before_task_publish
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from redis.exceptions import RedisError
+from sqlalchemy.pool import QueuePool
+
+from .config import settings
+
+# Set by the process manager to a directory shared by all workers; every
+# process then writes its samples there and /metrics aggregates them.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+if MULTIPROCESS:
+    # Containers sharing the directory all run their first process as PID 1,
+    # so each one writes to a subdirectory named after its host. The root is
+    # remembered for child processes, which inherit the rewritten variable.
+    _FIRST_PROCESS = "PROMETHEUS_MULTIPROC_ROOT" not in os.environ
+    METRICS_ROOT = os.environ.setdefault("PROMETHEUS_MULTIPROC_ROOT", os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = os.path.join(METRICS_ROOT, socket.gethostname())
+    if _FIRST_PROCESS:
+        # Files left by the previous run of this container belong to dead
+        # processes; its workers have not started yet
+        shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+    # Drop this process's live gauges (in-flight requests, pool usage) on exit
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+REQUEST_LATENCY = Histogram(
+    "qreserve_http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "qreserve_http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "qreserve_db_pool_checkouts_total",
+    "Connections checked out of the database pool",
+)
+DB_POOL_WAIT = Histogram(
+    "qreserve_db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+DB_POOL_IN_USE = Gauge(
+    "qreserve_db_pool_connections_in_use",
+    "Database connections currently checked out",
+    multiprocess_mode="livesum",
+)
+CACHE_REQUESTS = Counter(
+    "qreserve_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+TASK_PUBLISH_LATENCY = Histogram(
+    "qreserve_celery_publish_duration_seconds",
+    "Time taken to enqueue a Celery task",
+    ["task"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+REQUESTS_SHED = Counter(
+    "qreserve_http_requests_shed_total",
+    "Requests rejected with 503 by admission control, by priority",
+    ["priority"],
+)
+EMAILS_SENT = Counter(
+    "qreserve_emails_total",
+    "Notification emails by outcome (sent or failed)",
+    ["outcome"],
+)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports checkout counts, wait time and connections in use.
+
+    ``wait_average`` is a moving average of recent checkout waits, used by
+    admission control.
+    """
+
+    wait_average = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        connection = super()._do_get()
+        waited = time.perf_counter() - started
+        self.wait_average += 0.1 * (waited - self.wait_average)
+        DB_POOL_WAIT.observe(waited)
+        DB_POOL_CHECKOUTS.inc()
+        DB_POOL_IN_USE.inc()
+        return connection
+
+    def _do_return_conn(self, record):
+        DB_POOL_IN_USE.dec()
+        super()._do_return_conn(record)
+
+
+_publish_started = {}
+
+
+def _before_task_publish(sender=None, headers=None, **kwargs):
+    _publish_started[headers["id"]] = time.perf_counter()
+
+
+def _after_task_publish(sender=None, headers=None, **kwargs):
+    started = _publish_started.pop(headers["id"], None)
+    if started is not None:
+        TASK_PUBLISH_LATENCY.labels(sender).observe(time.perf_counter() - started)
+
+
+def install_celery_metrics():
+    """Record how long enqueueing each task takes."""
+    before_task_publish.connect(_before_task_publish, weak=False)
+    after_task_publish.connect(_after_task_publish, weak=False)
+
+
+class CeleryQueueCollector:
+    """Reports the length of each Celery queue in the Redis broker at scrape time."""
+
+    def __init__(self, queues):
+        self.queues = queues
+
+    def collect(self):
+        gauge = GaugeMetricFamily("qreserve_celery_queue_length", "Tasks waiting in a Celery queue", labels=["queue"])
+        try:
+            client = redis.Redis.from_url(settings.celery_broker_url, socket_timeout=settings.redis_socket_timeout)
+            for queue in self.queues:
+                gauge.add_metric([queue], client.llen(queue))
+        except RedisError:
+            return
+        yield gauge
+
+
+def mark_process_dead(pid: int):
+    """Drop the live gauges of a worker that exited, from the process manager.
+
+    Workers also do this themselves on a normal exit, but not when they are
+    killed.
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+
+class _SharedDirectoryCollector:
+    """Merges the samples of every process in every container sharing the metrics root."""
+
+    def collect(self):
+        files = glob.glob(os.path.join(METRICS_ROOT, "*", "*.db"))
+        return multiprocess.MultiProcessCollector.merge(files, accumulate=True)
+
+
+class _ProcessCollector:
+    """Exposes this process's default registry inside a per-scrape registry."""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+def render_metrics(queues) -> bytes:
+    """Serialize all metrics, aggregated across worker processes if configured."""
+    registry = CollectorRegistry()
+    if MULTIPROCESS:
+        registry.register(_SharedDirectoryCollector())
+    else:
+        registry.register(_ProcessCollector())
+    registry.register(CeleryQueueCollector(queues))
+    return generate_latest(registry)
+
+
+class MetricsMiddleware:
+    """Record latency per route template and status, and requests in flight."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Templates rather than raw paths keep label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(method, route, str(status_code)).observe(time.perf_counter() - started)
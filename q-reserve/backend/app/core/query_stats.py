@@ -0,0 +1,94 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """SQL statements run, and time spent running them, in one unit of work."""
+
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Return the stats being recorded for the current request, if any."""
+    return _current.get()
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryStats]:
+    """Count the statements executed inside the block.
+
+    Statements are attributed through a context variable, so concurrent
+    requests each see only their own queries. A nested block shares the
+    outer block's stats. The engine must have been passed to
+    ``install_query_listeners``.
+    """
+    stats = _current.get()
+    if stats is not None:
+        yield stats
+        return
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get("query_started"):
+        stats.count += 1
+        stats.seconds += time.perf_counter() - conn.info["query_started"].pop()
+
+
+def install_query_listeners(engine: Engine):
+    """Attach the statement counters to an engine (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Report each request's query count and DB time in response headers.
+
+    Adds ``X-Query-Count`` and ``X-DB-Time`` (milliseconds). Statements run
+    while a streaming body is produced are not included, as the headers
+    have been sent by then.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with record_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(stats.count).encode()))
+                    headers.append((b"x-db-time", f"{stats.seconds * 1000:.1f}".encode()))
+                    message = dict(message, headers=headers)
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
@@ -0,0 +1,22 @@
+import redis
+
+from .config import settings
+
+_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the shared Redis client for this process.
+
+    Timeouts are short because every caller treats Redis as an optimisation
+    and falls back to the database when it is unavailable.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_timeout=settings.redis_socket_timeout,
+            socket_connect_timeout=settings.redis_socket_timeout,
+        )
+    return _client
@@ -0,0 +1,216 @@
+import os
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request, Response, status
+from starlette.types import Receive, Scope, Send
+
+from .config import settings
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Build a 304 response carrying the validators the client already has."""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def etag_response(content: bytes, etag: str, media_type: str = "application/json") -> Response:
+    """Return pre-serialized content with an ETag clients must revalidate."""
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+def parse_range(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``Range`` header into an inclusive (start, end) pair.
+
+    Returns None when the whole file should be sent, which includes
+    multi-range requests (servers may ignore those). Raises ValueError for
+    ranges that cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+
+    ranges = range_header[len("bytes="):].split(",")
+    if len(ranges) != 1:
+        return None
+
+    start_text, _, end_text = ranges[0].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            suffix = int(end_text)
+            if suffix == 0:
+                raise ValueError("Empty suffix range")
+            start = max(file_size - suffix, 0)
+            end = file_size - 1
+    except ValueError:
+        raise ValueError("Malformed range")
+
+    if start >= file_size or start > end:
+        raise ValueError("Range not satisfiable")
+
+    return start, min(end, file_size - 1)
+
+
+class FileRangeResponse(Response):
+    """Send a file, or a byte range of it, without loading it into memory.
+
+    Uses the ASGI ``http.response.zerocopysend`` extension (sendfile) when
+    the server offers it, and otherwise streams fixed-size chunks read in a
+    worker thread.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        length: int,
+        status_code: int = status.HTTP_200_OK,
+        headers: Optional[dict] = None,
+        media_type: Optional[str] = None,
+    ):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+
+        if scope["method"].upper() == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, "rb") as f:
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": f.fileno(),
+                        "offset": self.start,
+                        "count": self.length,
+                        "more_body": False,
+                    }
+                )
+            return
+
+        async with await anyio.open_file(self.path, "rb") as f:
+            await f.seek(self.start)
+            remaining = self.length
+            more_body = True
+            while more_body:
+                chunk = await f.read(min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                more_body = bool(chunk) and remaining > 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+def content_disposition(filename: str, inline: bool = False) -> str:
+    """Build a Content-Disposition header value that is safe for any filename."""
+    disposition = "inline" if inline else "attachment"
+    return f"{disposition}; filename*=UTF-8''{quote(filename)}"
+
+
+def file_download_response(
+    request: Request,
+    relative_path: str,
+    media_type: str,
+    etag: str,
+    filename: Optional[str] = None,
+    inline: bool = False,
+    cache_control: str = "private, max-age=86400",
+) -> Response:
+    """Serve a file from upload_dir after access checks have been done.
+
+    Conditional requests are answered with 304. Behind nginx (when
+    ``x_accel_redirect`` is enabled) the transfer is handed off with an
+    ``X-Accel-Redirect`` header to an internal location, so nginx does the
+    sendfile and Range handling. Otherwise the file is sent directly with
+    Range support.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, cache_control)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+    if filename:
+        headers["Content-Disposition"] = content_disposition(filename, inline=inline)
+
+    if settings.x_accel_redirect:
+        headers["X-Accel-Redirect"] = settings.x_accel_redirect_prefix + quote(
+            relative_path.replace(os.sep, "/")
+        )
+        return Response(headers=headers, media_type=media_type)
+
+    path = os.path.join(settings.upload_dir, relative_path)
+    try:
+        file_size = os.stat(path).st_size
+    except FileNotFoundError:
+        return Response(status_code=status.HTTP_404_NOT_FOUND)
+
+    # A range is only honoured if the client's copy is still current
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, file_size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+
+    if byte_range is None:
+        return FileRangeResponse(path, 0, file_size, headers=headers, media_type=media_type)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    return FileRangeResponse(
+        path,
+        start,
+        end - start + 1,
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        headers=headers,
+        media_type=media_type,
+    )
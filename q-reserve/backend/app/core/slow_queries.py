@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, List, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "qreserve:slow-queries"
+WINDOW_HOURS = 24  # how far back the top list can look
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|%s")
+_IN_LIST = re.compile(r"\bIN \((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+# SELECTs that lock rows or advance sequences must not be executed again
+_SIDE_EFFECTS = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+|KEY\s+)?(?:UPDATE|SHARE)\b|\b(?:nextval|setval)\s*\(", re.IGNORECASE)
+
+# Scope of the request being handled, for attributing statements to routes
+_request_scope: ContextVar[Optional[dict]] = ContextVar("slow_query_request_scope", default=None)
+
+# One EXPLAIN at a time, in the background; plans that arrive while one is
+# running are skipped rather than queued
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_explain_running = threading.Lock()
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a statement to its shape: literals and placeholders become ``?``."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def redact_value(value: Any) -> Any:
+    """Keep values that say something about the plan; hide anything textual."""
+    if value is None or isinstance(value, (bool, int, float, Decimal)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, str)):
+        return f"<redacted {len(value)} chars>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {name: redact_value(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(value) if isinstance(value, (dict, list, tuple)) else redact_value(value)
+                for value in parameters]
+    return redact_value(parameters)
+
+
+def current_route() -> Optional[str]:
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def _hour_key(kind: str, hour: int) -> str:
+    return f"{KEY_PREFIX}:{kind}:{hour}"
+
+
+def record_slow_query(fp: str, normalized: str, route: Optional[str], duration_ms: float, parameters: Any):
+    """Add one occurrence to the shared top list, bucketed by hour."""
+    hour = int(time.time() // 3600)
+    ttl = (WINDOW_HOURS + 1) * 3600
+    detail_key = f"{KEY_PREFIX}:detail:{fp}"
+    try:
+        pipe = get_redis().pipeline()
+        pipe.zincrby(_hour_key("time", hour), duration_ms, fp)
+        pipe.zincrby(_hour_key("count", hour), 1, fp)
+        pipe.zadd(_hour_key("max", hour), {fp: duration_ms}, gt=True)
+        for kind in ("time", "count", "max"):
+            pipe.expire(_hour_key(kind, hour), ttl)
+        pipe.hset(detail_key, mapping={
+            "sql": normalized,
+            "route": route or "",
+            "last_parameters": json.dumps(parameters, default=str),
+            "last_seen": datetime.utcnow().isoformat(),
+        })
+        pipe.expire(detail_key, ttl)
+        pipe.execute()
+    except RedisError:
+        pass
+
+
+def _redact_plan(plan: str) -> str:
+    # Filter conditions in a plan show the literal values that were bound
+    return _STRING_LITERAL.sub("'?'", plan)
+
+
+def _capture_plan(engine: Engine, fp: str, statement: str, parameters: Any):
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SET LOCAL transaction_read_only = on")
+            conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.slow_query_explain_timeout_ms)}")
+            rows = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).all()
+            conn.rollback()
+        plan = _redact_plan("\n".join(row[0] for row in rows))
+        get_redis().hset(f"{KEY_PREFIX}:detail:{fp}", mapping={
+            "plan": plan,
+            "plan_captured_at": datetime.utcnow().isoformat(),
+        })
+        logger.info("query plan for %s:\n%s", fp, plan)
+    except Exception:
+        logger.warning("Could not capture the plan of slow query %s", fp, exc_info=True)
+    finally:
+        _explain_running.release()
+
+
+def maybe_explain(engine: Engine, fp: str, statement: str, parameters: Any):
+    """Capture the plan of a slow SELECT in the background, for a sample of them.
+
+    EXPLAIN ANALYZE executes the statement again, so only PostgreSQL reads
+    qualify: SELECTs that lock rows (``FOR UPDATE``/``FOR SHARE``) or call
+    ``nextval`` are skipped, and the rest run with a statement timeout in a
+    read-only, rolled-back transaction.
+    """
+    if engine.dialect.name != "postgresql" or not statement.lstrip()[:6].upper() == "SELECT":
+        return
+    if _SIDE_EFFECTS.search(statement):
+        return
+    if random.random() >= settings.slow_query_explain_sample_rate:
+        return
+    if not _explain_running.acquire(blocking=False):
+        return
+    _explain_executor.submit(_capture_plan, engine, fp, statement, parameters)
+
+
+# The start time lives on the execution context, which is discarded with
+# the statement, so a statement that fails leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._slow_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_slow_query_started", None)
+    if started is None:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000
+    if duration_ms < settings.slow_query_threshold_ms or statement.startswith("EXPLAIN"):
+        return
+
+    normalized = normalize_sql(statement)
+    fp = fingerprint(normalized)
+    route = current_route()
+    redacted = redact_parameters(parameters)
+    logger.warning("slow query %s", json.dumps({
+        "fingerprint": fp,
+        "duration_ms": round(duration_ms, 1),
+        "route": route,
+        "sql": normalized,
+        "parameters": redacted,
+    }, default=str))
+
+    record_slow_query(fp, normalized, route, duration_ms, redacted)
+    if not executemany:
+        maybe_explain(conn.engine, fp, statement, parameters)
+
+
+def install_slow_query_log(engine: Engine):
+    """Log statements slower than ``slow_query_threshold_ms`` (idempotent)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def top_slow_queries(hours: int = WINDOW_HOURS, limit: int = 20) -> List[dict]:
+    """Slow statement fingerprints of the last ``hours``, by total time spent."""
+    hours = max(1, min(hours, WINDOW_HOURS))
+    current = int(time.time() // 3600)
+    client = get_redis()
+
+    totals, counts, maxima = {}, {}, {}
+    for hour in range(current - hours + 1, current + 1):
+        for fp, value in client.zrange(_hour_key("time", hour), 0, -1, withscores=True):
+            totals[fp] = totals.get(fp, 0.0) + value
+        for fp, value in client.zrange(_hour_key("count", hour), 0, -1, withscores=True):
+            counts[fp] = counts.get(fp, 0) + int(value)
+        for fp, value in client.zrange(_hour_key("max", hour), 0, -1, withscores=True):
+            maxima[fp] = max(maxima.get(fp, 0.0), value)
+
+    top = sorted(totals, key=totals.get, reverse=True)[:limit]
+    pipe = client.pipeline()
+    for fp in top:
+        pipe.hgetall(f"{KEY_PREFIX}:detail:{fp}")
+    details = pipe.execute()
+
+    result = []
+    for fp, detail in zip(top, details):
+        result.append({
+            "fingerprint": fp,
+            "count": counts.get(fp, 0),
+            "total_ms": round(totals[fp], 1),
+            "mean_ms": round(totals[fp] / max(counts.get(fp, 1), 1), 1),
+            "max_ms": round(maxima.get(fp, 0.0), 1),
+            "sql": detail.get("sql"),
+            "route": detail.get("route") or None,
+            "last_parameters": json.loads(detail["last_parameters"]) if detail.get("last_parameters") else None,
+            "last_seen": detail.get("last_seen"),
+            "plan": detail.get("plan"),
+            "plan_captured_at": detail.get("plan_captured_at"),
+        })
+    return result
+
+
+class SlowQueryRouteMiddleware:
+    """Remember the request being handled so slow statements name their route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
@@ -0,0 +1,133 @@
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from celery.signals import after_task_publish, before_task_publish
+
+from .config import settings
+from .query_stats import record_queries
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTimings:
+    """Time spent per phase (JWT decoding, user lookup, ...) in one request."""
+
+    __slots__ = ("phases", "publish_started")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.publish_started: Optional[float] = None
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+class timed:
+    """Add the time spent in a block to a phase of the current request.
+
+    Outside a timed request (or with Server-Timing disabled) this costs one
+    context variable lookup.
+    """
+
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.started)
+
+
+def _before_task_publish(**kwargs):
+    timings = _current.get()
+    if timings is not None:
+        timings.publish_started = time.perf_counter()
+
+
+def _after_task_publish(**kwargs):
+    timings = _current.get()
+    if timings is not None and timings.publish_started is not None:
+        timings.add("celery", time.perf_counter() - timings.publish_started)
+        timings.publish_started = None
+
+
+def install_celery_timing():
+    """Time task enqueueing as the "celery" phase of the current request."""
+    before_task_publish.connect(_before_task_publish, weak=False)
+    after_task_publish.connect(_after_task_publish, weak=False)
+
+
+def server_timing_header(phases: Dict[str, float], query_count: int) -> str:
+    entries = []
+    for name, seconds in phases.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if name == "db":
+            entry += f';desc="{query_count} queries"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+class ServerTimingMiddleware:
+    """Emit a Server-Timing header breaking each request down by phase.
+
+    Phases are recorded with ``timed`` blocks in the code paths worth
+    watching; SQL time comes from the query statistics listeners. A sample
+    of requests (``server_timing_log_sample_rate``) is also logged as a
+    structured record.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status_code = None
+
+        try:
+            with record_queries() as stats:
+                async def send_with_timing(message):
+                    nonlocal status_code
+                    if message["type"] == "http.response.start":
+                        status_code = message["status"]
+                        phases = dict(timings.phases, db=stats.seconds, total=time.perf_counter() - started)
+                        headers = list(message.get("headers", []))
+                        headers.append((b"server-timing", server_timing_header(phases, stats.count).encode()))
+                        message = dict(message, headers=headers)
+                    await send(message)
+
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+        if random.random() < settings.server_timing_log_sample_rate:
+            route = scope.get("route")
+            logger.info("request timing %s", json.dumps({
+                "method": scope["method"],
+                "path": getattr(route, "path", scope["path"]),
+                "status": status_code,
+                "queries": stats.count,
+                "phases_ms": {
+                    name: round(seconds * 1000, 2)
+                    for name, seconds in dict(timings.phases, db=stats.seconds).items()
+                },
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+            }))
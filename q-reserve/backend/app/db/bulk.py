@@ -0,0 +1,89 @@
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Table, insert, text
+from sqlmodel import Session
+
+
+def is_postgresql(session: Session) -> bool:
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def copy_value(value: Any) -> str:
+    """Format a value for PostgreSQL's COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, Enum):
+        value = value.value
+    elif isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_rows(session: Session, table: Table, rows: List[Dict[str, Any]]):
+    """Load rows with COPY FROM STDIN inside the session's transaction.
+
+    Every row must have the same keys.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def allocate_ids(session: Session, table: Table, count: int) -> List[int]:
+    """Reserve ``count`` ids from a PostgreSQL table's id sequence."""
+    return list(
+        session.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": table.name, "count": count},
+        ).scalars()
+    )
+
+
+def bulk_insert(
+    session: Session, table: Table, rows: List[Dict[str, Any]], return_ids: bool = False
+) -> Optional[List[int]]:
+    """Insert many rows as fast as the database allows.
+
+    On PostgreSQL rows are loaded with COPY, with ids reserved from the
+    sequence up front when they are needed. Elsewhere a single executemany
+    INSERT is used (with RETURNING for the ids). Returned ids are in the
+    order of ``rows``.
+    """
+    if not rows:
+        return [] if return_ids else None
+
+    if is_postgresql(session):
+        ids = None
+        if return_ids:
+            ids = allocate_ids(session, table, len(rows))
+            for row, row_id in zip(rows, ids):
+                row["id"] = row_id
+        copy_rows(session, table, rows)
+        return ids
+
+    if return_ids:
+        result = session.execute(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True), rows
+        )
+        return list(result.scalars())
+
+    session.execute(insert(table), rows)
+    return None
@@ -1,27 +1,36 @@
-from sqlmodel import SQLModel, create_engine, Session
-from .init_db import init_db
-from ..core.config import settings
-
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
-
-
-def get_session():
-    """Get database session."""
-    with Session(engine) as session:
-        yield session
-
-
-def create_db_and_tables():
-    """Create database tables."""
-    SQLModel.metadata.create_all(engine)
-    init_db()
-
-
-def init():
-    """Initialize database."""
+from sqlmodel import SQLModel, create_engine, Session
+from ..core.config import settings
+from ..core.metrics import InstrumentedQueuePool
+from ..core.slow_queries import install_slow_query_log
+
+# SQLite picks its own pool class; elsewhere report pool wait and usage
+pool_options = {} if settings.database_url.startswith("sqlite") else {"poolclass": InstrumentedQueuePool}
+
+engine = create_engine(
+    settings.database_url,
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_recycle=300,
+    **pool_options,
+)
+
+if settings.slow_query_log:
+    install_slow_query_log(engine)
+
+
+def get_session():
+    """Get database session."""
+    with Session(engine) as session:
+        yield session
+
+
+def create_db_and_tables():
+    """Create database tables."""
+    SQLModel.metadata.create_all(engine)
+    from .init_db import init_db  # imports the engine from this module
+    init_db()
+
+
+def init():
+    """Initialize database."""
     create_db_and_tables() 
\ No newline at end of file
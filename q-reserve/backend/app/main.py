@@ -1,60 +1,137 @@
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
-import os
-
-from .core.config import settings
-from .db.session import init
-from .api.v1 import auth, tickets, comments, categories, users
-
-# Create FastAPI app
-app = FastAPI(
-    title="q-reserve",
-    description="A lightweight helpdesk/ticketing system",
-    version="1.0.0",
-    docs_url="/docs",
-    redoc_url="/redoc",
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include API routes
-app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
-app.include_router(tickets.router, prefix="/api/v1/tickets", tags=["tickets"])
-app.include_router(comments.router, prefix="/api/v1/comments", tags=["comments"])
-app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
-app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
-
-# Setup static files and templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
-
-# Create uploads directory if it doesn't exist
-os.makedirs(settings.upload_dir, exist_ok=True)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database on startup."""
-    init()
-
-
-@app.get("/", response_class=HTMLResponse)
-async def root(request: Request):
-    """Serve the main application page."""
-    return templates.TemplateResponse("index.html", {"request": request})
-
-
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {"status": "healthy", "service": "q-reserve"} 
\ No newline at end of file
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+import os
+
+from .core.admission import AdmissionControlMiddleware, AdmissionController
+from .core.cache import version_listener
+from .core.celery import celery
+from .core.config import settings
+from .core.health import readiness
+from .core.metrics import MetricsMiddleware, install_celery_metrics, render_metrics
+from .core.query_stats import QueryStatsMiddleware, install_query_listeners
+from .core.slow_queries import SlowQueryRouteMiddleware
+from .core.timing import ServerTimingMiddleware, install_celery_timing
+from .db.session import engine, init
+from .models.attachment import AttachmentRead
+from .models.category import CategoryRead
+from .models.comment import CommentRead
+from .models.ticket import TicketList, TicketRead
+from .models.user import UserRead
+
+# The read models refer to each other by name; resolve them once all are
+# defined and before the routers copy them into response models
+for read_model in (TicketRead, TicketList):
+    read_model.update_forward_refs(UserRead=UserRead, CategoryRead=CategoryRead)
+CommentRead.update_forward_refs(UserRead=UserRead, CommentRead=CommentRead)
+AttachmentRead.update_forward_refs(UserRead=UserRead)
+
+from .api.v1 import admin, auth, tickets, attachments, comments, categories, users, events, stats
+
+# Create FastAPI app
+app = FastAPI(
+    title="q-reserve",
+    description="A lightweight helpdesk/ticketing system",
+    version="1.0.0",
+    docs_url="/docs",
+    redoc_url="/redoc",
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.cors_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Per-request SQL statement counts for spotting N+1 queries
+if settings.query_stats_headers:
+    install_query_listeners(engine)
+    app.add_middleware(QueryStatsMiddleware)
+
+# Per-request phase breakdown (JWT, user lookup, SQL, serialization, Celery)
+if settings.server_timing:
+    install_query_listeners(engine)
+    install_celery_timing()
+    app.add_middleware(ServerTimingMiddleware)
+
+# Lets the slow query log name the route a statement came from
+if settings.slow_query_log:
+    app.add_middleware(SlowQueryRouteMiddleware)
+
+# Shed load with fast 503s instead of letting requests queue on the pool
+admission_controller = None
+if settings.admission_control:
+    admission_controller = AdmissionController(pool_wait=lambda: getattr(engine.pool, "wait_average", 0.0))
+    app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+# Prometheus metrics, served at /metrics; added last so it times everything
+install_celery_metrics()
+app.add_middleware(MetricsMiddleware)
+
+# Include API routes
+app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
+app.include_router(tickets.router, prefix="/api/v1/tickets", tags=["tickets"])
+app.include_router(attachments.router, prefix="/api/v1/tickets", tags=["attachments"])
+app.include_router(comments.router, prefix="/api/v1/comments", tags=["comments"])
+app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
+app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["events"])
+app.include_router(stats.router, prefix="/api/v1/stats", tags=["stats"])
+app.include_router(admin.router, prefix="/api/v1/admin", tags=["admin"])
+
+# Setup static files and templates
+app.mount("/static", StaticFiles(directory="static"), name="static")
+templates = Jinja2Templates(directory="templates")
+
+# Create uploads directory if it doesn't exist
+os.makedirs(settings.upload_dir, exist_ok=True)
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Initialize database and cache invalidation on startup."""
+    init()
+    version_listener.start()
+
+
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the main application page."""
+    return templates.TemplateResponse("index.html", {"request": request})
+
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    return {"status": "healthy", "service": "q-reserve"}
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving; checks nothing else."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: database and Redis reachability, pool and load saturation.
+    
+    Dependency checks are cached for a few seconds. Returns 503 when the
+    database cannot be reached.
+    """
+    report = await run_in_threadpool(readiness, engine, admission_controller)
+    status_code = 200 if report["status"] == "ready" else 503
+    return JSONResponse(report, status_code=status_code)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for every worker process."""
+    return Response(render_metrics([celery.conf.task_default_queue]), media_type=CONTENT_TYPE_LATEST)
@@ -1,34 +1,48 @@
-from datetime import datetime
-from typing import Optional
-from sqlmodel import SQLModel, Field, Relationship
-
-
-class AttachmentBase(SQLModel):
-    filename: str
-    file_path: str
-    file_size: int
-    mime_type: str
-    ticket_id: int = Field(foreign_key="tickets.id")
-
-
-class Attachment(AttachmentBase, table=True):
-    __tablename__ = "attachments"
-    
-    id: Optional[int] = Field(default=None, primary_key=True)
-    uploaded_by_id: int = Field(foreign_key="users.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    
-    # Relationships
-    uploaded_by: "User" = Relationship()
-    ticket: "Ticket" = Relationship(back_populates="attachments")
-
-
-class AttachmentCreate(AttachmentBase):
-    pass
-
-
-class AttachmentRead(AttachmentBase):
-    id: int
-    uploaded_by_id: int
-    created_at: datetime
+from datetime import datetime
+from typing import Optional
+from sqlmodel import SQLModel, Field, Relationship
+
+
+class AttachmentBase(SQLModel):
+    filename: str
+    file_path: str
+    file_size: int
+    mime_type: str
+    content_hash: Optional[str] = Field(default=None, index=True)
+    ticket_id: int = Field(foreign_key="tickets.id")
+
+
+class Attachment(AttachmentBase, table=True):
+    __tablename__ = "attachments"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    uploaded_by_id: int = Field(foreign_key="users.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    uploaded_by: "User" = Relationship()
+    ticket: "Ticket" = Relationship(back_populates="attachments")
+
+
+class AttachmentBlob(SQLModel, table=True):
+    """A stored file, shared by every attachment with the same content."""
+    __tablename__ = "attachment_blobs"
+    
+    content_hash: str = Field(primary_key=True, max_length=64)
+    file_path: str
+    file_size: int
+    mime_type: str
+    ref_count: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class AttachmentCreate(AttachmentBase):
+    pass
+
+
+class AttachmentRead(AttachmentBase):
+    id: int
+    uploaded_by_id: int
+    created_at: datetime
     uploaded_by: "UserRead" 
\ No newline at end of file
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import UniqueConstraint
+from sqlmodel import SQLModel, Field
+from .ticket import TicketPriority
+
+
+class SlaPolicyBase(SQLModel):
+    priority: TicketPriority
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")  # None applies to every category
+    resolution_hours: float = Field(gt=0)
+
+
+class SlaPolicy(SlaPolicyBase, table=True):
+    """Time to resolution allowed for a priority, optionally in one category.
+    
+    Without a matching policy the target comes from ``sla_resolution_hours``.
+    """
+    __tablename__ = "sla_policies"
+    __table_args__ = (
+        UniqueConstraint("priority", "category_id", name="uq_sla_policy"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SlaPolicyCreate(SlaPolicyBase):
+    pass
+
+
+class SlaPolicyRead(SlaPolicyBase):
+    id: int
+    updated_at: datetime
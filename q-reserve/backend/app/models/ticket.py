@@ -1,85 +1,291 @@
-from datetime import datetime
-from enum import Enum
-from typing import Optional
-from sqlmodel import SQLModel, Field, Relationship
-
-
-class TicketStatus(str, Enum):
-    open = "open"
-    in_progress = "in_progress"
-    resolved = "resolved"
-    closed = "closed"
-
-
-class TicketPriority(str, Enum):
-    low = "low"
-    medium = "medium"
-    high = "high"
-    urgent = "urgent"
-
-
-class TicketBase(SQLModel):
-    subject: str = Field(index=True)
-    description: str
-    status: TicketStatus = TicketStatus.open
-    priority: TicketPriority = TicketPriority.medium
-    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
-    assignee_id: Optional[int] = Field(default=None, foreign_key="users.id")
-
-
-class Ticket(TicketBase, table=True):
-    __tablename__ = "tickets"
-    
-    id: Optional[int] = Field(default=None, primary_key=True)
-    owner_id: int = Field(foreign_key="users.id")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-    last_activity: datetime = Field(default_factory=datetime.utcnow)
-    
-    # Relationships
-    owner: "User" = Relationship(back_populates="tickets", foreign_keys=[owner_id])
-    assignee: Optional["User"] = Relationship(back_populates="assigned_tickets", foreign_keys=[assignee_id])
-    category: Optional["Category"] = Relationship(back_populates="tickets")
-    comments: list["Comment"] = Relationship(back_populates="ticket")
-    votes: list["Vote"] = Relationship(back_populates="ticket")
-    attachments: list["Attachment"] = Relationship(back_populates="ticket")
-
-
-class TicketCreate(TicketBase):
-    pass
-
-
-class TicketUpdate(SQLModel):
-    subject: Optional[str] = None
-    description: Optional[str] = None
-    status: Optional[TicketStatus] = None
-    priority: Optional[TicketPriority] = None
-    category_id: Optional[int] = None
-    assignee_id: Optional[int] = None
-
-
-class TicketRead(TicketBase):
-    id: int
-    owner_id: int
-    created_at: datetime
-    updated_at: datetime
-    last_activity: datetime
-    owner: "UserRead"
-    assignee: Optional["UserRead"] = None
-    category: Optional["CategoryRead"] = None
-    comment_count: int = 0
-    vote_score: int = 0
-    user_vote: Optional[str] = None  # "up" or "down" or None
-
-
-class TicketList(TicketBase):
-    id: int
-    owner_id: int
-    created_at: datetime
-    updated_at: datetime
-    last_activity: datetime
-    owner: "UserRead"
-    assignee: Optional["UserRead"] = None
-    category: Optional["CategoryRead"] = None
-    comment_count: int = 0
-    vote_score: int = 0 
\ No newline at end of file
+from datetime import datetime
+from enum import Enum
+from typing import Dict, List, Optional
+from sqlalchemy import JSON, BigInteger, Column, Index, UniqueConstraint, event, text
+from sqlmodel import SQLModel, Field, Relationship
+
+
+class TicketStatus(str, Enum):
+    open = "open"
+    in_progress = "in_progress"
+    resolved = "resolved"
+    closed = "closed"
+
+
+class TicketPriority(str, Enum):
+    low = "low"
+    medium = "medium"
+    high = "high"
+    urgent = "urgent"
+
+
+# Statuses in which a ticket's SLA clock runs
+SLA_OPEN_STATUSES = (TicketStatus.open, TicketStatus.in_progress)
+SLA_PENDING_CONDITION = "sla_breached_at IS NULL AND status IN ('open', 'in_progress')"
+
+
+class TicketBase(SQLModel):
+    subject: str = Field(index=True)
+    description: str
+    status: TicketStatus = TicketStatus.open
+    priority: TicketPriority = TicketPriority.medium
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
+    assignee_id: Optional[int] = Field(default=None, foreign_key="users.id")
+
+
+class Ticket(TicketBase, table=True):
+    __tablename__ = "tickets"
+    __table_args__ = (
+        # Delta sync walks tickets in (last_activity, id) order
+        Index("ix_tickets_last_activity_id", "last_activity", "id"),
+        Index("ix_tickets_owner_id_last_activity", "owner_id", "last_activity"),
+        # Oldest backlog ticket per status for the dashboard
+        Index("ix_tickets_status_created_at", "status", "created_at"),
+        # Only tickets that can still breach their SLA, so the breach check
+        # reads the few that are due instead of every open ticket
+        Index(
+            "ix_tickets_sla_due_at_pending",
+            "sla_due_at",
+            postgresql_where=text(SLA_PENDING_CONDITION),
+            sqlite_where=text(SLA_PENDING_CONDITION),
+        ),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_id: int = Field(foreign_key="users.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)  # ticket fields changed
+    last_activity: datetime = Field(default_factory=datetime.utcnow)  # anything changed, incl. comments and votes
+    version: int = 1  # bumped on every change visible in TicketRead
+    external_id: Optional[str] = Field(default=None, unique=True)  # id in the helpdesk it was imported from
+    sla_due_at: Optional[datetime] = None  # resolution deadline from the SLA policy
+    sla_breached_at: Optional[datetime] = None  # set once, when the deadline passed while still open
+    
+    # Relationships
+    owner: "User" = Relationship(back_populates="tickets", sa_relationship_kwargs={"foreign_keys": "Ticket.owner_id"})
+    assignee: Optional["User"] = Relationship(back_populates="assigned_tickets", sa_relationship_kwargs={"foreign_keys": "Ticket.assignee_id"})
+    category: Optional["Category"] = Relationship(back_populates="tickets")
+    comments: list["Comment"] = Relationship(back_populates="ticket")
+    votes: list["Vote"] = Relationship(back_populates="ticket")
+    attachments: list["Attachment"] = Relationship(back_populates="ticket")
+
+
+@event.listens_for(Ticket, "before_update")
+def touch_ticket(mapper, connection, target):
+    """Keep updated_at and last_activity current on every ORM update."""
+    now = datetime.utcnow()
+    target.updated_at = now
+    target.last_activity = now
+
+
+class TicketTombstone(SQLModel, table=True):
+    """Records a deleted ticket so sync clients learn to drop it."""
+    __tablename__ = "ticket_tombstones"
+    
+    ticket_id: int = Field(primary_key=True)
+    owner_id: int = Field(index=True)
+    removed_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+@event.listens_for(Ticket, "after_delete")
+def record_ticket_tombstone(mapper, connection, target):
+    connection.execute(
+        TicketTombstone.__table__.insert().values(
+            ticket_id=target.id,
+            owner_id=target.owner_id,
+            removed_at=datetime.utcnow(),
+        )
+    )
+
+
+class TicketStatsRollup(SQLModel, table=True):
+    """Ticket counts per (status, priority, category, assignee) group.
+    
+    Kept current by ``stats_service`` as tickets are created and changed,
+    and rebuilt periodically from ``tickets`` to correct any drift. 0 stands
+    for "no category" / "unassigned" so every group has a unique key.
+    """
+    __tablename__ = "ticket_stats"
+    __table_args__ = (
+        UniqueConstraint("status", "priority", "category_id", "assignee_id", name="uq_ticket_stats_group"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: TicketStatus
+    priority: TicketPriority
+    category_id: int = 0
+    assignee_id: int = 0
+    ticket_count: int = 0
+    created_at_total: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))  # epoch seconds, for mean age
+
+
+class TicketStatusEvent(SQLModel, table=True):
+    """One status transition, the raw input for ticket flow metrics.
+    
+    ``from_status`` is None when the ticket was created. Not tied to
+    ``tickets`` by a foreign key so history survives ticket deletion.
+    """
+    __tablename__ = "ticket_status_events"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    ticket_id: int = Field(index=True)
+    category_id: Optional[int] = None
+    from_status: Optional[TicketStatus] = None
+    to_status: TicketStatus
+    occurred_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    resolution_seconds: Optional[int] = None  # ticket age when it was resolved or closed
+
+
+class TicketFlowBucket(SQLModel, table=True):
+    """Tickets created and resolved per category in one hour or day.
+    
+    Written by ``flow_service.aggregate_ticket_flow`` from status events;
+    0 stands for "no category".
+    """
+    __tablename__ = "ticket_flow_buckets"
+    __table_args__ = (
+        UniqueConstraint("interval", "bucket_start", "category_id", name="uq_ticket_flow_bucket"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    interval: str  # "hour" or "day"
+    bucket_start: datetime
+    category_id: int = 0
+    created: int = 0
+    resolved: int = 0
+    resolution_seconds_total: int = Field(default=0, sa_column=Column(BigInteger, nullable=False, default=0))
+    resolution_histogram: List[int] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))  # counts per RESOLUTION_BOUNDS_HOURS bin
+
+
+class TicketCreate(TicketBase):
+    pass
+
+
+class TicketUpdate(SQLModel):
+    subject: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TicketStatus] = None
+    priority: Optional[TicketPriority] = None
+    category_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+
+
+class TicketBulkChanges(SQLModel):
+    status: Optional[TicketStatus] = None
+    priority: Optional[TicketPriority] = None
+    category_id: Optional[int] = None
+    assignee_id: Optional[int] = None  # explicit null unassigns
+
+
+class TicketBulkFilter(SQLModel):
+    status: Optional[TicketStatus] = None
+    priority: Optional[TicketPriority] = None
+    category_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+    owner_id: Optional[int] = None
+
+
+class TicketBulkUpdate(SQLModel):
+    """Changes applied to explicit ticket ids or to every ticket matching a filter."""
+    ticket_ids: Optional[List[int]] = None
+    filter: Optional[TicketBulkFilter] = None
+    changes: TicketBulkChanges
+
+
+class TicketBulkResult(SQLModel):
+    ticket_id: int
+    result: str  # "updated", "unchanged" or "not_found"
+
+
+class TicketBulkResponse(SQLModel):
+    updated: int
+    results: List[TicketBulkResult]
+    has_more: bool = False  # filter matched more than bulk_update_max_tickets
+
+
+class TicketRead(TicketBase):
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+    last_activity: datetime
+    sla_due_at: Optional[datetime] = None
+    sla_breached_at: Optional[datetime] = None
+    owner: "UserRead"
+    assignee: Optional["UserRead"] = None
+    category: Optional["CategoryRead"] = None
+    comment_count: int = 0
+    vote_score: int = 0
+    user_vote: Optional[str] = None  # "up" or "down" or None
+
+
+class TicketList(TicketBase):
+    id: int
+    owner_id: int
+    created_at: datetime
+    updated_at: datetime
+    last_activity: datetime
+    sla_due_at: Optional[datetime] = None
+    sla_breached_at: Optional[datetime] = None
+    owner: "UserRead"
+    assignee: Optional["UserRead"] = None
+    category: Optional["CategoryRead"] = None
+    comment_count: int = 0
+    vote_score: int = 0
+
+
+class TicketChanges(SQLModel):
+    tickets: List[TicketList]
+    removed: List[int]  # tickets the caller should drop from its copy
+    next_token: str
+    has_more: bool
+
+
+class TicketImportReport(SQLModel):
+    tickets: int = 0
+    comments: int = 0
+    votes: int = 0
+    users_created: int = 0
+    categories_created: int = 0
+    skipped: int = 0
+    errors: List[str] = []  # the first few rejected rows
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class TicketStatsGroup(SQLModel):
+    id: Optional[int]  # None for "no category" / "unassigned"
+    name: Optional[str]
+    count: int
+    backlog: int  # open or in progress
+
+
+class TicketBacklogStats(SQLModel):
+    tickets: int
+    average_age_hours: Optional[float]
+    oldest_created_at: Optional[datetime]
+
+
+class TicketStats(SQLModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_category: List[TicketStatsGroup]
+    by_assignee: List[TicketStatsGroup]
+    backlog: TicketBacklogStats
+
+
+class TicketFlowPoint(SQLModel):
+    start: datetime
+    created: int
+    resolved: int
+    mean_resolution_hours: Optional[float]
+    resolution_histogram: List[int]
+
+
+class TicketFlowSeries(SQLModel):
+    interval: str  # bucket size the points were built from
+    step: int  # buckets merged into each point
+    category_id: Optional[int]
+    resolution_bounds_hours: List[float]  # upper bound of each histogram bin but the last
+    points: List[TicketFlowPoint]
@@ -1,59 +1,97 @@
-from datetime import datetime
-from enum import Enum
-from typing import Optional
-from sqlmodel import SQLModel, Field, Relationship
-from pydantic import EmailStr
-
-
-class UserRole(str, Enum):
-    end_user = "end_user"
-    agent = "agent"
-    admin = "admin"
-
-
-class UserBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True)
-    full_name: str
-    role: UserRole = UserRole.end_user
-    is_active: bool = True
-    dark_mode: bool = False
-
-
-class User(UserBase, table=True):
-    __tablename__ = "users"
-    
-    id: Optional[int] = Field(default=None, primary_key=True)
-    hashed_password: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-    
-    # Relationships
-    tickets: list["Ticket"] = Relationship(back_populates="owner")
-    assigned_tickets: list["Ticket"] = Relationship(back_populates="assignee")
-    comments: list["Comment"] = Relationship(back_populates="author")
-    votes: list["Vote"] = Relationship(back_populates="user")
-
-
-class UserCreate(UserBase):
-    password: str
-
-
-class UserUpdate(SQLModel):
-    email: Optional[EmailStr] = None
-    full_name: Optional[str] = None
-    role: Optional[UserRole] = None
-    is_active: Optional[bool] = None
-    dark_mode: Optional[bool] = None
-
-
-class UserRead(UserBase):
-    id: int
-    created_at: datetime
-    updated_at: datetime
-
-
-class UserInDB(UserBase):
-    id: int
-    hashed_password: str
-    created_at: datetime
-    updated_at: datetime 
\ No newline at end of file
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from sqlalchemy import Index, UniqueConstraint, func
+from sqlmodel import SQLModel, Field, Relationship
+from pydantic import EmailStr
+
+
+class UserRole(str, Enum):
+    end_user = "end_user"
+    agent = "agent"
+    admin = "admin"
+
+
+class UserBase(SQLModel):
+    email: EmailStr = Field(unique=True, index=True)
+    full_name: str
+    role: UserRole = UserRole.end_user
+    is_active: bool = True
+    dark_mode: bool = False
+
+
+class User(UserBase, table=True):
+    __tablename__ = "users"
+    __table_args__ = (
+        # Directory listing: newest first, keyset paginated, filtered by role
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_role_is_active", "role", "is_active"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    hashed_password: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    # Relationships
+    tickets: list["Ticket"] = Relationship(back_populates="owner", sa_relationship_kwargs={"foreign_keys": "Ticket.owner_id"})
+    assigned_tickets: list["Ticket"] = Relationship(back_populates="assignee", sa_relationship_kwargs={"foreign_keys": "Ticket.assignee_id"})
+    comments: list["Comment"] = Relationship(back_populates="author")
+    votes: list["Vote"] = Relationship(back_populates="user")
+
+
+# Prefix search matches lower(column) LIKE 'abc%', which these indexes serve
+Index(
+    "ix_users_email_prefix",
+    func.lower(User.__table__.c.email).label("email_lower"),
+    postgresql_ops={"email_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_users_full_name_prefix",
+    func.lower(User.__table__.c.full_name).label("full_name_lower"),
+    postgresql_ops={"full_name_lower": "text_pattern_ops"},
+)
+
+
+class AgentSkill(SQLModel, table=True):
+    """A category an agent handles; auto-assignment prefers skilled agents."""
+    __tablename__ = "agent_skills"
+    __table_args__ = (
+        UniqueConstraint("user_id", "category_id", name="uq_agent_skill"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id", index=True)
+    category_id: int = Field(foreign_key="categories.id", index=True)
+
+
+class UserCreate(UserBase):
+    password: str
+
+
+class UserUpdate(SQLModel):
+    email: Optional[EmailStr] = None
+    full_name: Optional[str] = None
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+    dark_mode: Optional[bool] = None
+
+
+class UserRead(UserBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class UserInDB(UserBase):
+    id: int
+    hashed_password: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class AgentOption(SQLModel):
+    """An entry of the assignee picker."""
+    id: int
+    full_name: str
+    email: str
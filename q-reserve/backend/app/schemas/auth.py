@@ -1,33 +1,33 @@
-from typing import Optional
-from pydantic import BaseModel, EmailStr
-
-
-class Token(BaseModel):
-    access_token: str
-    refresh_token: str
-    token_type: str = "bearer"
-
-
-class TokenData(BaseModel):
-    user_id: Optional[int] = None
-    role: Optional[str] = None
-
-
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
-
-
-class UserRegister(BaseModel):
-    email: EmailStr
-    password: str
-    full_name: str
-
-
-class UserProfile(BaseModel):
-    id: int
-    email: str
-    full_name: str
-    role: str
-    is_active: bool
+from typing import Optional
+from pydantic import BaseModel, EmailStr
+
+
+class Token(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+
+class TokenData(BaseModel):
+    user_id: Optional[int] = None
+    role: Optional[str] = None
+
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class UserRegister(BaseModel):
+    email: EmailStr
+    password: str
+    full_name: str
+
+
+class UserProfile(BaseModel):
+    id: int
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
     dark_mode: bool 
\ No newline at end of file
@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlmodel import Session, func, select
+
+from ..core.celery import celery
+from ..core.redis import get_redis
+from ..db.session import engine
+from ..models.ticket import Ticket, TicketStatus
+from ..models.user import AgentSkill, User, UserRole
+from .stats_service import BACKLOG_STATUSES
+
+logger = logging.getLogger(__name__)
+
+# Agent load index: sorted sets of agent ids scored by open assigned tickets,
+# one for all agents and one per category for the agents skilled in it
+KEY_PREFIX = "qreserve:agent-load"
+ALL_AGENTS_KEY = f"{KEY_PREFIX}:all"
+SKILLS_KEY = f"{KEY_PREFIX}:skills"  # hash: agent id -> comma-separated category ids
+POOLS_KEY = f"{KEY_PREFIX}:pools"  # set of the per-category keys, for rebuilds
+BUILT_KEY = f"{KEY_PREFIX}:built"
+
+
+def category_key(category_id: int) -> str:
+    return f"{KEY_PREFIX}:category:{category_id}"
+
+
+def counts_as_load(assignee_id: Optional[int], status: TicketStatus) -> bool:
+    return assignee_id is not None and status in BACKLOG_STATUSES
+
+
+def adjust_agent_load(agent_id: int, delta: int):
+    """Add ``delta`` to an agent's load in every pool it belongs to.
+
+    Pools only hold active agents (``xx``), so tickets assigned to admins
+    or former agents are not counted.
+    """
+    redis = get_redis()
+    skills = redis.hget(SKILLS_KEY, agent_id)
+    pipeline = redis.pipeline(transaction=False)
+    pipeline.zadd(ALL_AGENTS_KEY, {agent_id: delta}, xx=True, incr=True)
+    for category_id in skills.split(",") if skills else ():
+        pipeline.zadd(category_key(int(category_id)), {agent_id: delta}, xx=True, incr=True)
+    pipeline.execute()
+
+
+def track_agent_load(
+    old_assignee_id: Optional[int], old_status: TicketStatus, new_assignee_id: Optional[int], new_status: TicketStatus
+):
+    """Move a ticket's weight between agents after an assignment or status change."""
+    was_load = counts_as_load(old_assignee_id, old_status)
+    is_load = counts_as_load(new_assignee_id, new_status)
+    if was_load and is_load and old_assignee_id == new_assignee_id:
+        return
+    try:
+        if was_load:
+            adjust_agent_load(old_assignee_id, -1)
+        if is_load:
+            adjust_agent_load(new_assignee_id, 1)
+    except RedisError:
+        logger.warning("Could not update agent load for tickets of agents %s/%s", old_assignee_id, new_assignee_id)
+
+
+def assign_ticket(ticket: Ticket) -> Optional[int]:
+    """Assign a new ticket to the least-loaded active agent.
+
+    Agents skilled in the ticket's category are preferred; without any,
+    every agent is a candidate. Each pool lookup is a single ZRANGE, so
+    picking is O(log agents) and never counts tickets. The agent's load
+    is raised straight away, before the ticket is committed, so that
+    concurrent assignments spread out. The ticket stays unassigned when
+    Redis is unavailable or the index has not been built yet, in which
+    case a rebuild is queued.
+    """
+    redis = get_redis()
+    try:
+        if not redis.exists(BUILT_KEY):
+            rebuild_agent_load.delay()
+            return None
+
+        agent_id = None
+        for key in ([category_key(ticket.category_id)] if ticket.category_id else []) + [ALL_AGENTS_KEY]:
+            least_loaded = redis.zrange(key, 0, 0)
+            if least_loaded:
+                agent_id = int(least_loaded[0])
+                break
+        if agent_id is None:
+            return None
+
+        if counts_as_load(agent_id, ticket.status):
+            adjust_agent_load(agent_id, 1)
+    except RedisError:
+        logger.warning("Agent load index unavailable; ticket left unassigned")
+        return None
+
+    ticket.assignee_id = agent_id
+    return agent_id
+
+
+@celery.task
+def rebuild_agent_load():
+    """Rebuild the agent load index from the database.
+
+    Loads come from one grouped count over open tickets. The new index
+    replaces the old one in a single MULTI, so assignments never see it
+    half written. Runs periodically to correct drift, and after changes
+    the incremental updates cannot follow: bulk updates, imports, agents
+    added or removed, and skill changes.
+    """
+    started = time.monotonic()
+    with Session(engine) as session:
+        agents = session.exec(
+            select(User.id).where(User.role == UserRole.agent, User.is_active.is_(True))
+        ).all()
+        loads = dict(session.exec(
+            select(Ticket.assignee_id, func.count(Ticket.id))
+            .where(Ticket.assignee_id.in_(agents), Ticket.status.in_(BACKLOG_STATUSES))
+            .group_by(Ticket.assignee_id)
+        ).all())
+        skills = session.exec(
+            select(AgentSkill.user_id, AgentSkill.category_id).where(AgentSkill.user_id.in_(agents))
+        ).all()
+
+    scores = {agent_id: loads.get(agent_id, 0) for agent_id in agents}
+    skills_by_agent = {}
+    pools = {}
+    for agent_id, category_id in skills:
+        skills_by_agent.setdefault(agent_id, []).append(str(category_id))
+        pools.setdefault(category_key(category_id), {})[agent_id] = scores[agent_id]
+
+    redis = get_redis()
+    old_pools = redis.smembers(POOLS_KEY)
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.delete(ALL_AGENTS_KEY, SKILLS_KEY, POOLS_KEY, *old_pools)
+    if scores:
+        pipeline.zadd(ALL_AGENTS_KEY, scores)
+    for key, members in pools.items():
+        pipeline.zadd(key, members)
+    if skills_by_agent:
+        pipeline.hset(SKILLS_KEY, mapping={
+            agent_id: ",".join(category_ids) for agent_id, category_ids in skills_by_agent.items()
+        })
+    if pools:
+        pipeline.sadd(POOLS_KEY, *pools)
+    pipeline.set(BUILT_KEY, int(time.time()))
+    pipeline.execute()
+
+    return {"agents": len(scores), "seconds": round(time.monotonic() - started, 2)}
@@ -0,0 +1,309 @@
+import glob
+import hashlib
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Optional
+
+import aiofiles
+import aiofiles.os
+import magic
+from fastapi import HTTPException, status
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ..core.celery import celery
+from ..core.config import settings
+from ..db.session import engine
+from ..models.attachment import AttachmentBlob
+
+# Enough bytes for libmagic to recognise every format we accept
+SNIFF_BYTES = 2048
+
+# Extensions whose content we can verify from the leading bytes
+EXPECTED_MIME_TYPES = {
+    "jpg": ("image/jpeg",),
+    "jpeg": ("image/jpeg",),
+    "png": ("image/png",),
+    "gif": ("image/gif",),
+    "pdf": ("application/pdf",),
+}
+
+
+class StoredUpload:
+    """A request body that has been written to a temporary file."""
+
+    def __init__(self, path: str, size: int, sha256: str, mime_type: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.mime_type = mime_type
+
+
+def get_extension(filename: str) -> str:
+    """Return the lower-cased extension of a filename without the dot."""
+    _, ext = os.path.splitext(filename)
+    return ext.lstrip(".").lower()
+
+
+def validate_filename(filename: str) -> str:
+    """Strip directory components and check the extension is allowed."""
+    filename = os.path.basename(filename.replace("\\", "/")).strip()
+    if not filename:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Filename is required",
+        )
+
+    if get_extension(filename) not in settings.allowed_extensions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File type not allowed",
+        )
+
+    return filename
+
+
+def check_content_length(content_length: Optional[str]):
+    """Reject uploads whose declared size is already over the limit."""
+    if content_length is None:
+        return
+
+    try:
+        declared_size = int(content_length)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Content-Length header",
+        )
+
+    if declared_size > settings.max_file_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="File too large",
+        )
+
+
+def sniff_mime_type(head: bytes, filename: str) -> str:
+    """Detect the MIME type from the leading bytes and match it to the extension."""
+    mime_type = magic.from_buffer(head, mime=True)
+
+    expected = EXPECTED_MIME_TYPES.get(get_extension(filename))
+    if expected and mime_type not in expected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File content does not match its extension",
+        )
+
+    return mime_type
+
+
+async def remove_file(path: str):
+    """Remove a file, ignoring it if it is already gone."""
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def stream_to_disk(chunks: AsyncIterator[bytes], filename: str) -> StoredUpload:
+    """Write an upload to a temporary file chunk by chunk.
+
+    The SHA-256 digest is computed as the data is written, the size limit is
+    enforced on every chunk and the MIME type is sniffed as soon as enough
+    bytes have arrived, so a bad upload is rejected without reading the rest
+    of the body. File I/O runs in aiofiles' thread pool.
+    """
+    tmp_dir = os.path.join(settings.upload_dir, "tmp")
+    await aiofiles.os.makedirs(tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    mime_type = None
+
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="File too large",
+                    )
+
+                if mime_type is None:
+                    head += chunk[: SNIFF_BYTES - len(head)]
+                    if len(head) >= SNIFF_BYTES:
+                        mime_type = sniff_mime_type(head, filename)
+
+                digest.update(chunk)
+                await f.write(chunk)
+
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Empty file",
+            )
+
+        if mime_type is None:
+            mime_type = sniff_mime_type(head, filename)
+    except BaseException:
+        await remove_file(tmp_path)
+        raise
+
+    return StoredUpload(
+        path=tmp_path,
+        size=size,
+        sha256=digest.hexdigest(),
+        mime_type=mime_type,
+    )
+
+
+def blob_path(content_hash: str) -> str:
+    """Return the path of a blob relative to upload_dir.
+
+    Blobs are fanned out over two directory levels so that no single
+    directory grows too large.
+    """
+    return os.path.join("blobs", content_hash[:2], content_hash[2:4], content_hash)
+
+
+def find_blob(session: Session, content_hash: str) -> Optional[AttachmentBlob]:
+    """Look up a stored blob by its SHA-256."""
+    return session.exec(
+        select(AttachmentBlob).where(AttachmentBlob.content_hash == content_hash)
+    ).first()
+
+
+def acquire_blob(session: Session, content_hash: str) -> bool:
+    """Add a reference to an existing blob. Returns False if there is no such blob."""
+    result = session.execute(
+        update(AttachmentBlob)
+        .where(AttachmentBlob.content_hash == content_hash)
+        .values(ref_count=AttachmentBlob.ref_count + 1, updated_at=datetime.utcnow())
+    )
+    return result.rowcount > 0
+
+
+def release_blob(session: Session, content_hash: str):
+    """Drop a reference to a blob. Unreferenced blobs are removed by the GC task."""
+    session.execute(
+        update(AttachmentBlob)
+        .where(AttachmentBlob.content_hash == content_hash)
+        .values(ref_count=AttachmentBlob.ref_count - 1, updated_at=datetime.utcnow())
+    )
+
+
+async def store_blob(session: Session, upload: StoredUpload) -> AttachmentBlob:
+    """Take a reference to the blob for an upload, storing it if it is new.
+
+    Content that is already stored is referenced as-is and the temporary
+    file is discarded, so each distinct file is written to the blob store
+    once. The reference is part of the session's transaction. A new file
+    is moved into the store before that commits; if the transaction rolls
+    back, ``collect_orphaned_blobs`` removes the file.
+    """
+    if acquire_blob(session, upload.sha256):
+        await remove_file(upload.path)
+        return find_blob(session, upload.sha256)
+
+    relative_path = blob_path(upload.sha256)
+    final_path = os.path.join(settings.upload_dir, relative_path)
+    await aiofiles.os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    await aiofiles.os.replace(upload.path, final_path)
+
+    blob = AttachmentBlob(
+        content_hash=upload.sha256,
+        file_path=relative_path,
+        file_size=upload.size,
+        mime_type=upload.mime_type,
+        ref_count=1,
+    )
+
+    try:
+        with session.begin_nested():
+            session.add(blob)
+    except IntegrityError:
+        # A concurrent upload of the same content stored it first
+        acquire_blob(session, upload.sha256)
+        blob = find_blob(session, upload.sha256)
+
+    return blob
+
+
+@celery.task
+def collect_orphaned_blobs():
+    """Delete blobs that no attachment has referenced for the grace period.
+
+    Also removes stored files that never got a blob row.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.blob_gc_grace_hours)
+    removed = 0
+
+    with Session(engine) as session:
+        candidates = session.exec(
+            select(AttachmentBlob.content_hash).where(
+                AttachmentBlob.ref_count <= 0,
+                AttachmentBlob.updated_at < cutoff,
+            )
+        ).all()
+
+        for content_hash in candidates:
+            # Re-check the count in the DELETE itself so a blob that was
+            # referenced again since the SELECT is kept. The file is removed
+            # before committing, while the row is still locked.
+            result = session.execute(
+                delete(AttachmentBlob).where(
+                    AttachmentBlob.content_hash == content_hash,
+                    AttachmentBlob.ref_count <= 0,
+                )
+            )
+            if result.rowcount:
+                for path in glob.glob(os.path.join(settings.upload_dir, blob_path(content_hash)) + "*"):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+            session.commit()
+
+    # Files without a blob row, left by uploads whose transaction rolled back
+    # after the file was moved into the store. Checked one fan-out
+    # directory at a time so the whole store is never listed in memory.
+    with Session(engine) as session:
+        for directory, _, names in os.walk(os.path.join(settings.upload_dir, "blobs")):
+            old_files = {}
+            for name in names:
+                path = os.path.join(directory, name)
+                if datetime.utcfromtimestamp(os.stat(path).st_mtime) < cutoff:
+                    old_files.setdefault(name[:64], []).append(path)
+            if not old_files:
+                continue
+
+            known = set(session.exec(
+                select(AttachmentBlob.content_hash).where(AttachmentBlob.content_hash.in_(old_files))
+            ).all())
+            for content_hash, paths in old_files.items():
+                if content_hash in known:
+                    continue
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+
+    # Temporary files left behind by interrupted uploads
+    tmp_dir = os.path.join(settings.upload_dir, "tmp")
+    if os.path.isdir(tmp_dir):
+        for entry in os.scandir(tmp_dir):
+            if entry.is_file() and datetime.utcfromtimestamp(entry.stat().st_mtime) < cutoff:
+                os.remove(entry.path)
+
+    return removed
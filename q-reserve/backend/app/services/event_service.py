@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+from ..core.config import settings
+from ..core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+EVENT_CHANNEL = "qreserve:events"
+
+
+def ticket_event(event_type: str, ticket_id: int, owner_id: int, version: Optional[int] = None, **data: Any) -> Dict[str, Any]:
+    """Build the payload of a ticket event."""
+    return {
+        "type": event_type,
+        "ticket_id": ticket_id,
+        "owner_id": owner_id,
+        "version": version,
+        "data": data,
+    }
+
+
+def publish_events(events: List[Dict[str, Any]]):
+    """Broadcast ticket events to every worker, in one round trip.
+
+    Call after the change has been committed. Events are notifications,
+    not state: clients refetch the ticket (cheaply, with If-None-Match) to
+    see what changed, so a lost event only delays an update.
+    """
+    if not events:
+        return
+    try:
+        pipeline = get_redis().pipeline(transaction=False)
+        for event in events:
+            pipeline.publish(EVENT_CHANNEL, json.dumps(event, default=str))
+        pipeline.execute()
+    except RedisError:
+        logger.warning("Could not publish %d ticket events", len(events))
+
+
+def publish_event(event_type: str, ticket_id: int, owner_id: int, version: Optional[int] = None, **data: Any):
+    """Broadcast a single ticket event."""
+    publish_events([ticket_event(event_type, ticket_id, owner_id, version, **data)])
+
+
+class Subscription:
+    """One connected client of the event stream."""
+
+    def __init__(self, user_id: int, owner_only: bool):
+        self.user_id = user_id
+        self.owner_only = owner_only
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_queue_size)
+        self.dropped = False
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        """End users only see events for tickets they own."""
+        return not self.owner_only or event.get("owner_id") == self.user_id
+
+    def put(self, event_type: str, message: str):
+        try:
+            self.queue.put_nowait((event_type, message))
+        except asyncio.QueueFull:
+            # A client that cannot keep up is disconnected rather than
+            # buffering without bound; it reconnects and refetches.
+            self.dropped = True
+
+
+class EventBroker:
+    """Fans events from Redis out to the clients connected to this worker.
+
+    Each worker holds a single pub/sub connection no matter how many
+    clients are streaming; it is opened with the first subscriber and
+    closed with the last.
+    """
+
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, user_id: int, owner_only: bool) -> Subscription:
+        subscription = Subscription(user_id, owner_only)
+        self.subscriptions.add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscriptions.discard(subscription)
+        if not self.subscriptions and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def dispatch(self, message: str):
+        """Deliver one raw pub/sub message to the interested subscribers."""
+        event = json.loads(message)
+        for subscription in list(self.subscriptions):
+            if subscription.wants(event):
+                subscription.put(event["type"], message)
+
+    async def _listen(self):
+        while self.subscriptions:
+            client = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(EVENT_CHANNEL)
+                async for message in pubsub.listen():
+                    try:
+                        self.dispatch(message["data"])
+                    except Exception:
+                        logger.exception("Could not dispatch event %r", message.get("data"))
+            except RedisError:
+                logger.warning("Lost connection to the event channel, reconnecting")
+            finally:
+                await pubsub.close()
+                await client.close()
+
+            await asyncio.sleep(1)
+
+
+event_broker = EventBroker()
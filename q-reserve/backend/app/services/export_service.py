@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from ..core.config import settings
+from ..db.session import engine
+from ..models.comment import Comment
+from ..models.ticket import Ticket, TicketStatus
+from .ticket_service import get_comment_counts, get_vote_scores
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Columns of the CSV export; ticket and comment rows share one header
+EXPORT_COLUMNS = [
+    "type",
+    "id",
+    "ticket_id",
+    "parent_id",
+    "subject",
+    "description",
+    "content",
+    "status",
+    "priority",
+    "category",
+    "owner_email",
+    "assignee_email",
+    "author_email",
+    "comment_count",
+    "vote_score",
+    "created_at",
+    "updated_at",
+    "last_activity",
+]
+
+
+def export_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def ticket_record(ticket: Ticket, comment_counts: Dict[int, int], vote_scores: Dict[int, int]) -> Dict[str, Any]:
+    return {
+        "type": "ticket",
+        "id": ticket.id,
+        "subject": ticket.subject,
+        "description": ticket.description,
+        "status": ticket.status,
+        "priority": ticket.priority,
+        "category": ticket.category.name if ticket.category else None,
+        "owner_email": ticket.owner.email,
+        "assignee_email": ticket.assignee.email if ticket.assignee else None,
+        "comment_count": comment_counts.get(ticket.id, 0),
+        "vote_score": vote_scores.get(ticket.id, 0),
+        "created_at": ticket.created_at,
+        "updated_at": ticket.updated_at,
+        "last_activity": ticket.last_activity,
+    }
+
+
+def comment_record(comment: Comment) -> Dict[str, Any]:
+    return {
+        "type": "comment",
+        "id": comment.id,
+        "ticket_id": comment.ticket_id,
+        "parent_id": comment.parent_id,
+        "content": comment.content,
+        "author_email": comment.author.email,
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+    }
+
+
+def format_records(records: List[Dict[str, Any]], fmt: str) -> str:
+    """Serialize a batch of records as NDJSON lines or CSV rows."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerows([export_value(record.get(column)) for column in EXPORT_COLUMNS] for record in records)
+        return buffer.getvalue()
+
+    return "".join(json.dumps(record, default=export_value) + "\n" for record in records)
+
+
+def iter_ticket_export(
+    fmt: str,
+    owner_id: Optional[int] = None,
+    status: Optional[TicketStatus] = None,
+    category_id: Optional[int] = None,
+    include_comments: bool = False,
+) -> Iterator[str]:
+    """Stream tickets (and optionally their comments) in id order.
+
+    Rows come from a server-side cursor in batches of
+    ``export_batch_size``; relationships, counts and comments are loaded
+    with one query each per batch, so memory use does not grow with the
+    size of the export. Runs in its own session because the response is
+    produced after the request's session has been closed.
+    """
+    if fmt == "csv":
+        yield format_records([{column: column for column in EXPORT_COLUMNS}], fmt)
+
+    query = (
+        select(Ticket)
+        .options(
+            selectinload(Ticket.owner),
+            selectinload(Ticket.assignee),
+            selectinload(Ticket.category),
+        )
+        .order_by(Ticket.id)
+        .execution_options(yield_per=settings.export_batch_size)
+    )
+    if owner_id is not None:
+        query = query.where(Ticket.owner_id == owner_id)
+    if status:
+        query = query.where(Ticket.status == status)
+    if category_id:
+        query = query.where(Ticket.category_id == category_id)
+
+    with Session(engine) as session:
+        for tickets in session.exec(query).partitions():
+            ticket_ids = [ticket.id for ticket in tickets]
+            comment_counts = get_comment_counts(session, ticket_ids)
+            vote_scores = get_vote_scores(session, ticket_ids)
+            records = [ticket_record(ticket, comment_counts, vote_scores) for ticket in tickets]
+
+            comments = []
+            if include_comments:
+                comments = session.exec(
+                    select(Comment)
+                    .where(Comment.ticket_id.in_(ticket_ids))
+                    .options(selectinload(Comment.author))
+                    .order_by(Comment.ticket_id, Comment.id)
+                ).all()
+                records.extend(comment_record(comment) for comment in comments)
+
+            yield format_records(records, fmt)
+
+            # Drop the batch from the identity map so memory stays flat
+            for instance in [*tickets, *comments]:
+                session.expunge(instance)
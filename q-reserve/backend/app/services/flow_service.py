@@ -0,0 +1,269 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from ..core.celery import celery
+from ..db.bulk import bulk_insert
+from ..db.session import engine
+from ..models.ticket import (
+    Ticket,
+    TicketFlowBucket,
+    TicketFlowPoint,
+    TicketFlowSeries,
+    TicketStatus,
+    TicketStatusEvent,
+)
+
+# Reaching one of these from an open status ends the ticket's time to resolution
+DONE_STATUSES = (TicketStatus.resolved, TicketStatus.closed)
+
+# Inclusive upper bounds of the time-to-resolution histogram bins; one more
+# open-ended bin catches everything slower
+RESOLUTION_BOUNDS_HOURS = (1, 4, 8, 24, 48, 72, 168, 336, 720)
+RESOLUTION_BOUNDS_SECONDS = np.array(RESOLUTION_BOUNDS_HOURS) * 3600
+HISTOGRAM_BINS = len(RESOLUTION_BOUNDS_HOURS) + 1
+
+INTERVALS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+SETTLE_TIME = timedelta(minutes=5)  # lets the last transactions of an hour commit before it is aggregated
+AGGREGATION_CHUNK = timedelta(days=7)  # events loaded per pass when catching up
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Datetimes are stored as naive UTC; convert aware ones from clients."""
+    if value.tzinfo:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def truncate(value: datetime, interval: str) -> datetime:
+    """Start of the hour or day containing ``value``."""
+    value = naive_utc(value).replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0) if interval == "day" else value
+
+
+def status_event(
+    ticket_id: int,
+    category_id: Optional[int],
+    from_status: Optional[TicketStatus],
+    to_status: TicketStatus,
+    created_at: datetime,
+    occurred_at: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    occurred_at = occurred_at or datetime.utcnow()
+    resolved = from_status is not None and from_status not in DONE_STATUSES and to_status in DONE_STATUSES
+    return {
+        "ticket_id": ticket_id,
+        "category_id": category_id,
+        "from_status": from_status,
+        "to_status": to_status,
+        "occurred_at": occurred_at,
+        "resolution_seconds": int((occurred_at - created_at).total_seconds()) if resolved else None,
+    }
+
+
+def record_status_event(session: Session, ticket: Ticket, from_status: Optional[TicketStatus] = None):
+    """Record a new ticket, or a change from ``from_status``, in the current transaction.
+
+    The ticket must have an id, so flush a new ticket first.
+    """
+    if from_status == ticket.status:
+        return
+    session.add(TicketStatusEvent(**status_event(
+        ticket.id, ticket.category_id, from_status, ticket.status, ticket.created_at
+    )))
+
+
+def record_bulk_status_changes(
+    session: Session,
+    previous: Sequence[Tuple[int, TicketStatus, Optional[int], datetime]],
+    changes: Dict[str, Any],
+    updated_ids: Set[int],
+):
+    """Record the status changes of a set-based update.
+
+    ``previous`` holds (id, status, category_id, created_at) of the
+    candidate tickets, read before the update.
+    """
+    now = datetime.utcnow()
+    to_status = changes["status"]
+    bulk_insert(session, TicketStatusEvent.__table__, [
+        status_event(ticket_id, changes.get("category_id", category_id), status, to_status, created_at, now)
+        for ticket_id, status, category_id, created_at in previous
+        if ticket_id in updated_ids and status != to_status
+    ])
+
+
+def bucket_counts(
+    events: Sequence[Tuple[datetime, Optional[int], bool, Optional[int]]],
+    start: datetime,
+    interval: str,
+    buckets: int,
+) -> Iterator[Dict[str, Any]]:
+    """Count events per (bucket, category), vectorized with NumPy.
+
+    ``events`` are (occurred_at, category_id, is_creation,
+    resolution_seconds) rows. Yields a ``TicketFlowBucket`` row for every
+    bucket and category with activity.
+    """
+    occurred_at, category_ids, created_flags, resolution_seconds = zip(*events)
+    bucket_size = np.timedelta64(int(INTERVALS[interval].total_seconds()), "s")
+    bucket = (np.array(occurred_at, dtype="datetime64[us]") - np.datetime64(start, "us")) // bucket_size
+    categories, category_index = np.unique(
+        np.array([category_id or 0 for category_id in category_ids]), return_inverse=True
+    )
+
+    # One flat group index per (bucket, category) turns every sum into a bincount
+    key = bucket * len(categories) + category_index
+    groups = buckets * len(categories)
+    created = np.array(created_flags, dtype=bool)
+    seconds = np.array(resolution_seconds, dtype=float)  # NaN unless the event resolved the ticket
+    resolved = ~np.isnan(seconds)
+
+    created_counts = np.bincount(key[created], minlength=groups)
+    resolved_counts = np.bincount(key[resolved], minlength=groups)
+    seconds_totals = np.bincount(key[resolved], weights=seconds[resolved], minlength=groups)
+    bins = np.searchsorted(RESOLUTION_BOUNDS_SECONDS, seconds[resolved], side="left")
+    histograms = np.bincount(
+        key[resolved] * HISTOGRAM_BINS + bins, minlength=groups * HISTOGRAM_BINS
+    ).reshape(groups, HISTOGRAM_BINS)
+
+    for group in np.flatnonzero(created_counts + resolved_counts):
+        bucket_index, category = divmod(int(group), len(categories))
+        yield {
+            "interval": interval,
+            "bucket_start": start + bucket_index * INTERVALS[interval],
+            "category_id": int(categories[category]),
+            "created": int(created_counts[group]),
+            "resolved": int(resolved_counts[group]),
+            "resolution_seconds_total": int(round(seconds_totals[group])),
+            "resolution_histogram": histograms[group].tolist(),
+        }
+
+
+def aggregate_window(session: Session, start: datetime, end: datetime):
+    """Rewrite the hourly and daily buckets of a day-aligned window from its events."""
+    events = session.exec(
+        select(
+            TicketStatusEvent.occurred_at,
+            TicketStatusEvent.category_id,
+            TicketStatusEvent.from_status.is_(None),
+            TicketStatusEvent.resolution_seconds,
+        ).where(TicketStatusEvent.occurred_at >= start, TicketStatusEvent.occurred_at < end)
+    ).all()
+
+    for interval, size in INTERVALS.items():
+        session.execute(delete(TicketFlowBucket).where(
+            TicketFlowBucket.interval == interval,
+            TicketFlowBucket.bucket_start >= start,
+            TicketFlowBucket.bucket_start < end,
+        ))
+        if events:
+            buckets = math.ceil((end - start) / size)
+            bulk_insert(session, TicketFlowBucket.__table__, list(bucket_counts(events, start, interval, buckets)))
+
+
+@celery.task
+def aggregate_ticket_flow(since: Optional[str] = None):
+    """Bring the flow buckets up to the last finished hour.
+
+    Resumes at the start of the day of the last hourly bucket written, so
+    that day's partial daily bucket and any late events are redone.
+    ``since`` (an ISO datetime) re-aggregates from an earlier point, for
+    imported history.
+    """
+    started = time.monotonic()
+    end = truncate(datetime.utcnow() - SETTLE_TIME, "hour")
+
+    with Session(engine) as session:
+        start = session.exec(
+            select(func.max(TicketFlowBucket.bucket_start)).where(TicketFlowBucket.interval == "hour")
+        ).one()
+        if start is None:
+            start = session.exec(select(func.min(TicketStatusEvent.occurred_at))).one()
+        if since:
+            since = truncate(datetime.fromisoformat(since), "hour")
+            start = min(start, since) if start else since
+        if start is None:
+            return {"days": 0, "seconds": 0.0}
+
+        start = truncate(start, "day")
+        days = 0
+        while start < end:
+            chunk_end = min(start + AGGREGATION_CHUNK, end)
+            aggregate_window(session, start, chunk_end)
+            session.commit()
+            days += math.ceil((chunk_end - start) / INTERVALS["day"])
+            start = chunk_end
+
+    return {"days": days, "seconds": round(time.monotonic() - started, 2)}
+
+
+def get_ticket_flow(
+    session: Session,
+    start: datetime,
+    end: datetime,
+    category_id: Optional[int] = None,
+    interval: Optional[str] = None,
+    max_points: int = 200,
+) -> TicketFlowSeries:
+    """Created and resolved counts between two times, read only from the buckets.
+
+    Hourly buckets are used for ranges up to a week and daily ones beyond,
+    unless ``interval`` says otherwise. When that gives more than
+    ``max_points`` buckets, consecutive ones are merged. Without a
+    ``category_id`` all categories are summed. Hours not yet aggregated
+    count as empty.
+    """
+    if interval is None:
+        interval = "hour" if end - start <= timedelta(days=7) else "day"
+    size = INTERVALS[interval]
+    start, end = truncate(start, interval), truncate(end, "hour")
+    buckets = max(1, math.ceil((end - start) / size))
+    step = math.ceil(buckets / max_points)
+    points = math.ceil(buckets / step)
+
+    query = select(
+        TicketFlowBucket.bucket_start,
+        TicketFlowBucket.created,
+        TicketFlowBucket.resolved,
+        TicketFlowBucket.resolution_seconds_total,
+        TicketFlowBucket.resolution_histogram,
+    ).where(
+        TicketFlowBucket.interval == interval,
+        TicketFlowBucket.bucket_start >= start,
+        TicketFlowBucket.bucket_start < end,
+    )
+    if category_id is not None:
+        query = query.where(TicketFlowBucket.category_id == category_id)
+    rows = session.exec(query).all()
+
+    # Columns: created, resolved, resolution seconds, then the histogram bins
+    totals = np.zeros((points * step, 3 + HISTOGRAM_BINS))
+    if rows:
+        indices = np.array([(row[0] - start) // size for row in rows])
+        values = np.array([[created, resolved, seconds, *histogram] for _, created, resolved, seconds, histogram in rows])
+        np.add.at(totals, indices, values)
+    totals = totals.reshape(points, step, -1).sum(axis=1)
+
+    return TicketFlowSeries(
+        interval=interval,
+        step=step,
+        category_id=category_id,
+        resolution_bounds_hours=list(RESOLUTION_BOUNDS_HOURS),
+        points=[
+            TicketFlowPoint(
+                start=start + index * step * size,
+                created=int(created),
+                resolved=int(resolved),
+                mean_resolution_hours=round(seconds / resolved / 3600, 1) if resolved else None,
+                resolution_histogram=[int(count) for count in histogram],
+            )
+            for index, (created, resolved, seconds, *histogram) in enumerate(totals)
+        ],
+    )
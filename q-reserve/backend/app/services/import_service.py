@@ -0,0 +1,438 @@
+import codecs
+import csv
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import anyio.from_thread
+from sqlmodel import Session, select
+
+from ..core.config import settings
+from ..db.bulk import bulk_insert
+from ..models.category import Category
+from ..models.comment import Comment
+from ..models.ticket import Ticket, TicketImportReport, TicketPriority, TicketStatus, TicketStatusEvent
+from ..models.user import User, UserRole
+from ..models.vote import Vote, VoteType
+from .flow_service import status_event
+from .sla_service import load_sla_targets, sla_due_at
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+# Imported users cannot log in until an admin activates them and sets a password
+UNUSABLE_PASSWORD = "!"
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ImportRowError(f"line {line_number}: invalid JSON ({e.msg})")
+
+
+def iter_csv(lines: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    reader = csv.DictReader(lines)
+    for record in reader:
+        # Empty cells mean "not given"
+        yield reader.line_num, {key: value for key, value in record.items() if value not in ("", None)}
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Parse NDJSON or CSV lines into (line number, record) pairs."""
+    return iter_csv(lines) if fmt == "csv" else iter_ndjson(lines)
+
+
+def iter_lines_from_thread(chunks: AsyncIterator[bytes]) -> Iterator[str]:
+    """Read text lines from an async byte stream, from a worker thread.
+
+    This lets the synchronous importer consume a request body as it
+    arrives, without buffering it.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(chunks.__anext__)
+        except StopAsyncIteration:
+            break
+        lines = (pending + decoder.decode(chunk)).splitlines(keepends=True)
+        pending = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        yield from lines
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        raise ImportRowError(f"Invalid timestamp {value!r}")
+
+
+def parse_enum(enum, value: Optional[str], default=None):
+    if value is None:
+        return default
+    try:
+        return enum(value)
+    except ValueError:
+        raise ImportRowError(f"Invalid {enum.__name__} {value!r}")
+
+
+def require(record: Dict[str, Any], name: str) -> str:
+    value = record.get(name)
+    if value in (None, ""):
+        raise ImportRowError(f"Missing {name}")
+    return str(value)
+
+
+class TicketImporter:
+    """Loads tickets, comments and votes exported from another helpdesk.
+
+    Each record has a ``type`` of ``ticket``, ``comment`` or ``vote``:
+
+    - ticket: ``external_id``, ``subject``, ``description``, ``owner_email``
+      and optionally ``status``, ``priority``, ``category``,
+      ``assignee_email`` (an existing agent or admin), ``created_at``,
+      ``updated_at``
+    - comment: ``ticket_external_id``, ``author_email``, ``content`` and
+      optionally ``external_id``, ``parent_external_id``, ``created_at``
+    - vote: ``ticket_external_id``, ``user_email``, ``vote_type``
+
+    Records are buffered and written in batches of ``import_batch_size``
+    with COPY (or executemany), all in the caller's transaction. Users and
+    categories are resolved through in-memory maps; unknown ones are
+    created (users inactive, without a usable password), except assignees,
+    which must already be agents, and only once the rest of the record
+    has been validated. Tickets and comments whose ``external_id`` was
+    already imported are skipped, tickets together with the comments and
+    votes that follow them in the same input, as are votes by a user who
+    already voted on the ticket. Comments without an ``external_id``
+    cannot be recognised and are inserted again when an import is re-run.
+    No notifications are sent.
+    """
+
+    max_errors = 100
+
+    def __init__(self, session: Session, batch_size: Optional[int] = None):
+        self.session = session
+        self.batch_size = batch_size or settings.import_batch_size
+        self.started = time.monotonic()
+        self.started_at = datetime.utcnow()
+        self.counts = {"tickets": 0, "comments": 0, "votes": 0, "users_created": 0, "categories_created": 0}
+        self.skipped = 0
+        self.errors: List[str] = []
+
+        self.users: Dict[str, int] = {
+            email.lower(): user_id for user_id, email in session.exec(select(User.id, User.email))
+        }
+        self.agents: Dict[str, int] = {
+            email.lower(): user_id
+            for user_id, email in session.exec(
+                select(User.id, User.email).where(User.role.in_([UserRole.agent, UserRole.admin]))
+            )
+        }
+        self.categories: Dict[str, int] = {
+            name: category_id for category_id, name in session.exec(select(Category.id, Category.name))
+        }
+        self.sla_targets = load_sla_targets(session)
+        self.tickets: Dict[str, int] = {}
+        self.earliest_created_at: Optional[datetime] = None
+        self.already_imported: Set[str] = set()
+        self.comments: Dict[str, int] = {}
+        self.votes: Set[Tuple[int, int]] = set()
+        self.vote_tickets: Set[int] = set()
+
+        self.pending: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {"ticket": [], "comment": [], "vote": []}
+
+    def error(self, line_number: int, message: str):
+        self.skipped += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(f"line {line_number}: {message}")
+
+    def add(self, line_number: int, record: Dict[str, Any]):
+        """Queue one parsed record, writing a batch when enough are queued."""
+        record_type = record.get("type") if isinstance(record, dict) else None
+        if record_type not in self.pending:
+            self.error(line_number, f"Unknown record type {record_type!r}")
+            return
+
+        self.pending[record_type].append((line_number, record))
+        if sum(len(records) for records in self.pending.values()) >= self.batch_size:
+            self.flush()
+
+    def run(self, records: Iterable[Tuple[int, Dict[str, Any]]]) -> TicketImportReport:
+        """Import every record and return the report."""
+        try:
+            for line_number, record in records:
+                self.add(line_number, record)
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise ImportRowError(f"Unreadable input: {e}")
+        self.flush()
+        return self.report()
+
+    def flush(self):
+        """Write all queued records. Tickets go first so comments and votes can refer to them."""
+        tickets, comments, votes = self.pending["ticket"], self.pending["comment"], self.pending["vote"]
+        self.pending = {"ticket": [], "comment": [], "vote": []}
+        self.load_tickets(tickets)
+        self.load_comments(comments)
+        self.load_votes(votes)
+
+    def report(self) -> TicketImportReport:
+        elapsed = time.monotonic() - self.started
+        rows = self.counts["tickets"] + self.counts["comments"] + self.counts["votes"]
+        return TicketImportReport(
+            **self.counts,
+            skipped=self.skipped,
+            errors=self.errors,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        )
+
+    def resolve_user(self, email: Optional[str]) -> Optional[int]:
+        if not email:
+            return None
+        key = email.strip().lower()
+        if key not in self.users:
+            user = User(
+                email=key,
+                full_name=key.split("@")[0],
+                role=UserRole.end_user,
+                is_active=False,
+                hashed_password=UNUSABLE_PASSWORD,
+            )
+            self.session.add(user)
+            self.session.flush()
+            self.users[key] = user.id
+            self.counts["users_created"] += 1
+        return self.users[key]
+
+    def resolve_agent(self, email: Optional[str]) -> Optional[int]:
+        if not email:
+            return None
+        agent_id = self.agents.get(email.strip().lower())
+        if agent_id is None:
+            raise ImportRowError(f"Unknown agent {email!r}")
+        return agent_id
+
+    def resolve_category(self, name: Optional[str]) -> Optional[int]:
+        if not name:
+            return None
+        if name not in self.categories:
+            category = Category(name=name)
+            self.session.add(category)
+            self.session.flush()
+            self.categories[name] = category.id
+            self.counts["categories_created"] += 1
+        return self.categories[name]
+
+    def resolve_tickets(self, external_ids: Iterable[str]):
+        """Load the ids of tickets imported by earlier runs into the map."""
+        missing = {external_id for external_id in external_ids if external_id not in self.tickets}
+        if not missing:
+            return
+        rows = self.session.exec(
+            select(Ticket.external_id, Ticket.id).where(Ticket.external_id.in_(missing))
+        )
+        self.tickets.update({external_id: ticket_id for external_id, ticket_id in rows})
+
+    def resolve_comments(self, external_ids: Iterable[str]):
+        """Load the ids of comments imported by earlier runs into the map."""
+        missing = {external_id for external_id in external_ids if external_id not in self.comments}
+        if not missing:
+            return
+        rows = self.session.exec(
+            select(Comment.external_id, Comment.id).where(Comment.external_id.in_(missing))
+        )
+        self.comments.update({external_id: comment_id for external_id, comment_id in rows})
+
+    def resolve_votes(self, ticket_ids: Iterable[int]):
+        """Load the (ticket, user) pairs that already voted on these tickets."""
+        missing = {ticket_id for ticket_id in ticket_ids if ticket_id not in self.vote_tickets}
+        if not missing:
+            return
+        self.votes.update(
+            self.session.exec(select(Vote.ticket_id, Vote.user_id).where(Vote.ticket_id.in_(missing)))
+        )
+        self.vote_tickets.update(missing)
+
+    def load_tickets(self, records: List[Tuple[int, Dict[str, Any]]]):
+        if not records:
+            return
+
+        self.resolve_tickets(str(record.get("external_id")) for _, record in records)
+
+        rows, external_ids = [], []
+        for line_number, record in records:
+            try:
+                external_id = require(record, "external_id")
+                if external_id in self.tickets or external_id in external_ids:
+                    self.already_imported.add(external_id)
+                    self.skipped += 1
+                    continue
+                created_at = parse_datetime(record.get("created_at")) or datetime.utcnow()
+                updated_at = parse_datetime(record.get("updated_at")) or created_at
+                priority = parse_enum(TicketPriority, record.get("priority"), TicketPriority.medium)
+                status = parse_enum(TicketStatus, record.get("status"), TicketStatus.open)
+                subject = require(record, "subject")
+                owner_email = require(record, "owner_email")
+                assignee_id = self.resolve_agent(record.get("assignee_email"))
+                # Only now that the record is valid may missing users and categories be created
+                category_id = self.resolve_category(record.get("category"))
+                owner_id = self.resolve_user(owner_email)
+                due_at = sla_due_at(self.sla_targets, priority, category_id, created_at)
+                rows.append({
+                    "external_id": external_id,
+                    "subject": subject,
+                    "description": record.get("description") or "",
+                    "status": status.name,
+                    "priority": priority.name,
+                    "category_id": category_id,
+                    "assignee_id": assignee_id,
+                    "owner_id": owner_id,
+                    "created_at": created_at,
+                    "updated_at": updated_at,
+                    "last_activity": updated_at,
+                    "version": 1,
+                    "sla_due_at": due_at,
+                    # Deadlines already missed before the import are not escalated
+                    "sla_breached_at": due_at if due_at and due_at <= self.started_at else None,
+                })
+                external_ids.append(external_id)
+            except ImportRowError as e:
+                self.error(line_number, str(e))
+
+        ids = bulk_insert(self.session, Ticket.__table__, rows, return_ids=True)
+        self.tickets.update(zip(external_ids, ids))
+
+        # Imported tickets count as created at their original time in flow metrics
+        bulk_insert(self.session, TicketStatusEvent.__table__, [
+            status_event(ticket_id, row["category_id"], None, row["status"], row["created_at"], row["created_at"])
+            for ticket_id, row in zip(ids, rows)
+        ])
+        if rows:
+            earliest = min(row["created_at"] for row in rows)
+            self.earliest_created_at = min(self.earliest_created_at or earliest, earliest)
+        self.counts["tickets"] += len(rows)
+
+    def load_comments(self, records: List[Tuple[int, Dict[str, Any]]]):
+        if not records:
+            return
+
+        self.resolve_tickets(str(record.get("ticket_external_id")) for _, record in records)
+        self.resolve_comments(
+            str(record[key]) for _, record in records for key in ("external_id", "parent_external_id") if record.get(key)
+        )
+
+        # Parents must be inserted before their replies, so comments are
+        # written in rounds: those whose parent is known, then their replies
+        rows, waiting = [], []
+        seen: Set[str] = set()
+        for line_number, record in records:
+            try:
+                ticket_external_id = require(record, "ticket_external_id")
+                external_id = str(record["external_id"]) if record.get("external_id") else None
+                if ticket_external_id in self.already_imported or external_id in self.comments or external_id in seen:
+                    self.skipped += 1
+                    continue
+                ticket_id = self.tickets.get(ticket_external_id)
+                if ticket_id is None:
+                    raise ImportRowError(f"Unknown ticket {record['ticket_external_id']!r}")
+                content = require(record, "content")
+                created_at = parse_datetime(record.get("created_at")) or datetime.utcnow()
+                row = {
+                    "external_id": external_id,
+                    "ticket_id": ticket_id,
+                    "author_id": self.resolve_user(require(record, "author_email")),
+                    "content": content,
+                    "parent_id": None,
+                    "created_at": created_at,
+                }
+                row["updated_at"] = row["created_at"]
+                parent = record.get("parent_external_id")
+                if external_id is not None:
+                    seen.add(external_id)
+                if parent and str(parent) not in self.comments:
+                    waiting.append((line_number, record, row))
+                    continue
+                if parent:
+                    row["parent_id"] = self.comments[str(parent)]
+                rows.append(row)
+            except ImportRowError as e:
+                self.error(line_number, str(e))
+
+        while rows:
+            ids = bulk_insert(self.session, Comment.__table__, rows, return_ids=True)
+            self.comments.update(
+                (row["external_id"], comment_id)
+                for row, comment_id in zip(rows, ids)
+                if row["external_id"] is not None
+            )
+            self.counts["comments"] += len(rows)
+
+            rows, still_waiting = [], []
+            for line_number, record, row in waiting:
+                parent_id = self.comments.get(str(record["parent_external_id"]))
+                if parent_id is None:
+                    still_waiting.append((line_number, record, row))
+                    continue
+                row["parent_id"] = parent_id
+                rows.append(row)
+            waiting = still_waiting
+
+        for line_number, record, _ in waiting:
+            self.error(line_number, f"Unknown parent comment {record['parent_external_id']!r}")
+
+    def load_votes(self, records: List[Tuple[int, Dict[str, Any]]]):
+        if not records:
+            return
+
+        self.resolve_tickets(str(record.get("ticket_external_id")) for _, record in records)
+        self.resolve_votes(
+            self.tickets[str(record.get("ticket_external_id"))]
+            for _, record in records
+            if str(record.get("ticket_external_id")) in self.tickets
+        )
+
+        rows = []
+        for line_number, record in records:
+            try:
+                ticket_external_id = require(record, "ticket_external_id")
+                if ticket_external_id in self.already_imported:
+                    self.skipped += 1
+                    continue
+                ticket_id = self.tickets.get(ticket_external_id)
+                if ticket_id is None:
+                    raise ImportRowError(f"Unknown ticket {record['ticket_external_id']!r}")
+                vote_type = parse_enum(VoteType, require(record, "vote_type"))
+                user_id = self.resolve_user(require(record, "user_email"))
+                if (ticket_id, user_id) in self.votes:
+                    self.skipped += 1
+                    continue
+                self.votes.add((ticket_id, user_id))
+                now = datetime.utcnow()
+                rows.append({
+                    "ticket_id": ticket_id,
+                    "user_id": user_id,
+                    "vote_type": vote_type.name,
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            except ImportRowError as e:
+                self.error(line_number, str(e))
+
+        bulk_insert(self.session, Vote.__table__, rows)
+        self.counts["votes"] += len(rows)
@@ -1,50 +1,122 @@
-from ..core.celery import celery
-from ..core.email import email_service
-
-
-@celery.task
-def send_ticket_created_email(to_email: str, ticket_id: int, subject: str, owner_name: str):
-    """Send ticket created notification email."""
-    import asyncio
-    
-    async def send_email():
-        await email_service.send_ticket_created_notification(
-            to_email=to_email,
-            ticket_id=ticket_id,
-            subject=subject,
-            owner_name=owner_name,
-        )
-    
-    asyncio.run(send_email())
-
-
-@celery.task
-def send_ticket_updated_email(to_email: str, ticket_id: int, subject: str, status: str):
-    """Send ticket updated notification email."""
-    import asyncio
-    
-    async def send_email():
-        await email_service.send_ticket_updated_notification(
-            to_email=to_email,
-            ticket_id=ticket_id,
-            subject=subject,
-            status=status,
-        )
-    
-    asyncio.run(send_email())
-
-
-@celery.task
-def send_comment_notification_email(to_email: str, ticket_id: int, subject: str, commenter_name: str):
-    """Send comment notification email."""
-    import asyncio
-    
-    async def send_email():
-        await email_service.send_comment_notification(
-            to_email=to_email,
-            ticket_id=ticket_id,
-            subject=subject,
-            commenter_name=commenter_name,
-        )
-    
-    asyncio.run(send_email()) 
\ No newline at end of file
+from typing import List
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+from ..core.celery import celery
+from ..core.config import settings
+from ..core.email import email_service
+from ..db.session import engine
+from ..models.ticket import Ticket
+from ..models.user import User, UserRole
+
+
+@celery.task
+def send_ticket_created_email(to_email: str, ticket_id: int, subject: str, owner_name: str):
+    """Send ticket created notification email."""
+    import asyncio
+    
+    async def send_email():
+        await email_service.send_ticket_created_notification(
+            to_email=to_email,
+            ticket_id=ticket_id,
+            subject=subject,
+            owner_name=owner_name,
+        )
+    
+    asyncio.run(send_email())
+
+
+@celery.task
+def send_ticket_updated_email(to_email: str, ticket_id: int, subject: str, status: str):
+    """Send ticket updated notification email."""
+    import asyncio
+    
+    async def send_email():
+        await email_service.send_ticket_updated_notification(
+            to_email=to_email,
+            ticket_id=ticket_id,
+            subject=subject,
+            status=status,
+        )
+    
+    asyncio.run(send_email())
+
+
+@celery.task
+def send_comment_notification_email(to_email: str, ticket_id: int, subject: str, commenter_name: str):
+    """Send comment notification email."""
+    import asyncio
+    
+    async def send_email():
+        await email_service.send_comment_notification(
+            to_email=to_email,
+            ticket_id=ticket_id,
+            subject=subject,
+            commenter_name=commenter_name,
+        )
+    
+    asyncio.run(send_email())
+
+
+@celery.task
+def send_ticket_updated_emails(ticket_ids: List[int]):
+    """Send ticket updated notifications for a batch of tickets.
+    
+    Bulk updates enqueue one job per chunk; the tickets and their owners
+    are loaded here in two queries instead of one job per ticket.
+    """
+    import asyncio
+    
+    with Session(engine) as session:
+        tickets = session.exec(
+            select(Ticket).where(Ticket.id.in_(ticket_ids)).options(selectinload(Ticket.owner))
+        ).all()
+        notifications = [
+            dict(to_email=ticket.owner.email, ticket_id=ticket.id, subject=ticket.subject, status=ticket.status)
+            for ticket in tickets
+        ]
+    
+    async def send_emails():
+        for notification in notifications:
+            await email_service.send_ticket_updated_notification(**notification)
+    
+    asyncio.run(send_emails())
+
+
+@celery.task
+def send_sla_breach_emails(ticket_ids: List[int]):
+    """Escalate SLA breaches to each ticket's assignee, or to the admins when unassigned.
+    
+    ``sla_escalation_email``, when set, receives every breach as well.
+    """
+    import asyncio
+    
+    with Session(engine) as session:
+        tickets = session.exec(
+            select(Ticket).where(Ticket.id.in_(ticket_ids)).options(selectinload(Ticket.assignee))
+        ).all()
+        admin_emails = session.exec(
+            select(User.email).where(User.role == UserRole.admin, User.is_active.is_(True))
+        ).all()
+        notifications = []
+        for ticket in tickets:
+            recipients = [ticket.assignee.email] if ticket.assignee else list(admin_emails)
+            if settings.sla_escalation_email:
+                recipients.append(settings.sla_escalation_email)
+            notifications.extend(
+                dict(
+                    to_email=to_email,
+                    ticket_id=ticket.id,
+                    subject=ticket.subject,
+                    priority=ticket.priority.value,
+                    due_at=ticket.sla_due_at.strftime("%Y-%m-%d %H:%M"),
+                )
+                for to_email in dict.fromkeys(recipients)
+            )
+    
+    async def send_emails():
+        for notification in notifications:
+            await email_service.send_sla_breach_notification(**notification)
+    
+    asyncio.run(send_emails())
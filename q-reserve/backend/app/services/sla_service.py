@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from ..core.cache import ticket_versions
+from ..core.celery import celery
+from ..core.config import settings
+from ..db.session import engine
+from ..models.sla import SlaPolicy
+from ..models.ticket import SLA_OPEN_STATUSES, Ticket, TicketPriority
+from .event_service import publish_events, ticket_event
+from .notification_service import send_sla_breach_emails
+
+SlaTargets = Dict[Tuple[TicketPriority, Optional[int]], timedelta]
+
+
+def load_sla_targets(session: Session) -> SlaTargets:
+    """Resolution targets by (priority, category_id); category None is the default."""
+    targets: SlaTargets = {
+        (priority, None): timedelta(hours=settings.sla_resolution_hours[priority.value])
+        for priority in TicketPriority
+        if priority.value in settings.sla_resolution_hours
+    }
+    for policy in session.exec(select(SlaPolicy)).all():
+        targets[(policy.priority, policy.category_id)] = timedelta(hours=policy.resolution_hours)
+    return targets
+
+
+def sla_due_at(
+    targets: SlaTargets, priority: TicketPriority, category_id: Optional[int], created_at: datetime
+) -> Optional[datetime]:
+    """Deadline for a ticket: the category's policy, else the priority's default."""
+    target = targets.get((priority, category_id)) or targets.get((priority, None))
+    return created_at + target if target else None
+
+
+def apply_sla(session: Session, ticket: Ticket, targets: Optional[SlaTargets] = None):
+    """Set a ticket's deadline from its priority and category, counted from creation.
+
+    A breach is cleared when the new deadline is still ahead (or there is
+    none any more); a deadline that moved into the past is flagged by the
+    next escalation run.
+    """
+    targets = targets if targets is not None else load_sla_targets(session)
+    ticket.sla_due_at = sla_due_at(targets, ticket.priority, ticket.category_id, ticket.created_at)
+    if ticket.sla_breached_at is not None and (ticket.sla_due_at is None or ticket.sla_due_at > datetime.utcnow()):
+        ticket.sla_breached_at = None
+
+
+@celery.task
+def refresh_sla_due_dates(ticket_ids: List[int]):
+    """Recompute deadlines after a bulk update changed priorities or categories."""
+    with Session(engine) as session:
+        targets = load_sla_targets(session)
+        tickets = session.exec(select(Ticket).where(Ticket.id.in_(ticket_ids))).all()
+        changed = 0
+        for ticket in tickets:
+            due_at, breached_at = ticket.sla_due_at, ticket.sla_breached_at
+            apply_sla(session, ticket, targets)
+            if (ticket.sla_due_at, ticket.sla_breached_at) != (due_at, breached_at):
+                ticket.version = Ticket.version + 1
+                session.add(ticket)
+                changed += 1
+        session.commit()
+
+    if changed:
+        ticket_versions.bump()
+
+
+def pending_sla_conditions():
+    """Conditions matching the predicate of ``ix_tickets_sla_due_at_pending``."""
+    return [Ticket.sla_breached_at.is_(None), Ticket.status.in_(SLA_OPEN_STATUSES)]
+
+
+@celery.task
+def escalate_sla_breaches() -> int:
+    """Flag open tickets whose deadline has passed and notify about them.
+
+    Runs every minute. Each batch is a range scan of the partial index on
+    ``sla_due_at``, which only holds tickets that can still breach, so a
+    tick reads just the tickets that came due since the last one. Rows
+    locked by a concurrent update are skipped and picked up next tick.
+    """
+    now = datetime.utcnow()
+    escalated = 0
+    while True:
+        with Session(engine) as session:
+            due = session.exec(
+                select(Ticket.id)
+                .where(*pending_sla_conditions(), Ticket.sla_due_at <= now)
+                .order_by(Ticket.sla_due_at)
+                .limit(settings.sla_check_batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not due:
+                break
+
+            rows = session.execute(
+                update(Ticket)
+                .where(Ticket.id.in_(due), *pending_sla_conditions())
+                .values(sla_breached_at=now, version=Ticket.version + 1, updated_at=now, last_activity=now)
+                .returning(Ticket.id, Ticket.owner_id, Ticket.version)
+                .execution_options(synchronize_session=False)
+            ).all()
+            session.commit()
+
+        escalated += len(rows)
+        ticket_versions.bump()
+        publish_events([
+            ticket_event("ticket.sla_breached", ticket_id, owner_id, version, fields=["sla_breached_at"])
+            for ticket_id, owner_id, version in rows
+        ])
+        send_sla_breach_emails.delay([row[0] for row in rows])
+
+        if len(due) < settings.sla_check_batch_size:
+            break
+
+    return escalated
@@ -0,0 +1,173 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from ..core.celery import celery
+from ..db.session import engine
+from ..models.category import Category
+from ..models.ticket import (
+    Ticket,
+    TicketBacklogStats,
+    TicketPriority,
+    TicketStats,
+    TicketStatsGroup,
+    TicketStatsRollup,
+    TicketStatus,
+)
+from ..models.user import User
+
+# Ticket fields that decide which rollup group a ticket belongs to
+STATS_FIELDS = {"status", "priority", "category_id", "assignee_id"}
+
+# Tickets still waiting on someone
+BACKLOG_STATUSES = (TicketStatus.open, TicketStatus.in_progress)
+
+StatsKey = Tuple[TicketStatus, TicketPriority, int, int]
+
+
+def stats_key(ticket: Ticket) -> StatsKey:
+    return (ticket.status, ticket.priority, ticket.category_id or 0, ticket.assignee_id or 0)
+
+
+def epoch_seconds(value: datetime) -> int:
+    return int(value.timestamp()) if value.tzinfo else int((value - datetime(1970, 1, 1)).total_seconds())
+
+
+def _upsert(session: Session):
+    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return insert(TicketStatsRollup.__table__)
+
+
+def adjust_ticket_stats(session: Session, key: StatsKey, count: int, created_at: datetime):
+    """Add ``count`` tickets created at ``created_at`` to a group (negative to remove)."""
+    status, priority, category_id, assignee_id = key
+    table = TicketStatsRollup.__table__
+    statement = _upsert(session).values(
+        status=status,
+        priority=priority,
+        category_id=category_id,
+        assignee_id=assignee_id,
+        ticket_count=count,
+        created_at_total=count * epoch_seconds(created_at),
+    )
+    session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["status", "priority", "category_id", "assignee_id"],
+            set_={
+                "ticket_count": table.c.ticket_count + statement.excluded.ticket_count,
+                "created_at_total": table.c.created_at_total + statement.excluded.created_at_total,
+            },
+        )
+    )
+
+
+def record_ticket_stats(session: Session, ticket: Ticket, old_key: Optional[StatsKey] = None):
+    """Move a ticket between rollup groups within the current transaction.
+
+    Call with no ``old_key`` for a new ticket, or with the key the ticket
+    had before it was changed.
+    """
+    new_key = stats_key(ticket)
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        adjust_ticket_stats(session, old_key, -1, ticket.created_at)
+    adjust_ticket_stats(session, new_key, 1, ticket.created_at)
+
+
+@celery.task
+def rebuild_ticket_stats():
+    """Recompute the rollup from ``tickets``, correcting any drift.
+
+    Bulk updates and imports change tickets without maintaining the rollup
+    and schedule this instead. On PostgreSQL the rollup is locked first, so
+    incremental updates wait and then apply on top of the rebuilt counts.
+    """
+    started = time.monotonic()
+    table = TicketStatsRollup.__table__
+    groups = select(
+        Ticket.status,
+        Ticket.priority,
+        func.coalesce(Ticket.category_id, 0),
+        func.coalesce(Ticket.assignee_id, 0),
+        func.count(Ticket.id),
+        func.coalesce(func.sum(func.extract("epoch", Ticket.created_at)), 0).cast(table.c.created_at_total.type),
+    ).group_by(Ticket.status, Ticket.priority, Ticket.category_id, Ticket.assignee_id)
+
+    with Session(engine) as session:
+        if session.get_bind().dialect.name == "postgresql":
+            session.execute(text("LOCK TABLE ticket_stats IN EXCLUSIVE MODE"))
+        session.execute(delete(TicketStatsRollup))
+        session.execute(table.insert().from_select(
+            ["status", "priority", "category_id", "assignee_id", "ticket_count", "created_at_total"],
+            groups,
+        ))
+        session.commit()
+
+    return {"seconds": round(time.monotonic() - started, 2)}
+
+
+def get_ticket_stats(session: Session) -> TicketStats:
+    """Dashboard counts read from the rollup: cost grows with groups, not tickets."""
+    rows = session.exec(select(TicketStatsRollup).where(TicketStatsRollup.ticket_count > 0)).all()
+
+    by_status = {status.value: 0 for status in TicketStatus}
+    by_priority = {priority.value: 0 for priority in TicketPriority}
+    categories: Dict[int, list] = {}
+    assignees: Dict[int, list] = {}
+    backlog_count = 0
+    backlog_created_total = 0
+
+    for row in rows:
+        in_backlog = row.status in BACKLOG_STATUSES
+        by_status[row.status.value] += row.ticket_count
+        by_priority[row.priority.value] += row.ticket_count
+        for groups, group_id in ((categories, row.category_id), (assignees, row.assignee_id)):
+            counts = groups.setdefault(group_id, [0, 0])
+            counts[0] += row.ticket_count
+            counts[1] += row.ticket_count if in_backlog else 0
+        if in_backlog:
+            backlog_count += row.ticket_count
+            backlog_created_total += row.created_at_total
+
+    category_names = dict(session.exec(select(Category.id, Category.name).where(Category.id.in_(categories))).all())
+    assignee_names = dict(session.exec(select(User.id, User.full_name).where(User.id.in_(assignees))).all())
+
+    def group_list(groups: Dict[int, list], names: Dict[int, str]):
+        return sorted(
+            (
+                TicketStatsGroup(id=group_id or None, name=names.get(group_id), count=count, backlog=backlog)
+                for group_id, (count, backlog) in groups.items()
+            ),
+            key=lambda group: group.count,
+            reverse=True,
+        )
+
+    # One index probe per backlog status on (status, created_at)
+    oldest = [
+        session.exec(select(func.min(Ticket.created_at)).where(Ticket.status == status)).one()
+        for status in BACKLOG_STATUSES
+    ]
+    oldest = [created_at for created_at in oldest if created_at is not None]
+
+    average_age_hours = None
+    if backlog_count:
+        mean_created = backlog_created_total / backlog_count
+        average_age_hours = round((epoch_seconds(datetime.utcnow()) - mean_created) / 3600, 1)
+
+    return TicketStats(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_priority=by_priority,
+        by_category=group_list(categories, category_names),
+        by_assignee=group_list(assignees, assignee_names),
+        backlog=TicketBacklogStats(
+            tickets=backlog_count,
+            average_age_hours=average_age_hours,
+            oldest_created_at=min(oldest) if oldest else None,
+        ),
+    )
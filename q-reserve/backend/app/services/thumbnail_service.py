@@ -0,0 +1,109 @@
+import os
+import uuid
+from typing import List
+
+from PIL import Image, ImageOps
+from redis.exceptions import RedisError
+
+from ..core.celery import celery
+from ..core.config import settings
+from ..core.redis import get_redis
+from .attachment_service import blob_path
+
+# Pillow format name and MIME type for each thumbnail format we produce
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+THUMBNAIL_SOURCE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+REQUEUE_SECONDS = 60  # a missing thumbnail is queued at most this often
+
+
+def can_thumbnail(mime_type: str) -> bool:
+    """Check whether thumbnails can be generated for a MIME type."""
+    return mime_type in THUMBNAIL_SOURCE_TYPES
+
+
+def thumbnail_path(content_hash: str, size: int, fmt: str) -> str:
+    """Return the path of a thumbnail relative to upload_dir.
+
+    Thumbnails sit next to the original blob and are named after its
+    content hash, so a name always refers to the same bytes and can be
+    cached indefinitely.
+    """
+    return f"{blob_path(content_hash)}.thumb-{size}.{fmt}"
+
+
+def thumbnail_exists(content_hash: str, size: int, fmt: str) -> bool:
+    """Check whether a thumbnail has already been generated."""
+    return os.path.exists(os.path.join(settings.upload_dir, thumbnail_path(content_hash, size, fmt)))
+
+
+def render_thumbnail(content_hash: str, size: int, fmt: str) -> str:
+    """Render one thumbnail of a blob, unless it already exists."""
+    relative_path = thumbnail_path(content_hash, size, fmt)
+    dest_path = os.path.join(settings.upload_dir, relative_path)
+    if os.path.exists(dest_path):
+        return relative_path
+
+    pil_format, _ = THUMBNAIL_FORMATS[fmt]
+    source_path = os.path.join(settings.upload_dir, blob_path(content_hash))
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((size, size))
+        if pil_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+        # Write to a temporary name first so readers never see a partial file
+        tmp_path = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+        image.save(tmp_path, pil_format, quality=80)
+
+    os.replace(tmp_path, dest_path)
+    return relative_path
+
+
+@celery.task
+def generate_thumbnails(content_hash: str) -> List[str]:
+    """Render every configured thumbnail size and format for an image blob."""
+    return [
+        render_thumbnail(content_hash, size, fmt)
+        for size in settings.thumbnail_sizes
+        for fmt in THUMBNAIL_FORMATS
+    ]
+
+
+@celery.task
+def generate_thumbnail(content_hash: str, size: int, fmt: str) -> str:
+    """Render a single thumbnail on demand."""
+    return render_thumbnail(content_hash, size, fmt)
+
+
+def request_thumbnail(content_hash: str, size: int, fmt: str) -> str:
+    """Make sure a missing thumbnail is being rendered, without waiting for it.
+
+    Returns "ready" once the file exists, "pending" while the worker has
+    it, "missing" if the original blob is gone and "invalid" if it could
+    not be decoded. Renders run under a task id derived from the thumbnail
+    name, so the outcome of the last attempt is a single result lookup.
+    """
+    if thumbnail_exists(content_hash, size, fmt):
+        return "ready"
+
+    task_id = f"thumbnail-{content_hash}-{size}-{fmt}"
+    result = generate_thumbnail.AsyncResult(task_id)
+    if not result.failed():
+        try:
+            queue = get_redis().set(f"qreserve:thumbnail-queued:{task_id}", 1, nx=True, ex=REQUEUE_SECONDS)
+        except RedisError:
+            queue = True
+        if queue:
+            result = generate_thumbnail.apply_async((content_hash, size, fmt), task_id=task_id)
+
+    if result.failed():
+        return "missing" if isinstance(result.result, FileNotFoundError) else "invalid"
+    if thumbnail_exists(content_hash, size, fmt):
+        return "ready"
+    return "pending"
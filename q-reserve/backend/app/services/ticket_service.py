@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import case, delete, or_, update
+from sqlmodel import Session, select, func
+
+from ..core.celery import celery
+from ..core.config import settings
+from ..db.session import engine
+from ..models.ticket import Ticket, TicketTombstone
+from ..models.comment import Comment
+from ..models.vote import Vote, VoteType
+from .flow_service import record_bulk_status_changes
+
+
+def bump_ticket_version(session: Session, ticket_id: int):
+    """Increment a ticket's version as part of the current transaction.
+
+    Every write that changes what ``TicketRead`` returns for a ticket
+    (fields, comments, votes) must call this so that cached copies and
+    ETags are invalidated, and so that delta sync picks the ticket up via
+    ``last_activity``.
+    """
+    session.execute(
+        update(Ticket)
+        .where(Ticket.id == ticket_id)
+        .values(version=Ticket.version + 1, last_activity=datetime.utcnow())
+    )
+
+
+def ticket_etag(
+    ticket_id: int,
+    version: int,
+    updated_at: datetime,
+    last_activity: datetime,
+    user_id: int,
+    category_version: Optional[int],
+    user_version: Optional[int],
+) -> str:
+    """Build the weak ETag for a user's view of a ticket.
+
+    The user id is included because ``user_vote`` differs per user, and the
+    category and user versions because the nested category, owner and
+    assignee are part of the response.
+    """
+    return (
+        f'W/"ticket-{ticket_id}-{version}-{updated_at.timestamp():.6f}'
+        f'-{last_activity.timestamp():.6f}-u{user_id}-c{category_version}-v{user_version}"'
+    )
+
+
+def get_comment_counts(session: Session, ticket_ids: Iterable[int]) -> Dict[int, int]:
+    """Count comments for several tickets in one query."""
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return {}
+
+    rows = session.exec(
+        select(Comment.ticket_id, func.count(Comment.id))
+        .where(Comment.ticket_id.in_(ticket_ids))
+        .group_by(Comment.ticket_id)
+    ).all()
+    return {ticket_id: count for ticket_id, count in rows}
+
+
+def get_vote_scores(session: Session, ticket_ids: Iterable[int]) -> Dict[int, int]:
+    """Compute upvotes minus downvotes for several tickets in one query."""
+    ticket_ids = list(ticket_ids)
+    if not ticket_ids:
+        return {}
+
+    score = func.sum(case((Vote.vote_type == VoteType.up, 1), else_=-1))
+    rows = session.exec(
+        select(Vote.ticket_id, score)
+        .where(Vote.ticket_id.in_(ticket_ids))
+        .group_by(Vote.ticket_id)
+    ).all()
+    return {ticket_id: int(total or 0) for ticket_id, total in rows}
+
+
+def get_ticket_counts(session: Session, ticket_id: int) -> Tuple[int, int]:
+    """Return (comment_count, vote_score) for a single ticket."""
+    comment_count = get_comment_counts(session, [ticket_id]).get(ticket_id, 0)
+    vote_score = get_vote_scores(session, [ticket_id]).get(ticket_id, 0)
+    return comment_count, vote_score
+
+
+def ticket_changed_condition(changes: Dict[str, Any]):
+    """SQL condition matching tickets that ``changes`` would actually modify."""
+    return or_(*[getattr(Ticket, name).is_distinct_from(value) for name, value in changes.items()])
+
+
+def ticket_filter_conditions(ticket_filter: Dict[str, Any]) -> List[Any]:
+    """Turn a filter of column values into SQL conditions (None matches NULL)."""
+    return [
+        getattr(Ticket, name).is_(None) if value is None else getattr(Ticket, name) == value
+        for name, value in ticket_filter.items()
+    ]
+
+
+def update_ticket_chunk(session: Session, conditions: List[Any], changes: Dict[str, Any]) -> List[Tuple[int, int, int]]:
+    """Apply changes to the matching tickets in one UPDATE and commit.
+
+    Tickets the changes would not modify are left alone. Returns
+    (id, owner_id, version) for each updated ticket.
+    """
+    # Status changes are recorded for flow metrics, which need the old status
+    previous = []
+    if "status" in changes:
+        previous = session.exec(
+            select(Ticket.id, Ticket.status, Ticket.category_id, Ticket.created_at)
+            .where(*conditions, ticket_changed_condition(changes))
+            .with_for_update()
+        ).all()
+    
+    now = datetime.utcnow()
+    rows = session.execute(
+        update(Ticket)
+        .where(*conditions, ticket_changed_condition(changes))
+        .values(**changes, version=Ticket.version + 1, updated_at=now, last_activity=now)
+        .returning(Ticket.id, Ticket.owner_id, Ticket.version)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if previous:
+        record_bulk_status_changes(session, previous, changes, {row[0] for row in rows})
+    session.commit()
+    return [tuple(row) for row in rows]
+
+
+def bulk_update_by_ids(
+    session: Session, ticket_ids: List[int], changes: Dict[str, Any]
+) -> Iterator[Tuple[Dict[int, str], List[Tuple[int, int, int]]]]:
+    """Update tickets by id, one chunk per transaction.
+
+    Yields the per-id results and the updated rows of each chunk after it
+    has been committed.
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    chunk_size = settings.bulk_update_chunk_size
+    for start in range(0, len(ticket_ids), chunk_size):
+        chunk = ticket_ids[start:start + chunk_size]
+        rows = update_ticket_chunk(session, [Ticket.id.in_(chunk)], changes)
+        
+        results = {ticket_id: "not_found" for ticket_id in chunk}
+        results.update({row[0]: "updated" for row in rows})
+        missing = [ticket_id for ticket_id, result in results.items() if result == "not_found"]
+        if missing:
+            existing = session.exec(select(Ticket.id).where(Ticket.id.in_(missing))).all()
+            results.update({ticket_id: "unchanged" for ticket_id in existing})
+        
+        yield results, rows
+
+
+def bulk_update_by_filter(
+    session: Session, ticket_filter: Dict[str, Any], changes: Dict[str, Any], limit: int
+) -> Iterator[Tuple[Dict[int, str], List[Tuple[int, int, int]]]]:
+    """Update up to ``limit`` tickets matching a filter, one chunk per transaction.
+
+    Only tickets the changes would modify are selected, so updated tickets
+    drop out of the next chunk's query and running the same request again
+    carries on where a limited run stopped. Selected tickets that no longer
+    match by the time they are updated are reported as unchanged.
+    """
+    conditions = ticket_filter_conditions(ticket_filter)
+    remaining = limit
+    while remaining > 0:
+        chunk = session.exec(
+            select(Ticket.id)
+            .where(*conditions, ticket_changed_condition(changes))
+            .order_by(Ticket.id)
+            .limit(min(settings.bulk_update_chunk_size, remaining))
+        ).all()
+        if not chunk:
+            return
+        
+        # Re-check the filter in case a ticket changed since it was selected
+        rows = update_ticket_chunk(session, [Ticket.id.in_(chunk), *conditions], changes)
+        remaining -= len(chunk)
+        
+        results = {ticket_id: "unchanged" for ticket_id in chunk}
+        results.update({row[0]: "updated" for row in rows})
+        yield results, rows
+
+
+def has_pending_bulk_update(session: Session, ticket_filter: Dict[str, Any], changes: Dict[str, Any]) -> bool:
+    """Check whether any ticket matching a filter still needs the changes."""
+    return session.exec(
+        select(Ticket.id)
+        .where(*ticket_filter_conditions(ticket_filter), ticket_changed_condition(changes))
+        .limit(1)
+    ).first() is not None
+
+
+@celery.task
+def prune_ticket_tombstones() -> int:
+    """Delete tombstones older than the sync retention period.
+
+    Clients holding a token older than that are told to resync in full.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.sync_tombstone_days)
+    with Session(engine) as session:
+        result = session.execute(delete(TicketTombstone).where(TicketTombstone.removed_at < cutoff))
+        session.commit()
+        return result.rowcount
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Endpoint latency benchmark.
+
+Drives a weighted mix of ticket, comment, vote and login requests at a
+fixed concurrency and reports throughput and p50/p95/p99 latency per
+endpoint. Results are written as JSON and can be compared against an
+earlier run to catch regressions.
+
+By default the app runs in-process (httpx ASGI transport) against the
+database in DATABASE_URL, which is seeded first if it has no generated
+users. Use --base-url to benchmark a running server instead (seed it with
+`make generate-data` beforehand).
+
+Usage:
+    python benchmarks/run.py --duration 30 --concurrency 20
+    python benchmarks/run.py --base-url http://localhost:8000 --mix list=50,get=50
+    python benchmarks/run.py --compare benchmarks/results/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+DEFAULT_MIX = {
+    "list_tickets": 30,
+    "get_ticket": 25,
+    "get_ticket_comments": 20,
+    "vote_ticket": 10,
+    "create_comment": 10,
+    "login": 5,
+}
+
+# Short names accepted by --mix
+MIX_ALIASES = {
+    "list": "list_tickets",
+    "get": "get_ticket",
+    "comments": "get_ticket_comments",
+    "vote": "vote_ticket",
+    "comment": "create_comment",
+    "login": "login",
+}
+
+PASSWORD = "password"  # what scripts/generate_data.py gives every user
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = MIX_ALIASES.get(name.strip(), name.strip())
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {name!r}")
+        mix[name] = int(weight)
+    return mix
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> Dict[str, dict]:
+    endpoints = {}
+    for name in sorted(set(samples) | set(errors)):
+        latencies = sorted(samples.get(name, []))
+        endpoints[name] = {
+            "requests": len(latencies),
+            "errors": errors.get(name, 0),
+            "throughput": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        }
+    return endpoints
+
+
+class Benchmark:
+    def __init__(self, client: httpx.AsyncClient, mix: Dict[str, int], users: List[str], rng: random.Random):
+        self.client = client
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.users = users
+        self.rng = rng
+        self.tokens: Dict[str, str] = {}
+        self.ticket_ids: List[int] = []
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def login(self, email: str) -> httpx.Response:
+        response = await self.client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+        if response.status_code == 200:
+            self.tokens[email] = response.json()["access_token"]
+        return response
+
+    async def prepare(self, agent_emails: List[str]):
+        """Log everyone in and collect ticket ids to request."""
+        # A few generated users are inactive and cannot log in
+        for email in self.users + agent_emails:
+            await self.login(email)
+        self.users = [email for email in self.users if email in self.tokens]
+        agents = [email for email in agent_emails if email in self.tokens]
+        if not self.users or not agents:
+            raise SystemExit("Could not log in as the generated users; is the database seeded?")
+
+        # Requests run as an agent so every ticket is visible
+        self.agent_email = agents[0]
+        headers = {"Authorization": f"Bearer {self.tokens[self.agent_email]}"}
+        for page in range(1, 6):
+            response = await self.client.get(
+                "/api/v1/tickets/", params={"view": "compact", "page": page, "page_size": 100}, headers=headers
+            )
+            response.raise_for_status()
+            self.ticket_ids.extend(ticket["id"] for ticket in response.json())
+        if not self.ticket_ids:
+            raise SystemExit("No tickets to benchmark against; seed the database first")
+
+    async def request(self, name: str) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {self.tokens[self.agent_email]}"}
+        ticket_id = self.rng.choice(self.ticket_ids)
+
+        if name == "list_tickets":
+            params = {"page": self.rng.randint(1, 5), "page_size": 20}
+            if self.rng.random() < 0.3:
+                params["status"] = self.rng.choice(["open", "in_progress", "resolved", "closed"])
+            return await self.client.get("/api/v1/tickets/", params=params, headers=headers)
+        if name == "get_ticket":
+            return await self.client.get(f"/api/v1/tickets/{ticket_id}", headers=headers)
+        if name == "get_ticket_comments":
+            return await self.client.get(f"/api/v1/comments/ticket/{ticket_id}", headers=headers)
+        if name == "vote_ticket":
+            vote_type = self.rng.choice(["up", "down"])
+            return await self.client.post(
+                f"/api/v1/tickets/{ticket_id}/vote", params={"vote_type": vote_type}, headers=headers
+            )
+        if name == "create_comment":
+            return await self.client.post(
+                "/api/v1/comments/",
+                json={"ticket_id": ticket_id, "content": "Benchmark comment"},
+                headers=headers,
+            )
+        return await self.login(self.rng.choice(self.users))
+
+    async def worker(self, deadline: float, remaining: Optional[List[int]]):
+        while time.monotonic() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+
+            name = self.rng.choices(self.names, self.weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await self.request(name)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latency = time.perf_counter() - started
+
+            if ok:
+                self.samples[name].append(latency)
+            else:
+                self.errors[name] += 1
+
+    async def run(self, concurrency: int, duration: float, requests: Optional[int]) -> float:
+        deadline = time.monotonic() + duration
+        remaining = [requests] if requests else None
+        started = time.monotonic()
+        await asyncio.gather(*[self.worker(deadline, remaining) for _ in range(concurrency)])
+        return time.monotonic() - started
+
+
+def seed_in_process(scale_users: int, scale_tickets: int, prefix: str, seed: int):
+    """Create the schema and, if needed, a generated dataset for in-process runs."""
+    from sqlmodel import SQLModel, Session, select
+    from backend.app.db.session import engine
+    from backend.app.models.user import User
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        if session.exec(select(User.id).where(User.email == f"{prefix}0@example.com")).first():
+            return
+
+    from scripts import generate_data
+    generate_data.main([
+        "--users", str(scale_users),
+        "--tickets", str(scale_tickets),
+        "--prefix", prefix,
+        "--seed", str(seed),
+    ])
+
+
+def print_table(endpoints: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None):
+    print(f"{'endpoint':<22}{'reqs':>8}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in endpoints.items():
+        line = (
+            f"{name:<22}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput']:>10.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+        if baseline and name in baseline and baseline[name]["p95_ms"]:
+            change = stats["p95_ms"] / baseline[name]["p95_ms"] - 1
+            line += f"   p95 {change:+.0%}"
+        print(line)
+
+
+def find_regressions(endpoints: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in endpoints.items():
+        before = baseline.get(name)
+        if before and before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+    return regressions
+
+
+async def main_async(args) -> dict:
+    rng = random.Random(args.seed)
+    agent_count = min(max(5, args.users // 100), args.users // 2)
+    agent_emails = [f"{args.prefix}{index}@example.com" for index in range(agent_count)]
+    users = [f"{args.prefix}{index}@example.com" for index in range(agent_count, agent_count + args.login_users)]
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        seed_in_process(args.users, args.tickets, args.prefix, args.seed)
+        from backend.app.core.celery import celery
+        from backend.app.main import app
+
+        # No worker in-process: run tasks inline
+        celery.conf.task_always_eager = True
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=30)
+
+    async with client:
+        benchmark = Benchmark(client, args.mix, users, rng)
+        await benchmark.prepare(agent_emails)
+        if args.warmup:
+            await benchmark.run(args.concurrency, args.warmup, None)
+            benchmark.samples.clear()
+            benchmark.errors.clear()
+        elapsed = await benchmark.run(args.concurrency, args.duration, args.requests)
+
+    total = sum(len(latencies) for latencies in benchmark.samples.values())
+    return {
+        "started_at": datetime.utcnow().isoformat(),
+        "target": args.base_url or os.environ.get("DATABASE_URL", "in-process"),
+        "concurrency": args.concurrency,
+        "duration_seconds": round(elapsed, 2),
+        "mix": args.mix,
+        "seed": args.seed,
+        "throughput": round(total / elapsed, 2),
+        "endpoints": summarize(benchmark.samples, benchmark.errors, elapsed),
+    }
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark q-reserve endpoints")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds of unrecorded warm-up")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. list=30,get=25,comment=10")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=1000, help="users to generate for in-process runs")
+    parser.add_argument("--tickets", type=int, default=5000, help="tickets to generate for in-process runs")
+    parser.add_argument("--prefix", default="lt", help="email prefix of generated users")
+    parser.add_argument("--login-users", type=int, default=20, help="distinct users used for login requests")
+    parser.add_argument("--output", help="result file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+
+    print(f"\n{result['throughput']:.1f} req/s overall at concurrency {args.concurrency}\n")
+    print_table(result["endpoints"], baseline)
+
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        f"{datetime.utcnow():%Y%m%d-%H%M%S}.json",
+    )
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        regressions = find_regressions(result["endpoints"], baseline, args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
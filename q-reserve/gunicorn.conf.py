@@ -0,0 +1,18 @@
+"""Gunicorn settings for production.
+
+    gunicorn -c gunicorn.conf.py backend.app.main:app
+"""
+
+import os
+
+# Imported here, in the master, so this host's metrics directory is cleared
+# once before the workers are forked rather than by each of them
+from backend.app.core import metrics
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", 4))
+
+
+def child_exit(server, worker):
+    metrics.mark_process_dead(worker.pid)
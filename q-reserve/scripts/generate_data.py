@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Generate a large synthetic dataset for load testing and query planning.
+
+Creates users, tickets, threaded comments and votes with skewed, realistic
+distributions: a few customers own most tickets, some threads run deep,
+and a small share of "hot" tickets collect most of the votes. The same
+seed always produces the same dataset (timestamps are relative to now).
+
+Usage:
+    python scripts/generate_data.py --scale medium
+    python scripts/generate_data.py --users 50000 --tickets 2000000 --seed 7
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, select
+
+from backend.app.core.cache import category_versions, ticket_versions, user_versions
+from backend.app.core.security import get_password_hash
+from backend.app.db.bulk import bulk_insert
+from backend.app.db.init_db import init_db
+from backend.app.db.session import engine
+from backend.app.models.attachment import Attachment  # noqa: F401 (mapped by Ticket.attachments)
+from backend.app.models.category import Category
+from backend.app.models.comment import Comment
+from backend.app.models.ticket import Ticket, TicketPriority, TicketStatus, TicketStatusEvent
+from backend.app.models.user import User, UserRole
+from backend.app.models.vote import Vote, VoteType
+from backend.app.services.assignment_service import rebuild_agent_load
+from backend.app.services.flow_service import DONE_STATUSES, aggregate_ticket_flow, status_event
+from backend.app.services.sla_service import load_sla_targets, sla_due_at
+from backend.app.services.stats_service import rebuild_ticket_stats
+
+# (users, tickets) per named scale; comments and votes follow from the distributions
+SCALES = {
+    "small": (1_000, 5_000),
+    "medium": (10_000, 100_000),
+    "large": (100_000, 1_000_000),
+    "xl": (1_000_000, 5_000_000),
+}
+
+STATUS_WEIGHTS = {
+    TicketStatus.open: 20,
+    TicketStatus.in_progress: 15,
+    TicketStatus.resolved: 25,
+    TicketStatus.closed: 40,
+}
+PRIORITY_WEIGHTS = {
+    TicketPriority.low: 30,
+    TicketPriority.medium: 45,
+    TicketPriority.high: 20,
+    TicketPriority.urgent: 5,
+}
+
+WORDS = (
+    "login error page slow crash invoice payment account password reset email "
+    "export report dashboard sync mobile app upload timeout permission billing "
+    "refund update install printer network vpn access settings notification"
+).split()
+
+HISTORY_DAYS = 730
+
+
+class Timer:
+    def __init__(self):
+        self.rows = {}
+        self.seconds = {}
+
+    def record(self, table: str, rows: int, seconds: float):
+        self.rows[table] = self.rows.get(table, 0) + rows
+        self.seconds[table] = self.seconds.get(table, 0.0) + seconds
+
+    def report(self):
+        for table, rows in self.rows.items():
+            seconds = self.seconds[table]
+            rate = rows / seconds if seconds else 0
+            print(f"  {table:<20} {rows:>10} rows  {seconds:8.1f}s  {rate:10.0f} rows/s")
+
+
+def zipf_cum_weights(count: int, exponent: float):
+    """Cumulative weights giving rank r a share proportional to 1 / r**exponent."""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def pick(rng: random.Random, population, cum_weights):
+    return population[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def insert_timed(session: Session, timer: Timer, table, rows, return_ids: bool = False):
+    started = time.monotonic()
+    ids = bulk_insert(session, table, rows, return_ids=return_ids)
+    timer.record(table.name, len(rows), time.monotonic() - started)
+    return ids
+
+
+def generate_users(session: Session, rng: random.Random, timer: Timer, count: int, prefix: str, batch_size: int):
+    """Create end users and agents (about 1%); returns their ids by role."""
+    hashed_password = get_password_hash("password")  # hashing once keeps this fast
+    agent_count = min(max(5, count // 100), count // 2)
+    end_users, agents = [], []
+
+    for start in range(0, count, batch_size):
+        rows = []
+        for index in range(start, min(start + batch_size, count)):
+            role = UserRole.agent if index < agent_count else UserRole.end_user
+            created_at = datetime.utcnow() - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+            rows.append({
+                "email": f"{prefix}{index}@example.com",
+                "full_name": f"{rng.choice(WORDS).capitalize()} {prefix.upper()}{index}",
+                "role": role.name,
+                "is_active": rng.random() > 0.02,
+                "dark_mode": rng.random() < 0.3,
+                "hashed_password": hashed_password,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+        ids = insert_timed(session, timer, User.__table__, rows, return_ids=True)
+        for row, user_id in zip(rows, ids):
+            (agents if row["role"] == UserRole.agent.name else end_users).append(user_id)
+        session.commit()
+
+    return end_users, agents
+
+
+def comment_tree(rng: random.Random, count: int):
+    """Return (parent index or None, depth) for each comment of a thread.
+
+    Replies favour the latest comment, which produces long back-and-forth
+    chains as well as a few side branches.
+    """
+    nodes = []
+    for index in range(count):
+        if index == 0 or rng.random() < 0.3:
+            nodes.append((None, 0))
+        elif rng.random() < 0.7:
+            nodes.append((index - 1, nodes[index - 1][1] + 1))
+        else:
+            parent = rng.randrange(index)
+            nodes.append((parent, nodes[parent][1] + 1))
+    return nodes
+
+
+def generate_tickets(
+    session: Session,
+    rng: random.Random,
+    timer: Timer,
+    count: int,
+    end_users,
+    agents,
+    categories,
+    batch_size: int,
+):
+    """Create tickets with their status history, comment threads and votes, one batch per transaction."""
+    # A few customers file most of the tickets
+    owner_weights = zipf_cum_weights(len(end_users), 1.1)
+    all_users = end_users + agents
+    statuses, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+    priorities, priority_weights = list(PRIORITY_WEIGHTS), list(PRIORITY_WEIGHTS.values())
+    sla_targets = load_sla_targets(session)
+
+    for start in range(0, count, batch_size):
+        tickets, resolutions = [], []
+        for _ in range(min(batch_size, count - start)):
+            created_at = datetime.utcnow() - timedelta(days=rng.uniform(0, HISTORY_DAYS))
+            status = rng.choices(statuses, status_weights)[0]
+            # Resolution times are heavy-tailed too: most within a day or two
+            resolved_at = None
+            if status in DONE_STATUSES:
+                resolved_at = min(created_at + timedelta(hours=rng.lognormvariate(2.5, 1.3)), datetime.utcnow())
+            resolutions.append((status, resolved_at))
+            subject = sentence(rng, rng.randint(3, 8))
+            description = sentence(rng, rng.randint(10, 60))
+            priority = rng.choices(priorities, priority_weights)[0]
+            category_id = rng.choice(categories) if rng.random() < 0.9 else None
+            # Deadlines missed before now count as breached already, as for imports,
+            # so the escalation task does not flag the whole history at once
+            due_at = sla_due_at(sla_targets, priority, category_id, created_at)
+            breached = due_at is not None and due_at <= (resolved_at or datetime.utcnow())
+            tickets.append({
+                "subject": subject,
+                "description": description,
+                "status": status.name,
+                "priority": priority.name,
+                "category_id": category_id,
+                "assignee_id": rng.choice(agents) if status != TicketStatus.open else None,
+                "owner_id": pick(rng, end_users, owner_weights),
+                "created_at": created_at,
+                "updated_at": resolved_at or created_at,
+                "last_activity": resolved_at or created_at,
+                "version": 1,
+                "sla_due_at": due_at,
+                "sla_breached_at": due_at if breached else None,
+            })
+
+        # Comment counts are heavy-tailed; the thread shape decides parents
+        threads = []
+        for ticket in tickets:
+            size = min(int(rng.lognormvariate(0.8, 1.0)), 200)
+            threads.append(comment_tree(rng, size))
+            if size:
+                ticket["last_activity"] = max(
+                    ticket["last_activity"], ticket["created_at"] + timedelta(hours=size * rng.uniform(1, 12))
+                )
+
+        ticket_ids = insert_timed(session, timer, Ticket.__table__, tickets, return_ids=True)
+
+        # A creation event per ticket, and the resolution of those that are done
+        events = []
+        for ticket_id, ticket, (status, resolved_at) in zip(ticket_ids, tickets, resolutions):
+            created_at, category_id = ticket["created_at"], ticket["category_id"]
+            if resolved_at is None:
+                events.append(status_event(ticket_id, category_id, None, status, created_at, created_at))
+                continue
+            events.append(status_event(ticket_id, category_id, None, TicketStatus.open, created_at, created_at))
+            events.append(status_event(ticket_id, category_id, TicketStatus.open, status, created_at, resolved_at))
+        insert_timed(session, timer, TicketStatusEvent.__table__, events)
+
+        # Insert comments depth by depth so parents exist before replies
+        comment_ids = {}
+        max_depth = max((depth for thread in threads for _, depth in thread), default=-1)
+        for level in range(max_depth + 1):
+            rows, keys = [], []
+            for ticket_index, thread in enumerate(threads):
+                ticket = tickets[ticket_index]
+                for comment_index, (parent, depth) in enumerate(thread):
+                    if depth != level:
+                        continue
+                    created_at = ticket["created_at"] + timedelta(hours=comment_index + rng.random())
+                    rows.append({
+                        "content": sentence(rng, rng.randint(5, 40)),
+                        "ticket_id": ticket_ids[ticket_index],
+                        "parent_id": comment_ids[(ticket_index, parent)] if parent is not None else None,
+                        "author_id": ticket["owner_id"] if rng.random() < 0.5 else rng.choice(agents),
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    })
+                    keys.append((ticket_index, comment_index))
+            comment_ids.update(zip(keys, insert_timed(session, timer, Comment.__table__, rows, return_ids=True)))
+
+        # Most tickets get a handful of votes, a few hot ones get thousands
+        votes = []
+        for ticket_index, ticket_id in enumerate(ticket_ids):
+            if rng.random() < 0.01:
+                vote_count = int(rng.paretovariate(1.2) * 50)
+            else:
+                vote_count = rng.choice((0, 0, 0, 1, 1, 2, 3, 5))
+            voted_at = tickets[ticket_index]["created_at"]
+            for user_id in rng.sample(all_users, min(vote_count, len(all_users), 5000)):
+                votes.append({
+                    "ticket_id": ticket_id,
+                    "user_id": user_id,
+                    "vote_type": (VoteType.up if rng.random() < 0.85 else VoteType.down).name,
+                    "created_at": voted_at,
+                    "updated_at": voted_at,
+                })
+        insert_timed(session, timer, Vote.__table__, votes)
+
+        session.commit()
+        print(f"  {start + len(tickets)}/{count} tickets")
+
+
+def main(argv=None):
+    """Run the generator."""
+    parser = argparse.ArgumentParser(description="Generate synthetic q-reserve data")
+    parser.add_argument("--scale", choices=SCALES, default="small")
+    parser.add_argument("--users", type=int, help="overrides the scale")
+    parser.add_argument("--tickets", type=int, help="overrides the scale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="lt", help="email prefix of generated users, must be unused")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args(argv)
+    if args.users is not None and args.users < 2:
+        parser.error("--users must be at least 2")
+
+    users, tickets = SCALES[args.scale]
+    users = args.users or users
+    tickets = args.tickets or tickets
+    rng = random.Random(args.seed)
+    timer = Timer()
+
+    print(f"Generating {users} users and {tickets} tickets (seed {args.seed})...")
+    init_db()  # makes sure the default categories exist
+
+    with Session(engine) as session:
+        if session.exec(select(User.id).where(User.email == f"{args.prefix}0@example.com")).first():
+            print(f"Users with prefix {args.prefix!r} already exist; pick another --prefix")
+            sys.exit(1)
+
+        categories = list(session.exec(select(Category.id).order_by(Category.id)))
+        end_users, agents = generate_users(session, rng, timer, users, args.prefix, args.batch_size)
+        generate_tickets(session, rng, timer, tickets, end_users, agents, categories, args.batch_size)
+
+    ticket_versions.bump()
+    category_versions.bump()
+    user_versions.bump()
+
+    # Tickets were written directly, so rebuild what is normally kept up to date on the fly
+    print("Rebuilding stats, agent load and flow metrics...")
+    rebuild_ticket_stats()
+    rebuild_agent_load()
+    aggregate_ticket_flow(since=(datetime.utcnow() - timedelta(days=HISTORY_DAYS)).isoformat())
+
+    print("Done:")
+    timer.report()
+
+
+if __name__ == "__main__":
+    main()
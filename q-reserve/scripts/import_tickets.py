@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Import tickets, comments and votes from another helpdesk.
+
+Reads NDJSON or CSV (see TicketImporter for the record format) from a file
+or stdin and loads it in a single transaction. No notifications are sent.
+
+Usage:
+    python scripts/import_tickets.py export.ndjson
+    python scripts/import_tickets.py --format csv tickets.csv
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session
+
+from backend.app.core.cache import category_versions, ticket_versions
+from backend.app.db.session import engine
+from backend.app.services.import_service import IMPORT_FORMATS, ImportRowError, TicketImporter, iter_records
+
+
+def main():
+    """Run the import."""
+    parser = argparse.ArgumentParser(description="Import tickets from another helpdesk")
+    parser.add_argument("path", nargs="?", default="-", help="input file, or - for stdin")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=None, help="records per COPY / INSERT batch")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+
+    try:
+        with source, Session(engine) as session:
+            importer = TicketImporter(session, batch_size=args.batch_size)
+            report = importer.run(iter_records(source, fmt))
+            session.commit()
+    except ImportRowError as e:
+        print(f"Import failed, nothing was imported: {e}")
+        sys.exit(1)
+
+    ticket_versions.bump()
+    category_versions.bump()
+
+    rows = report.tickets + report.comments + report.votes
+    print(f"Imported {report.tickets} tickets, {report.comments} comments and {report.votes} votes")
+    print(f"Created {report.users_created} users and {report.categories_created} categories")
+    print(f"{rows} rows in {report.elapsed_seconds:.1f}s ({report.rows_per_second:.0f} rows/s)")
+    if report.skipped:
+        print(f"Skipped {report.skipped} records:")
+        for error in report.errors:
+            print(f"  {error}")
+
+
+if __name__ == "__main__":
+    main()
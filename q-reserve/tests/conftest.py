@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+# Report per-request query counts so tests can hold endpoints to a budget
+os.environ.setdefault("QUERY_STATS_HEADERS", "true")
+
+# Importing the app loads every model, so relationships between them resolve
+# in tests that only use services
+import backend.app.main  # noqa: E402,F401
+
+
+@pytest.fixture
+def query_budget():
+    """Return a checker that fails when a response ran too many SQL statements.
+
+    Usage: ``query_budget(client.get(...), 5)``; returns the query count so
+    tests can also compare counts across page sizes or thread lengths.
+    """
+    def check(response, max_queries: int) -> int:
+        count = int(response.headers["x-query-count"])
+        assert count <= max_queries, (
+            f"{response.request.method} {response.request.url.path} ran {count} queries, "
+            f"budget is {max_queries}"
+        )
+        return count
+    return check
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Point the shared Redis client at a fresh in-memory server."""
+    import fakeredis
+    from backend.app.core import redis
+
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis, "_client", client)
+    return client
+
+
+@pytest.fixture
+def eager_celery(request, monkeypatch):
+    """Run Celery tasks inline, against the calling test module's ``engine``."""
+    from backend.app.core.celery import celery
+    from backend.app.services import (
+        assignment_service,
+        attachment_service,
+        export_service,
+        flow_service,
+        notification_service,
+        sla_service,
+        stats_service,
+        ticket_service,
+    )
+
+    for module in (
+        assignment_service,
+        attachment_service,
+        export_service,
+        flow_service,
+        notification_service,
+        sla_service,
+        stats_service,
+        ticket_service,
+    ):
+        monkeypatch.setattr(module, "engine", request.module.engine)
+    celery.conf.task_always_eager = True
+    yield
+    celery.conf.task_always_eager = False
@@ -0,0 +1,92 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from backend.app.models.category import Category
+from backend.app.models.ticket import Ticket, TicketStatus
+from backend.app.models.user import AgentSkill, User, UserRole
+from backend.app.services.assignment_service import (
+    ALL_AGENTS_KEY,
+    BUILT_KEY,
+    assign_ticket,
+    category_key,
+    rebuild_agent_load,
+    track_agent_load,
+)
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+@pytest.fixture
+def team(fake_redis, eager_celery):
+    """Two agents, one skilled in "Billing", with two and one open tickets."""
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        billing = Category(name="Billing")
+        skilled = User(email="skilled@example.com", full_name="Skilled", role=UserRole.agent, hashed_password="x")
+        generalist = User(email="general@example.com", full_name="General", role=UserRole.agent, hashed_password="x")
+        admin = User(email="admin@example.com", full_name="Admin", role=UserRole.admin, hashed_password="x")
+        session.add_all([billing, skilled, generalist, admin])
+        session.commit()
+        session.add(AgentSkill(user_id=skilled.id, category_id=billing.id))
+        for assignee, status in [
+            (skilled, TicketStatus.open),
+            (skilled, TicketStatus.in_progress),
+            (generalist, TicketStatus.open),
+            (generalist, TicketStatus.closed),
+            (admin, TicketStatus.open),
+        ]:
+            session.add(Ticket(subject="Ticket", description="Details", owner_id=admin.id, assignee_id=assignee.id, status=status))
+        session.commit()
+        yield {"billing": billing.id, "skilled": skilled.id, "generalist": generalist.id, "admin": admin.id}
+    SQLModel.metadata.drop_all(engine)
+
+
+def loads(redis, key=ALL_AGENTS_KEY) -> dict:
+    return {int(agent_id): int(score) for agent_id, score in redis.zrange(key, 0, -1, withscores=True)}
+
+
+def test_rebuild_counts_open_tickets_of_active_agents(team, fake_redis):
+    rebuild_agent_load()
+
+    assert loads(fake_redis) == {team["skilled"]: 2, team["generalist"]: 1}
+    assert loads(fake_redis, category_key(team["billing"])) == {team["skilled"]: 2}
+
+
+def test_assign_prefers_skilled_agents_then_least_loaded(team, fake_redis):
+    rebuild_agent_load()
+
+    billing_ticket = Ticket(subject="Invoice", description="Details", owner_id=team["admin"], category_id=team["billing"])
+    other_ticket = Ticket(subject="Login", description="Details", owner_id=team["admin"])
+
+    assert assign_ticket(billing_ticket) == team["skilled"]
+    assert assign_ticket(other_ticket) == team["generalist"]
+    assert other_ticket.assignee_id == team["generalist"]
+    assert loads(fake_redis) == {team["skilled"]: 3, team["generalist"]: 2}
+    assert loads(fake_redis, category_key(team["billing"])) == {team["skilled"]: 3}
+
+
+def test_track_agent_load_moves_open_tickets_only(team, fake_redis):
+    rebuild_agent_load()
+    skilled, generalist = team["skilled"], team["generalist"]
+
+    track_agent_load(skilled, TicketStatus.open, generalist, TicketStatus.open)
+    assert loads(fake_redis) == {skilled: 1, generalist: 2}
+
+    track_agent_load(generalist, TicketStatus.open, generalist, TicketStatus.resolved)
+    track_agent_load(generalist, TicketStatus.closed, generalist, TicketStatus.closed)
+    track_agent_load(None, TicketStatus.open, team["admin"], TicketStatus.open)
+    assert loads(fake_redis) == {skilled: 1, generalist: 1}
+
+
+def test_assign_without_index_leaves_ticket_unassigned_and_rebuilds(team, fake_redis):
+    ticket = Ticket(subject="Login", description="Details", owner_id=team["admin"])
+
+    assert assign_ticket(ticket) is None
+    assert ticket.assignee_id is None
+    assert fake_redis.exists(BUILT_KEY)
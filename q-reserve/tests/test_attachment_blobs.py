@@ -0,0 +1,110 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from backend.app.main import app
+from backend.app.core.config import settings
+from backend.app.core.security import create_access_token
+from backend.app.db.session import get_session
+from backend.app.models.attachment import AttachmentBlob
+from backend.app.models.ticket import Ticket
+from backend.app.models.user import User, UserRole
+from backend.app.services.attachment_service import blob_path, collect_orphaned_blobs
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(fake_redis, eager_celery, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "blob_gc_grace_hours", 0)
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_session, None)
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def agent():
+    with Session(engine) as session:
+        user = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user.id
+
+
+def auth_headers(user_id: int) -> dict:
+    token = create_access_token(data={"sub": str(user_id), "role": UserRole.agent})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_ticket(owner_id: int) -> int:
+    with Session(engine) as session:
+        ticket = Ticket(subject="Ticket", description="Details", owner_id=owner_id)
+        session.add(ticket)
+        session.commit()
+        return ticket.id
+
+
+def ref_counts() -> dict:
+    with Session(engine) as session:
+        return dict(session.exec(select(AttachmentBlob.content_hash, AttachmentBlob.ref_count)).all())
+
+
+def test_identical_uploads_share_one_blob_until_both_are_deleted(client, agent, tmp_path):
+    headers = auth_headers(agent)
+    uploads = [
+        client.post(
+            f"/api/v1/tickets/{create_ticket(agent)}/attachments?filename=notes.txt",
+            content=b"same bytes",
+            headers=headers,
+        ).json()
+        for _ in range(2)
+    ]
+    content_hash = os.path.basename(uploads[0]["file_path"])
+    blob_file = tmp_path / blob_path(content_hash)
+
+    assert uploads[0]["file_path"] == uploads[1]["file_path"]
+    assert ref_counts() == {content_hash: 2}
+
+    first, second = uploads
+    client.delete(f"/api/v1/tickets/{first['ticket_id']}/attachments/{first['id']}", headers=headers)
+    assert ref_counts() == {content_hash: 1}
+    assert collect_orphaned_blobs() == 0
+    assert blob_file.exists()
+
+    client.delete(f"/api/v1/tickets/{second['ticket_id']}/attachments/{second['id']}", headers=headers)
+    assert ref_counts() == {content_hash: 0}
+    assert collect_orphaned_blobs() == 1
+    assert ref_counts() == {}
+    assert not blob_file.exists()
+
+
+def test_stored_files_without_a_blob_row_are_collected(client, agent, tmp_path):
+    kept = client.post(
+        f"/api/v1/tickets/{create_ticket(agent)}/attachments?filename=notes.txt",
+        content=b"referenced",
+        headers=auth_headers(agent),
+    ).json()
+    stray = tmp_path / blob_path("ab" * 32)
+    stray.parent.mkdir(parents=True)
+    stray.write_bytes(b"left by a rolled back upload")
+
+    assert collect_orphaned_blobs() == 1
+    assert not stray.exists()
+    assert (tmp_path / kept["file_path"]).exists()
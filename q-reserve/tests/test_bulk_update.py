@@ -0,0 +1,104 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from backend.app.main import app
+from backend.app.core.config import settings
+from backend.app.core.security import create_access_token
+from backend.app.db.session import get_session
+from backend.app.models.ticket import Ticket, TicketPriority, TicketStatus
+from backend.app.models.user import User, UserRole
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(fake_redis, eager_celery):
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_session, None)
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def agent():
+    with Session(engine) as session:
+        user = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user.id
+
+
+def auth_headers(user_id: int) -> dict:
+    token = create_access_token(data={"sub": str(user_id), "role": UserRole.agent})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_tickets(owner_id: int, count: int, **values) -> list:
+    with Session(engine) as session:
+        tickets = [Ticket(subject=f"Ticket {i}", description="Details", owner_id=owner_id, **values) for i in range(count)]
+        session.add_all(tickets)
+        session.commit()
+        return [ticket.id for ticket in tickets]
+
+
+def priorities() -> dict:
+    with Session(engine) as session:
+        return dict(session.exec(select(Ticket.id, Ticket.priority)).all())
+
+
+def test_filter_update_is_limited_and_resumable(client, agent, monkeypatch):
+    monkeypatch.setattr(settings, "bulk_update_chunk_size", 2)
+    monkeypatch.setattr(settings, "bulk_update_max_tickets", 3)
+    create_tickets(agent, 5)
+    closed = create_tickets(agent, 1, status=TicketStatus.closed)
+    request = {"filter": {"status": "open"}, "changes": {"priority": "high"}}
+
+    first = client.patch("/api/v1/tickets/bulk", json=request, headers=auth_headers(agent)).json()
+    second = client.patch("/api/v1/tickets/bulk", json=request, headers=auth_headers(agent)).json()
+
+    assert (first["updated"], first["has_more"]) == (3, True)
+    assert (second["updated"], second["has_more"]) == (2, False)
+    values = priorities()
+    assert values.pop(closed[0]) == TicketPriority.medium
+    assert set(values.values()) == {TicketPriority.high}
+
+
+def test_filter_without_criteria_is_rejected(client, agent):
+    create_tickets(agent, 2)
+
+    response = client.patch(
+        "/api/v1/tickets/bulk",
+        json={"filter": {}, "changes": {"priority": "high"}},
+        headers=auth_headers(agent),
+    )
+
+    assert response.status_code == 400
+    assert set(priorities().values()) == {TicketPriority.medium}
+
+
+def test_update_by_ids_reports_each_ticket(client, agent):
+    unchanged, updated = create_tickets(agent, 1, priority=TicketPriority.high) + create_tickets(agent, 1)
+
+    response = client.patch(
+        "/api/v1/tickets/bulk",
+        json={"ticket_ids": [unchanged, updated, 999], "changes": {"priority": "high"}},
+        headers=auth_headers(agent),
+    ).json()
+
+    results = {result["ticket_id"]: result["result"] for result in response["results"]}
+    assert response["updated"] == 1
+    assert results == {unchanged: "unchanged", updated: "updated", 999: "not_found"}
@@ -0,0 +1,121 @@
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from backend.app.main import app
+from backend.app.core.cache import ticket_versions, user_versions
+from backend.app.core.security import create_access_token
+from backend.app.db.session import get_session
+from backend.app.models.ticket import Ticket
+from backend.app.models.user import User, UserRole
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(fake_redis):
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_session, None)
+    SQLModel.metadata.drop_all(engine)
+
+
+def create_user(email: str, role: UserRole = UserRole.agent, full_name: str = "Agent") -> int:
+    with Session(engine) as session:
+        user = User(email=email, full_name=full_name, role=role, hashed_password="x")
+        session.add(user)
+        session.commit()
+        return user.id
+
+
+def auth_headers(user_id: int, role: UserRole = UserRole.agent) -> dict:
+    token = create_access_token(data={"sub": str(user_id), "role": role})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def rename_ticket(ticket_id: int, subject: str):
+    with Session(engine) as session:
+        ticket = session.get(Ticket, ticket_id)
+        ticket.subject = subject
+        session.add(ticket)
+        session.commit()
+    ticket_versions.bump()
+
+
+def test_ticket_list_is_not_served_stale_after_redis_reset(client, fake_redis):
+    """Counters restart at 1 after a flush; old cache keys must not come back."""
+    agent = create_user("agent@example.com")
+    with Session(engine) as session:
+        ticket = Ticket(subject="Before", description="Details", owner_id=agent)
+        session.add(ticket)
+        session.commit()
+        ticket_id = ticket.id
+    headers = auth_headers(agent)
+
+    for _ in range(3):
+        ticket_versions.bump()
+    fake_redis.flushall()
+
+    first = client.get("/api/v1/tickets/", headers=headers).json()
+    rename_ticket(ticket_id, "After")
+    second = client.get("/api/v1/tickets/", headers=headers).json()
+
+    assert first[0]["subject"] == "Before"
+    assert second[0]["subject"] == "After"
+
+
+def test_failed_bump_bypasses_caches_until_retried(fake_redis, monkeypatch):
+    before = ticket_versions.current()
+
+    def unavailable():
+        raise RedisConnectionError("Redis is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("backend.app.core.cache.get_redis", unavailable)
+        assert ticket_versions.bump() is None
+        assert ticket_versions.current() is None
+
+    after = ticket_versions.current()
+    assert after is not None and after != before
+
+
+def test_agent_list_is_not_served_stale_after_redis_reset(client, fake_redis):
+    agent = create_user("agent@example.com")
+    admin = create_user("admin@example.com", UserRole.admin, "Admin")
+    headers = auth_headers(admin, UserRole.admin)
+
+    for _ in range(3):
+        user_versions.bump()
+    fake_redis.flushall()
+
+    first = client.get("/api/v1/users/agents", headers=headers).json()
+    client.patch(f"/api/v1/users/{agent}", json={"full_name": "Renamed"}, headers=headers)
+    second = client.get("/api/v1/users/agents", headers=headers).json()
+
+    assert "Agent" in [option["full_name"] for option in first]
+    assert "Renamed" in [option["full_name"] for option in second]
+
+
+def test_registration_bumps_the_user_version(client):
+    before = user_versions.current()
+    response = client.post("/api/v1/auth/register", json={
+        "email": "new@example.com",
+        "password": "password123",
+        "full_name": "New User",
+    })
+
+    assert response.status_code == 200
+    assert user_versions.current() != before
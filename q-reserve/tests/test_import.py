@@ -0,0 +1,109 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, func, select
+from sqlmodel.pool import StaticPool
+
+from backend.app.models.comment import Comment
+from backend.app.models.ticket import Ticket
+from backend.app.models.category import Category
+from backend.app.models.user import User, UserRole
+from backend.app.models.vote import Vote
+from backend.app.services.import_service import TicketImporter
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+@pytest.fixture
+def session():
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def agent(session):
+    user = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+    session.add(user)
+    session.commit()
+    return user.id
+
+
+def run_import(session, records):
+    report = TicketImporter(session).run(enumerate(records, start=1))
+    session.commit()
+    return report
+
+
+def test_assignees_must_be_existing_agents(session, agent):
+    report = run_import(session, [
+        {"type": "ticket", "external_id": "T1", "subject": "One", "owner_email": "a@example.com",
+         "assignee_email": "Agent@example.com"},
+        {"type": "ticket", "external_id": "T2", "subject": "Two", "owner_email": "b@example.com",
+         "assignee_email": "a@example.com"},
+    ])
+
+    assert report.tickets == 1
+    assert report.errors == ["line 2: Unknown agent 'a@example.com'"]
+    assert session.exec(select(Ticket.assignee_id).where(Ticket.external_id == "T1")).one() == agent
+    assert session.exec(select(User.role).where(User.email == "a@example.com")).one() == UserRole.end_user
+
+
+def test_comments_are_not_imported_twice(session, agent):
+    run_import(session, [
+        {"type": "ticket", "external_id": "T1", "subject": "One", "owner_email": "a@example.com"},
+    ])
+    comments = [
+        {"type": "comment", "external_id": "C1", "ticket_external_id": "T1", "author_email": "a@example.com",
+         "content": "First"},
+        {"type": "comment", "external_id": "C2", "parent_external_id": "C1", "ticket_external_id": "T1",
+         "author_email": "agent@example.com", "content": "Reply"},
+    ]
+
+    first = run_import(session, comments)
+    second = run_import(session, comments + [
+        {"type": "comment", "external_id": "C3", "parent_external_id": "C2", "ticket_external_id": "T1",
+         "author_email": "a@example.com", "content": "Follow-up"},
+    ])
+
+    assert (first.comments, second.comments, second.skipped) == (2, 1, 2)
+    assert session.exec(select(func.count(Comment.id))).one() == 3
+    parents = dict(session.exec(select(Comment.external_id, Comment.parent_id)).all())
+    ids = dict(session.exec(select(Comment.external_id, Comment.id)).all())
+    assert parents == {"C1": None, "C2": ids["C1"], "C3": ids["C2"]}
+
+
+def test_votes_are_not_imported_twice(session, agent):
+    run_import(session, [
+        {"type": "ticket", "external_id": "T1", "subject": "One", "owner_email": "a@example.com"},
+    ])
+    votes = [
+        {"type": "vote", "ticket_external_id": "T1", "user_email": "a@example.com", "vote_type": "up"},
+        {"type": "vote", "ticket_external_id": "T1", "user_email": "b@example.com", "vote_type": "down"},
+    ]
+
+    first = run_import(session, votes)
+    second = run_import(session, votes)
+
+    assert (first.votes, second.votes, second.skipped) == (2, 0, 2)
+    assert session.exec(select(func.count(Vote.id))).one() == 2
+
+
+def test_invalid_records_create_no_users_or_categories(session, agent):
+    report = run_import(session, [
+        {"type": "ticket", "external_id": "T1", "subject": "One", "owner_email": "new@example.com",
+         "category": "New", "assignee_email": "nobody@example.com"},
+        {"type": "ticket", "external_id": "T2", "owner_email": "new@example.com", "category": "New"},
+        {"type": "ticket", "external_id": "T3", "subject": "Three", "owner_email": "a@example.com"},
+        {"type": "comment", "ticket_external_id": "T3", "author_email": "new@example.com"},
+        {"type": "vote", "ticket_external_id": "T3", "user_email": "new@example.com", "vote_type": "sideways"},
+    ])
+
+    assert (report.tickets, report.comments, report.votes, len(report.errors)) == (1, 0, 0, 4)
+    assert (report.users_created, report.categories_created) == (1, 0)
+    assert session.exec(select(User.id).where(User.email == "new@example.com")).first() is None
+    assert session.exec(select(Category.id).where(Category.name == "New")).first() is None
@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from backend.app.main import app
+from backend.app.core.query_stats import install_query_listeners
+from backend.app.core.security import create_access_token
+from backend.app.db.session import get_session
+from backend.app.models.comment import Comment
+from backend.app.models.ticket import Ticket
+from backend.app.models.user import User, UserRole
+from backend.app.models.vote import Vote, VoteType
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+install_query_listeners(engine)
+
+
+def override_get_session():
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client():
+    SQLModel.metadata.create_all(engine)
+    app.dependency_overrides[get_session] = override_get_session
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_session, None)
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def agent():
+    with Session(engine) as session:
+        user = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        return user.id
+
+
+def auth_headers(user_id: int) -> dict:
+    token = create_access_token(data={"sub": str(user_id), "role": UserRole.agent})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_tickets(owner_id: int, count: int) -> list:
+    with Session(engine) as session:
+        tickets = [Ticket(subject=f"Ticket {i}", description="Details", owner_id=owner_id) for i in range(count)]
+        session.add_all(tickets)
+        session.commit()
+        for ticket in tickets:
+            session.add(Comment(content="First", ticket_id=ticket.id, author_id=owner_id))
+            session.add(Vote(ticket_id=ticket.id, user_id=owner_id, vote_type=VoteType.up))
+        session.commit()
+        return [ticket.id for ticket in tickets]
+
+
+def create_thread(ticket_id: int, author_id: int, length: int):
+    """Add a reply chain of the given length to a ticket."""
+    with Session(engine) as session:
+        parent_id = None
+        for i in range(length):
+            comment = Comment(content=f"Reply {i}", ticket_id=ticket_id, author_id=author_id, parent_id=parent_id)
+            session.add(comment)
+            session.commit()
+            parent_id = comment.id
+
+
+def test_list_tickets_query_count_is_independent_of_page_size(client, agent, query_budget):
+    """Listing tickets must not lazy-load relationships or counts per ticket."""
+    create_tickets(agent, 30)
+    headers = auth_headers(agent)
+
+    small = query_budget(client.get("/api/v1/tickets/?page_size=5", headers=headers), 8)
+    large = query_budget(client.get("/api/v1/tickets/?page_size=30", headers=headers), 8)
+
+    assert small == large
+
+
+def test_comment_thread_query_count_is_independent_of_length(client, agent, query_budget):
+    """Nested replies and their authors are loaded without a query per comment."""
+    short_ticket, long_ticket = create_tickets(agent, 2)
+    create_thread(short_ticket, agent, 2)
+    create_thread(long_ticket, agent, 25)
+    headers = auth_headers(agent)
+
+    short = query_budget(client.get(f"/api/v1/comments/ticket/{short_ticket}", headers=headers), 5)
+    long = query_budget(client.get(f"/api/v1/comments/ticket/{long_ticket}", headers=headers), 5)
+
+    assert short == long
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from backend.app.core.config import settings
+from backend.app.core.email import email_service
+from backend.app.models.category import Category
+from backend.app.models.sla import SlaPolicy
+from backend.app.models.ticket import Ticket, TicketPriority, TicketStatus
+from backend.app.models.user import User, UserRole
+from backend.app.services.sla_service import escalate_sla_breaches, load_sla_targets, refresh_sla_due_dates, sla_due_at
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+@pytest.fixture
+def session(fake_redis, eager_celery):
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def sent_emails(monkeypatch):
+    """Record escalation emails instead of sending them."""
+    sent = []
+
+    async def send_email(to_email, subject, html_content, text_content=None):
+        sent.append(to_email)
+        return True
+
+    monkeypatch.setattr(email_service, "send_email", send_email)
+    return sent
+
+
+def test_category_policy_overrides_priority_default(session):
+    category = Category(name="Billing")
+    session.add(category)
+    session.commit()
+    session.add(SlaPolicy(priority=TicketPriority.high, category_id=category.id, resolution_hours=2))
+    session.commit()
+    created_at = datetime(2024, 1, 1)
+
+    targets = load_sla_targets(session)
+
+    assert sla_due_at(targets, TicketPriority.high, category.id, created_at) == created_at + timedelta(hours=2)
+    assert sla_due_at(targets, TicketPriority.high, None, created_at) == created_at + timedelta(
+        hours=settings.sla_resolution_hours["high"]
+    )
+
+
+def test_escalates_each_breach_once(session, sent_emails, monkeypatch):
+    monkeypatch.setattr(settings, "sla_check_batch_size", 1)
+    monkeypatch.setattr(settings, "sla_escalation_email", None)
+    admin = User(email="admin@example.com", full_name="Admin", role=UserRole.admin, hashed_password="x")
+    agent = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+    session.add_all([admin, agent])
+    session.commit()
+
+    now = datetime.utcnow()
+    past, future = now - timedelta(hours=1), now + timedelta(hours=1)
+
+    def ticket(due_at, status=TicketStatus.open, assignee_id=None, breached_at=None):
+        ticket = Ticket(
+            subject="Ticket", description="Details", owner_id=admin.id, status=status,
+            assignee_id=assignee_id, sla_due_at=due_at, sla_breached_at=breached_at,
+        )
+        session.add(ticket)
+        return ticket
+
+    assigned = ticket(past, assignee_id=agent.id)
+    unassigned = ticket(past - timedelta(hours=1), status=TicketStatus.in_progress)
+    ticket(future)
+    ticket(past, status=TicketStatus.resolved)
+    ticket(past, breached_at=past)
+    session.commit()
+
+    assert escalate_sla_breaches() == 2
+    assert escalate_sla_breaches() == 0
+
+    session.expire_all()
+    breached = session.exec(
+        select(Ticket.id, Ticket.version).where(Ticket.sla_breached_at.is_not(None), Ticket.sla_breached_at != past)
+    ).all()
+    assert sorted(breached) == sorted([(assigned.id, 2), (unassigned.id, 2)])
+    assert sorted(sent_emails) == ["admin@example.com", "agent@example.com"]
+
+
+def test_priority_change_recomputes_deadline_and_breach(session, sent_emails):
+    owner = User(email="owner@example.com", full_name="Owner", role=UserRole.end_user, hashed_password="x")
+    session.add(owner)
+    session.commit()
+    created_at = datetime.utcnow() - timedelta(hours=10)
+    relaxed = Ticket(
+        subject="Relaxed", description="Details", owner_id=owner.id, priority=TicketPriority.high,
+        created_at=created_at, sla_due_at=created_at + timedelta(hours=4), sla_breached_at=created_at,
+    )
+    tightened = Ticket(
+        subject="Tightened", description="Details", owner_id=owner.id, priority=TicketPriority.urgent,
+        created_at=created_at, sla_due_at=created_at + timedelta(hours=72),
+    )
+    session.add_all([relaxed, tightened])
+    session.commit()
+
+    refresh_sla_due_dates([relaxed.id, tightened.id])
+
+    session.expire_all()
+    assert (relaxed.sla_due_at, relaxed.sla_breached_at) == (created_at + timedelta(hours=24), None)
+    assert (tightened.sla_due_at, tightened.sla_breached_at) == (created_at + timedelta(hours=4), None)
+    assert escalate_sla_breaches() == 1
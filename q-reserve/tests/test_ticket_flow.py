@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from backend.app.models.ticket import TicketStatus, TicketStatusEvent
+from backend.app.services.flow_service import (
+    HISTOGRAM_BINS,
+    aggregate_window,
+    bucket_counts,
+    get_ticket_flow,
+    status_event,
+)
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def session():
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+
+
+def histogram(*bins: int) -> list:
+    counts = [0] * HISTOGRAM_BINS
+    for index in bins:
+        counts[index] += 1
+    return counts
+
+
+EVENTS = [
+    # (occurred_at, category_id, is_creation, resolution_seconds)
+    (START + timedelta(minutes=10), None, True, None),
+    (START + timedelta(minutes=50), 5, True, None),
+    (START + timedelta(hours=1, minutes=5), None, False, 3600),  # exactly on the 1 hour bound
+    (START + timedelta(hours=1, minutes=30), None, False, 3601),
+    (START + timedelta(hours=1, minutes=40), None, False, None),  # reopened, not a resolution
+    (START + timedelta(hours=2, minutes=59), 5, False, 800 * 3600),  # beyond the last bound
+]
+
+
+def test_bucket_counts_per_hour_and_category():
+    rows = {
+        (row["bucket_start"], row["category_id"]): row
+        for row in bucket_counts(EVENTS, START, "hour", 3)
+    }
+
+    assert set(rows) == {(START, 0), (START, 5), (START + timedelta(hours=1), 0), (START + timedelta(hours=2), 5)}
+    assert [rows[START, 0]["created"], rows[START, 5]["created"]] == [1, 1]
+    resolved = rows[START + timedelta(hours=1), 0]
+    assert (resolved["created"], resolved["resolved"], resolved["resolution_seconds_total"]) == (0, 2, 7201)
+    assert resolved["resolution_histogram"] == histogram(0, 1)
+    assert rows[START + timedelta(hours=2), 5]["resolution_histogram"] == histogram(HISTOGRAM_BINS - 1)
+
+
+def test_bucket_counts_per_day():
+    rows = list(bucket_counts(EVENTS, START, "day", 1))
+
+    assert [(row["category_id"], row["created"], row["resolved"]) for row in rows] == [(0, 1, 2), (5, 1, 1)]
+    assert all(row["bucket_start"] == START for row in rows)
+
+
+def test_flow_series_is_read_from_aggregated_buckets(session):
+    created_at = START + timedelta(minutes=5)
+    session.add(TicketStatusEvent(**status_event(1, None, None, TicketStatus.open, created_at, created_at)))
+    session.add(TicketStatusEvent(**status_event(
+        1, None, TicketStatus.open, TicketStatus.resolved, created_at, START + timedelta(hours=2, minutes=5)
+    )))
+    session.commit()
+
+    aggregate_window(session, START, START + timedelta(days=1))
+    session.commit()
+    series = get_ticket_flow(session, START, START + timedelta(hours=4), interval="hour", max_points=2)
+
+    assert series.step == 2
+    assert [(point.created, point.resolved) for point in series.points] == [(1, 0), (0, 1)]
+    assert series.points[1].mean_resolution_hours == 2.0
+    assert series.points[1].resolution_histogram == histogram(1)
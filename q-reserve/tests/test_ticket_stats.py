@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from backend.app.models.category import Category
+from backend.app.models.ticket import Ticket, TicketPriority, TicketStatsRollup, TicketStatus
+from backend.app.models.user import User, UserRole
+from backend.app.services.stats_service import (
+    get_ticket_stats,
+    rebuild_ticket_stats,
+    record_ticket_stats,
+    stats_key,
+)
+
+
+engine = create_engine(
+    "sqlite://",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr("backend.app.services.stats_service.engine", engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+    SQLModel.metadata.drop_all(engine)
+
+
+def rollup(session) -> dict:
+    session.expire_all()
+    return {
+        (row.status, row.priority, row.category_id, row.assignee_id): (row.ticket_count, row.created_at_total)
+        for row in session.exec(select(TicketStatsRollup)).all()
+        if row.ticket_count
+    }
+
+
+def test_incremental_rollup_matches_rebuild(session):
+    agent = User(email="agent@example.com", full_name="Agent", role=UserRole.agent, hashed_password="x")
+    category = Category(name="Billing")
+    session.add_all([agent, category])
+    session.commit()
+
+    start = datetime(2024, 1, 1)
+    tickets = []
+    for i in range(12):
+        ticket = Ticket(
+            subject=f"Ticket {i}",
+            description="Details",
+            owner_id=agent.id,
+            priority=list(TicketPriority)[i % 4],
+            category_id=category.id if i % 3 else None,
+            created_at=start + timedelta(hours=i),
+        )
+        session.add(ticket)
+        session.flush()
+        record_ticket_stats(session, ticket)
+        tickets.append(ticket)
+
+    # Reassign, resolve and re-prioritize some of them, as the endpoints do
+    for ticket in tickets[::2]:
+        old_key = stats_key(ticket)
+        ticket.assignee_id = agent.id
+        ticket.status = TicketStatus.resolved if ticket.id % 4 == 0 else TicketStatus.in_progress
+        record_ticket_stats(session, ticket, old_key)
+    for ticket in tickets[1::3]:
+        old_key = stats_key(ticket)
+        ticket.priority = TicketPriority.urgent
+        record_ticket_stats(session, ticket, old_key)
+    session.commit()
+
+    incremental = rollup(session)
+    rebuild_ticket_stats()
+
+    assert rollup(session) == incremental
+    assert sum(count for count, _ in incremental.values()) == 12
+
+
+def test_stats_are_read_from_the_rollup(session):
+    owner = User(email="owner@example.com", full_name="Owner", role=UserRole.end_user, hashed_password="x")
+    session.add(owner)
+    session.commit()
+    for status in (TicketStatus.open, TicketStatus.open, TicketStatus.closed):
+        session.add(Ticket(subject="Ticket", description="Details", owner_id=owner.id, status=status))
+    session.commit()
+    rebuild_ticket_stats()
+
+    stats = get_ticket_stats(session)
+
+    assert stats.total == 3
+    assert stats.by_status["open"] == 2
+    assert stats.by_status["closed"] == 1
+    assert stats.backlog.tickets == 2